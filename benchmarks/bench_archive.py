@@ -0,0 +1,86 @@
+# Author: everettjf
+"""Indexing throughput, index size and query latency of the plan archive.
+
+Archives synthetic plans whose node text follows a Zipf-like word distribution (so
+there are both very common and very rare terms), then times searches for common,
+rare, mixed and missing words.
+
+    uv run python benchmarks/bench_archive.py --plans 3000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from ideaforge.archive import PlanArchive
+from ideaforge.planner import PlanResult
+
+
+def build_plans(count: int, vocabulary: List[str], seed: int) -> List[PlanResult]:
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+
+    def words(size: int) -> str:
+        return " ".join(rng.choices(vocabulary, weights, k=size))
+
+    def node(depth: int) -> Dict[str, Any]:
+        children = [node(depth - 1) for _ in range(3)] if depth else []
+        return {"title": words(4), "summary": words(15), "deliverable": words(3), "tasks": children}
+
+    return [
+        PlanResult.from_dict({"idea": f"Idea {index}", "tree": [node(2) for _ in range(4)], "analyses": []})
+        for index in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--plans", type=int, default=1000, help="Number of plans to archive.")
+    parser.add_argument("--vocabulary", type=int, default=3000, help="Distinct words in the synthetic text.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per query (median is reported).")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    vocabulary = ["".join(rng.choices(letters, k=rng.randint(3, 9))) for _ in range(args.vocabulary)]
+    plans = build_plans(args.plans, vocabulary, args.seed)
+    queries = {
+        "common": f"{vocabulary[0]} {vocabulary[1]}",
+        "rare": vocabulary[-1],
+        "mixed": f"{vocabulary[0]} {vocabulary[len(vocabulary) // 4]}",
+        "prefix": vocabulary[2][:2],
+        "missing": "zzzzzzzzzz",
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        archive = PlanArchive(Path(directory) / "plans.sqlite3")
+        started = time.perf_counter()
+        archive.add_many(plans)
+        elapsed = time.perf_counter() - started
+        stats = archive.stats()
+        print(
+            f"indexed {stats.plans} plans ({stats.occurrences} nodes) in {elapsed:.2f}s"
+            f" ({elapsed / max(stats.plans, 1) * 1000:.2f} ms/plan)"
+        )
+        print(f"index: {stats.terms} terms, {stats.postings} postings, {stats.size_bytes / 2**20:.1f} MB")
+        print(f"{'query':<8} {'hits':>5} {'p50 ms':>8}")
+        for name, query in queries.items():
+            samples = []
+            hits = 0
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                hits = len(archive.search(query))
+                samples.append(time.perf_counter() - started)
+            print(f"{name:<8} {hits:>5} {statistics.median(samples) * 1000:>8.2f}")
+        archive.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# Author: everettjf
+"""Micro-benchmark for JSON recovery on large, noisy model responses.
+
+Compares ``ideaforge.recovery.recover_json`` with the bracket-counting extractor the
+planner used before it, over synthetic 100 KB+ ReAct-style responses.
+
+    uv run python benchmarks/bench_json_recovery.py --size 200000 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import time
+from typing import Callable, Dict, List, Tuple
+
+from ideaforge.recovery import recover_json
+
+
+def legacy_extract(text: str) -> Dict | None:
+    """The pre-recovery strategy: per-bracket-type depth counting, json.loads per candidate."""
+    for opener, closer in ("{}", "[]"):
+        stack = 0
+        start = None
+        for index, char in enumerate(text):
+            if char == opener:
+                if stack == 0:
+                    start = index
+                stack += 1
+            elif char == closer and stack:
+                stack -= 1
+                if stack == 0 and start is not None:
+                    candidate = text[start : index + 1]
+                    try:
+                        return json.loads(candidate)
+                    except json.JSONDecodeError:
+                        continue
+    return None
+
+
+def _payload(rng: random.Random, width: int) -> Dict:
+    return {
+        "analysis": [f"Thought: step {index} {{considering}} options" for index in range(8)],
+        "tasks": [
+            {
+                "title": f"Task {index}",
+                "summary": f"Handle edge case \"{{{index}}}\" and the {{braces}} in text",
+                "deliverable": f"Artifact {rng.randint(0, 999)}",
+                "tasks": [{"title": f"Subtask {index}.{child}", "tasks": []} for child in range(3)],
+            }
+            for index in range(width)
+        ],
+    }
+
+
+def scenario_noise(rng: random.Random, size: int) -> Tuple[str, Dict]:
+    """Many small ``{...}`` fragments (some valid JSON) before the final answer."""
+    payload = _payload(rng, 20)
+    parts: List[str] = []
+    while sum(map(len, parts)) < size:
+        kind = rng.random()
+        if kind < 0.4:
+            parts.append(f'Observation: {{"step": {rng.randint(0, 99)}, "ok": true}}\n')
+        elif kind < 0.8:
+            parts.append(f"Thought: consider {{option {rng.randint(0, 99)}}} and [note].\n")
+        else:
+            parts.append("Action: refine the plan further with more detail. " * 3 + "\n")
+    return "".join(parts) + "Final Answer:\n" + json.dumps(payload), payload
+
+
+def scenario_braces_in_strings(rng: random.Random, size: int) -> Tuple[str, Dict]:
+    """One large payload whose string values are full of braces."""
+    width = max(1, size // 400)
+    payload = _payload(rng, width)
+    return "Final Answer: " + json.dumps(payload), payload
+
+
+def scenario_truncated(rng: random.Random, size: int) -> Tuple[str, Dict]:
+    """A large payload cut off mid-way, as when the model hits its token limit."""
+    width = max(2, size // 400)
+    payload = _payload(rng, width)
+    text = json.dumps(payload)
+    return "```json\n" + text[: int(len(text) * 0.9)], payload
+
+
+SCENARIOS: Dict[str, Callable[[random.Random, int], Tuple[str, Dict]]] = {
+    "noise-fragments": scenario_noise,
+    "braces-in-strings": scenario_braces_in_strings,
+    "truncated-tail": scenario_truncated,
+}
+
+
+def _time(function: Callable[[], object], repeat: int) -> Tuple[float, object]:
+    samples = []
+    result: object = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=150_000, help="Approximate response size in characters.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (median is reported).")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'scenario':<20} {'chars':>8} {'legacy ms':>10} {'ok':>4} {'recover ms':>11} {'ok':>4} {'speedup':>8}")
+    for name, build in SCENARIOS.items():
+        text, payload = build(random.Random(args.seed), args.size)
+        legacy_seconds, legacy = _time(lambda: legacy_extract(text), args.repeat)
+        recover_seconds, recovered = _time(lambda: recover_json(text, ("tasks",)), args.repeat)
+        legacy_ok = isinstance(legacy, dict) and "tasks" in legacy
+        recover_ok = isinstance(recovered, dict) and bool(recovered.get("tasks"))
+        speedup = legacy_seconds / recover_seconds if recover_seconds else float("inf")
+        print(
+            f"{name:<20} {len(text):>8} {legacy_seconds * 1000:>10.2f} {'yes' if legacy_ok else 'no':>4}"
+            f" {recover_seconds * 1000:>11.2f} {'yes' if recover_ok else 'no':>4} {speedup:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# Author: everettjf
+"""Memory and speed of the PlanNode tree engine on 10k-100k-node plans.
+
+Compares ``ideaforge.planner.PlanNode`` (slotted, iterative) with the recursive
+dataclass it replaced: build from dicts, serialize back, render every line, and the
+retained memory of the built tree. A final deep chain checks recursion safety.
+
+    uv run python benchmarks/bench_plan_tree.py --nodes 10000 --nodes 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import statistics
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Tuple
+
+from ideaforge.planner import PlanNode, render_tree
+
+
+@dataclass
+class LegacyPlanNode:
+    """The previous recursive implementation, kept verbatim for comparison."""
+
+    title: str
+    summary: str = ""
+    deliverable: str = ""
+    tasks: List["LegacyPlanNode"] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LegacyPlanNode":
+        tasks = [cls.from_dict(child) for child in data.get("tasks", [])]
+        return cls(
+            title=data.get("title", "Untitled"),
+            summary=data.get("summary", ""),
+            deliverable=data.get("deliverable", ""),
+            tasks=tasks,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "title": self.title,
+            "summary": self.summary,
+            "deliverable": self.deliverable,
+            "tasks": [task.to_dict() for task in self.tasks],
+        }
+
+    def render(self, prefix: str = "", is_last: bool = True) -> List[str]:
+        connector = "└── " if is_last else "├── "
+        headline = f"{self.title}"
+        if self.deliverable:
+            headline += f" → {self.deliverable}"
+        lines = [f"{prefix}{connector}{headline}"]
+        detail_prefix = "    " if is_last else "│   "
+        if self.summary:
+            lines.append(f"{prefix}{detail_prefix}summary: {self.summary}")
+        for index, child in enumerate(self.tasks):
+            lines.extend(child.render(prefix + detail_prefix, index == len(self.tasks) - 1))
+        return lines
+
+
+def legacy_render(tree: List[LegacyPlanNode]) -> str:
+    lines: List[str] = []
+    for index, node in enumerate(tree):
+        lines.extend(node.render(is_last=index == len(tree) - 1))
+    return "\n".join(lines)
+
+
+def build_plan(nodes: int, width: int = 8) -> List[Dict[str, Any]]:
+    """A breadth-first filled plan of ``nodes`` nodes, ``width`` children per node."""
+    roots: List[Dict[str, Any]] = []
+    queue: List[Dict[str, Any]] = []
+    for index in range(nodes):
+        node = {"title": f"Task {index}", "summary": f"Summary {index}", "deliverable": f"D{index}", "tasks": []}
+        if index < width:
+            roots.append(node)
+        else:
+            queue[(index - width) // width]["tasks"].append(node)
+        queue.append(node)
+    return roots
+
+
+def chain(depth: int) -> Dict[str, Any]:
+    root: Dict[str, Any] = {"title": "Level 0", "tasks": []}
+    current = root
+    for level in range(1, depth):
+        child = {"title": f"Level {level}", "tasks": []}
+        current["tasks"].append(child)
+        current = child
+    return root
+
+
+def _timed(function: Callable[[], Any], repeat: int) -> Tuple[float, Any]:
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples), result
+
+
+def _retained(function: Callable[[], Any]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        kept = function()
+        size = tracemalloc.get_traced_memory()[0]
+        del kept
+        return size
+    finally:
+        tracemalloc.stop()
+
+
+def measure(cls: Any, render: Callable[[List[Any]], str], plan: List[Dict[str, Any]], repeat: int) -> Dict[str, float]:
+    build_seconds, tree = _timed(lambda: [cls.from_dict(item) for item in plan], repeat)
+    dump_seconds, _ = _timed(lambda: [node.to_dict() for node in tree], repeat)
+    render_seconds, _ = _timed(lambda: render(tree), repeat)
+    memory = _retained(lambda: [cls.from_dict(item) for item in plan])
+    return {"build": build_seconds, "dump": dump_seconds, "render": render_seconds, "memory": memory}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, action="append", help="Tree size (repeatable). Default 10k and 100k.")
+    parser.add_argument("--width", type=int, default=8, help="Children per node (lower means deeper trees).")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (median is reported).")
+    parser.add_argument("--depth", type=int, default=20_000, help="Depth of the recursion-safety chain.")
+    args = parser.parse_args()
+
+    print(f"{'nodes':>8} {'impl':<8} {'build ms':>9} {'dump ms':>8} {'render ms':>10} {'tree MB':>8}")
+    for nodes in args.nodes or [10_000, 100_000]:
+        plan = build_plan(nodes, args.width)
+        for name, cls, render in (
+            ("legacy", LegacyPlanNode, legacy_render),
+            ("current", PlanNode, lambda tree: "\n".join(render_tree(tree))),
+        ):
+            result = measure(cls, render, plan, args.repeat)
+            print(
+                f"{nodes:>8} {name:<8} {result['build'] * 1000:>9.1f} {result['dump'] * 1000:>8.1f}"
+                f" {result['render'] * 1000:>10.1f} {result['memory'] / 2**20:>8.2f}"
+            )
+
+    deep = chain(args.depth)
+    for name, cls in (("legacy", LegacyPlanNode), ("current", PlanNode)):
+        try:
+            node = cls.from_dict(deep)
+            lines = len(node.render())
+            outcome = f"ok ({lines} lines)"
+        except RecursionError:
+            outcome = "RecursionError"
+        print(f"depth {args.depth} {name}: {outcome}")
+
+
+if __name__ == "__main__":
+    main()
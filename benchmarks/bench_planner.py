@@ -0,0 +1,55 @@
+# Author: everettjf
+"""End-to-end planner benchmark with simulated models, runnable without network access.
+
+A thin wrapper around ``ideaforge.bench`` for CI jobs that store the JSON report and
+compare later runs against it (``ideaforge bench`` offers the same with a rich table).
+
+    uv run python benchmarks/bench_planner.py --runs 10 --json-out bench.json
+    uv run python benchmarks/bench_planner.py --baseline bench.json --tolerance 0.25
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+from ideaforge.bench import SCENARIOS, compare_reports, run_suite
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Repeatable; default all.")
+    parser.add_argument("--runs", type=int, default=5, help="Plans per scenario.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiply simulated model latency.")
+    parser.add_argument("--json-out", type=Path, help="Write the report as JSON.")
+    parser.add_argument("--baseline", type=Path, help="Exit non-zero when p50/overhead regress past this report.")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    reports = asyncio.run(run_suite(args.scenario, runs=args.runs, seed=args.seed, latency_scale=args.latency_scale))
+    print(
+        f"{'scenario':<10} {'nodes':>6} {'plan/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'overhead':>9}"
+        f" {'parse ms':>9} {'render ms':>10} {'peak KB':>8} {'retry':>6}"
+    )
+    for report in reports:
+        print(
+            f"{report.scenario:<10} {report.nodes:>6} {report.throughput:>7.1f} {report.p50_ms:>8.1f}"
+            f" {report.p95_ms:>8.1f} {report.overhead_ms:>9.1f} {report.parse_ms:>9.2f} {report.render_ms:>10.2f}"
+            f" {report.peak_memory_kb:>8.0f} {report.retries:>6}"
+        )
+    if args.json_out:
+        args.json_out.write_text(json.dumps([report.to_dict() for report in reports], indent=2) + "\n")
+    if args.baseline:
+        regressions = compare_reports(reports, json.loads(args.baseline.read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
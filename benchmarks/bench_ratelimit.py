@@ -0,0 +1,82 @@
+# Author: everettjf
+"""Plan throughput under a fixed provider quota, with and without the shared scheduler.
+
+Many plans run concurrently against one simulated provider that rejects requests over
+its requests-per-minute quota. The "client retry" mode mimics SDK defaults (each call
+retried twice with exponential backoff, then the plan fails); the "scheduled" mode puts
+every model behind one ``RateLimitScheduler`` configured with the same quota.
+
+    uv run python benchmarks/bench_ratelimit.py --plans 20 --rpm 1200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from typing import Any, Sequence
+
+from ideaforge.bench import SCENARIOS, QuotaModel, SimulatedModel
+from ideaforge.planner import IdeaPlanner
+from ideaforge.ratelimit import PRIORITY_OUTLINE, RateLimits, RateLimitScheduler, ScheduledModel, is_rate_limit_error
+
+
+class ClientRetryModel:
+    """Retries rate-limited calls with exponential backoff, like an SDK's built-in retries."""
+
+    def __init__(self, model: Any, max_retries: int = 2, backoff: float = 0.5) -> None:
+        self.model = model
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    async def ainvoke(self, messages: Sequence[Any], *args: Any, **kwargs: Any) -> Any:
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await self.model.ainvoke(messages, *args, **kwargs)
+            except Exception as exc:
+                if not is_rate_limit_error(exc) or attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(self.backoff * 2**attempt)
+        raise AssertionError("unreachable")
+
+
+async def run(mode: str, plans: int, rpm: float, parallel: int, seed: int) -> None:
+    provider = QuotaModel(SimulatedModel(SCENARIOS["parallel"], seed), rpm)
+    if mode == "scheduled":
+        scheduler = RateLimitScheduler(RateLimits(requests_per_minute=rpm))
+        planner_model: Any = ScheduledModel(provider, scheduler, priority=PRIORITY_OUTLINE)
+        react_model: Any = ScheduledModel(provider, scheduler)
+    else:
+        planner_model = react_model = ClientRetryModel(provider)
+    planner = IdeaPlanner(planner_model, react_model, max_parallel_objectives=parallel)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(planner.aplan(f"Quota idea {index}") for index in range(plans)), return_exceptions=True
+    )
+    elapsed = time.perf_counter() - started
+    failed = sum(1 for result in results if isinstance(result, BaseException))
+    completed = plans - failed
+    print(
+        f"{mode:<13} {completed:>5} {failed:>6} {elapsed:>7.2f} {completed / elapsed:>7.2f}"
+        f" {provider.accepted:>6} {provider.rejected:>6}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--plans", type=int, default=20, help="Plans started at once.")
+    parser.add_argument("--rpm", type=float, default=1200, help="Provider requests-per-minute quota.")
+    parser.add_argument("--parallel", type=int, default=4, help="Objectives expanded concurrently per plan.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    calls = args.plans * (SCENARIOS["parallel"].objectives + 1)
+    print(f"{args.plans} plans, {calls} model calls, quota {args.rpm:.0f} rpm (>= {calls / args.rpm * 60:.1f}s)")
+    print(f"{'mode':<13} {'done':>5} {'failed':>6} {'wall s':>7} {'plan/s':>7} {'calls':>6} {'429s':>6}")
+    for mode in ("client-retry", "scheduled"):
+        asyncio.run(run(mode, args.plans, args.rpm, args.parallel, args.seed))
+
+
+if __name__ == "__main__":
+    main()
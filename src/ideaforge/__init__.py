@@ -1,6 +1,38 @@
 # Author: everettjf
 """IdeaForge package entrypoint."""
 
-from .planner import IdeaPlanner, PlanNode, PlanResult, PlanTree
+from __future__ import annotations
 
-__all__ = ["IdeaPlanner", "PlanTree", "PlanNode", "PlanResult"]
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .expansion import ExpansionBudget
+    from .planner import IdeaPlanner, PlanNode, PlanResult, PlanTree, RepairRecord, render_tree
+
+# Public names are resolved on first access so `import ideaforge` stays cheap.
+_EXPORTS = {
+    "ExpansionBudget": ".expansion",
+    "IdeaPlanner": ".planner",
+    "PlanTree": ".planner",
+    "PlanNode": ".planner",
+    "PlanResult": ".planner",
+    "RepairRecord": ".planner",
+    "render_tree": ".planner",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *_EXPORTS])
+
+
+__all__ = ["ExpansionBudget", "IdeaPlanner", "PlanTree", "PlanNode", "PlanResult", "RepairRecord", "render_tree"]
@@ -0,0 +1,307 @@
+# Author: everettjf
+"""Local SQLite archive of generated plans with an inverted index for search."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from .planner import PlanNode, PlanResult
+
+_TERM = re.compile(r"[^\W_]+")
+# Upper bound for prefix scans: sorts after any continuation of a term.
+_MAX_CHAR = "\U0010ffff"
+# Path components are zero-padded so that sorting the stored text follows tree order.
+_PATH_DIGITS = 4
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS plans ("
+    " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+    " digest TEXT NOT NULL UNIQUE,"
+    " idea TEXT NOT NULL,"
+    " analyses TEXT NOT NULL,"
+    " created_at REAL NOT NULL)",
+    # One row per distinct node text, shared by every plan (and position) that uses it.
+    "CREATE TABLE IF NOT EXISTS nodes ("
+    " id INTEGER PRIMARY KEY,"
+    " hash TEXT NOT NULL UNIQUE,"
+    " title TEXT NOT NULL,"
+    " summary TEXT NOT NULL,"
+    " deliverable TEXT NOT NULL)",
+    # Where each node appears: ``path`` is the dotted zero-based position in the plan tree,
+    # each component padded to _PATH_DIGITS digits ("0.10" is stored as "0000.0010").
+    "CREATE TABLE IF NOT EXISTS occurrences ("
+    " plan_id INTEGER NOT NULL,"
+    " path TEXT NOT NULL,"
+    " node_id INTEGER NOT NULL,"
+    " PRIMARY KEY (plan_id, path)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS occurrences_node ON occurrences(node_id)",
+    # The inverted index: a lexicon holding each term's node count, and one posting per
+    # (term, distinct node).
+    "CREATE TABLE IF NOT EXISTS terms (id INTEGER PRIMARY KEY, term TEXT NOT NULL UNIQUE, nodes INTEGER NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS postings ("
+    " term_id INTEGER NOT NULL,"
+    " node_id INTEGER NOT NULL,"
+    " PRIMARY KEY (term_id, node_id)) WITHOUT ROWID",
+)
+
+
+@dataclass
+class ArchiveStats:
+    plans: int
+    nodes: int
+    occurrences: int
+    terms: int
+    postings: int
+    size_bytes: int
+
+
+@dataclass
+class SearchHit:
+    """A plan node matching every query word; ``path`` is its zero-based tree position."""
+
+    plan_id: int
+    idea: str
+    path: Tuple[int, ...]
+    title: str
+    summary: str
+    deliverable: str
+
+
+class PlanArchive:
+    """Plan store keyed on content hashes.
+
+    Identical plans are stored once, and so is the text of identical nodes across plans.
+    Node text is indexed when it is first stored, so adding a plan costs work
+    proportional to its new content and the index is always current. Search returns
+    nodes whose title, summary or deliverable contain every query word as a term prefix.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._term_ids: Dict[str, int] = {}
+        self._connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            self._connection.execute(statement)
+
+    def add(self, result: PlanResult) -> Tuple[int, bool]:
+        """Store ``result`` and return its plan id and whether it was new."""
+        (added,) = self.add_many([result])
+        return added
+
+    def add_many(self, results: Iterable[PlanResult]) -> List[Tuple[int, bool]]:
+        """Store several plans in one transaction; see :meth:`add`."""
+        added: List[Tuple[int, bool]] = []
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                for result in results:
+                    added.append(self._insert(result))
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                # Term ids handed out inside the rolled-back transaction no longer exist.
+                self._term_ids.clear()
+                raise
+            self._connection.execute("COMMIT")
+        return added
+
+    def get(self, plan_id: int) -> PlanResult:
+        with self._lock:
+            row = self._connection.execute("SELECT idea, analyses FROM plans WHERE id = ?", (plan_id,)).fetchone()
+            if row is None:
+                raise KeyError(f"No archived plan with id {plan_id}")
+            rows = self._connection.execute(
+                "SELECT o.path, n.title, n.summary, n.deliverable FROM occurrences o"
+                " JOIN nodes n ON n.id = o.node_id WHERE o.plan_id = ?",
+                (plan_id,),
+            ).fetchall()
+        return PlanResult(tree=_build_tree(rows), analyses=json.loads(row[1]), idea=row[0])
+
+    def search(self, query: str, limit: int = 20) -> List[SearchHit]:
+        """Return up to ``limit`` nodes matching every word of ``query``, newest plans first.
+
+        Words are expanded through the lexicon to the indexed terms they prefix. When the
+        rarest word is rare, its postings are the candidates and the other words are
+        checked per candidate; when the words are common, plan nodes are walked newest
+        first and checked the same way, stopping after ``limit`` hits.
+        """
+        words = sorted(set(tokenize(query)))
+        if not words or limit < 1:
+            return []
+        with self._lock:
+            groups: List[Tuple[int, List[int]]] = []
+            for word in words:
+                rows = self._connection.execute(
+                    "SELECT id, nodes FROM terms WHERE term >= ? AND term < ?", (word, word + _MAX_CHAR)
+                ).fetchall()
+                if not rows:
+                    return []
+                groups.append((sum(count for _, count in rows), [term_id for term_id, _ in rows]))
+            (total,) = self._connection.execute("SELECT COALESCE(MAX(id), 0) FROM nodes").fetchone()
+            rows = self._connection.execute(*_search_query(sorted(groups), total, limit)).fetchall()
+        return [
+            SearchHit(plan_id, idea, _parse_path(path), title, summary, deliverable)
+            for plan_id, idea, path, title, summary, deliverable in rows
+        ]
+
+    def stats(self) -> ArchiveStats:
+        with self._lock:
+            counts = [
+                self._connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("plans", "nodes", "occurrences", "terms", "postings")
+            ]
+            (pages,) = self._connection.execute("PRAGMA page_count").fetchone()
+            (page_size,) = self._connection.execute("PRAGMA page_size").fetchone()
+        return ArchiveStats(*counts, size_bytes=pages * page_size)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _insert(self, result: PlanResult) -> Tuple[int, bool]:
+        tree = [node.to_dict() for node in result.tree]
+        digest = _digest({"idea": result.idea, "tree": tree})
+        row = self._connection.execute("SELECT id FROM plans WHERE digest = ?", (digest,)).fetchone()
+        if row is not None:
+            return row[0], False
+        cursor = self._connection.execute(
+            "INSERT INTO plans (digest, idea, analyses, created_at) VALUES (?, ?, ?, ?)",
+            (digest, result.idea, json.dumps(list(result.analyses), ensure_ascii=False), time.time()),
+        )
+        plan_id = int(cursor.lastrowid)
+        occurrences: List[Tuple[int, str, int]] = []
+        postings: List[Tuple[int, int]] = []
+        for path, node in _walk(result.tree):
+            fields = (node.title, node.summary, node.deliverable)
+            node_hash = _digest(fields)
+            row = self._connection.execute("SELECT id FROM nodes WHERE hash = ?", (node_hash,)).fetchone()
+            if row is None:
+                node_id = int(
+                    self._connection.execute(
+                        "INSERT INTO nodes (hash, title, summary, deliverable) VALUES (?, ?, ?, ?)",
+                        (node_hash, *fields),
+                    ).lastrowid
+                )
+                terms = {term for value in fields for term in tokenize(value)}
+                postings.extend((self._term_id(term), node_id) for term in terms)
+            else:
+                node_id = row[0]
+            occurrences.append((plan_id, _format_path(path), node_id))
+        self._connection.executemany("INSERT INTO occurrences (plan_id, path, node_id) VALUES (?, ?, ?)", occurrences)
+        postings.sort()
+        self._connection.executemany("INSERT INTO postings (term_id, node_id) VALUES (?, ?)", postings)
+        self._connection.executemany(
+            "UPDATE terms SET nodes = nodes + ? WHERE id = ?",
+            [(count, term_id) for term_id, count in Counter(term_id for term_id, _ in postings).items()],
+        )
+        return plan_id, True
+
+    def _term_id(self, term: str) -> int:
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            self._connection.execute("INSERT OR IGNORE INTO terms (term, nodes) VALUES (?, 0)", (term,))
+            (term_id,) = self._connection.execute("SELECT id FROM terms WHERE term = ?", (term,)).fetchone()
+            self._term_ids[term] = term_id
+        return term_id
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word terms of ``text``, as used by the index and by queries."""
+    return _TERM.findall(text.casefold())
+
+
+def load_plans(path: Path) -> Iterator[PlanResult]:
+    """Yield the plans in a ``plan --out`` JSON file or a ``batch`` JSONL file (``ok`` lines only)."""
+    text = path.read_text(encoding="utf-8")
+    try:
+        records: List[Any] = [json.loads(text)]
+    except json.JSONDecodeError:
+        records = [json.loads(line) for line in text.splitlines() if line.strip()]
+    for record in records:
+        if isinstance(record, dict) and record.get("status", "ok") == "ok":
+            yield PlanResult.from_dict(record)
+
+
+def _search_query(groups: Sequence[Tuple[int, List[int]]], total: int, limit: int) -> Tuple[str, List[Any]]:
+    """Build the search SQL for word ``groups`` of ``(node count, term ids)``, rarest first."""
+    driver_count, driver = groups[0]
+    select = (
+        "SELECT o.plan_id, p.idea, o.path, n.title, n.summary, n.deliverable FROM {source}"
+        " JOIN plans p ON p.id = o.plan_id JOIN nodes n ON n.id = o.node_id"
+    )
+    # Walking nodes newest first visits about limit / selectivity rows before it can
+    # stop; starting from the rarest word visits driver_count postings, then sorts.
+    selectivity = 1.0
+    for count, _ in groups:
+        selectivity *= min(1.0, count / max(total, 1))
+    if limit < driver_count * selectivity:
+        source, checked = "occurrences o", groups
+        params: List[Any] = []
+    else:
+        source = (
+            f"(SELECT DISTINCT node_id FROM postings WHERE term_id IN ({_placeholders(driver)})) AS m"
+            " JOIN occurrences o ON o.node_id = m.node_id"
+        )
+        checked, params = groups[1:], list(driver)
+    checks = [
+        f"EXISTS (SELECT 1 FROM postings WHERE term_id IN ({_placeholders(ids)}) AND node_id = o.node_id)"
+        for _, ids in checked
+    ]
+    params.extend(term_id for _, ids in checked for term_id in ids)
+    where = f" WHERE {' AND '.join(checks)}" if checks else ""
+    return f"{select.format(source=source)}{where} ORDER BY o.plan_id DESC, o.path LIMIT ?", [*params, limit]
+
+
+def _placeholders(values: Sequence[Any]) -> str:
+    return ", ".join("?" * len(values))
+
+
+def _walk(tree: List[PlanNode]) -> Iterator[Tuple[Tuple[int, ...], PlanNode]]:
+    stack = [((index,), node) for index, node in reversed(list(enumerate(tree)))]
+    while stack:
+        path, node = stack.pop()
+        yield path, node
+        for index in range(len(node.tasks) - 1, -1, -1):
+            stack.append((path + (index,), node.tasks[index]))
+
+
+def _build_tree(rows: Iterable[Tuple[str, str, str, str]]) -> List[PlanNode]:
+    nodes: Dict[Tuple[int, ...], PlanNode] = {}
+    roots: List[PlanNode] = []
+    # Sorting numeric paths puts every parent before its children, in sibling order.
+    for path, title, summary, deliverable in sorted(rows, key=lambda row: _parse_path(row[0])):
+        key = _parse_path(path)
+        node = PlanNode(title, summary, deliverable)
+        nodes[key] = node
+        if len(key) == 1:
+            roots.append(node)
+        else:
+            nodes[key[:-1]].tasks.append(node)
+    return roots
+
+
+def _format_path(path: Tuple[int, ...]) -> str:
+    return ".".join(f"{index:0{_PATH_DIGITS}d}" for index in path)
+
+
+def _parse_path(path: str) -> Tuple[int, ...]:
+    return tuple(int(part) for part in path.split("."))
+
+
+def _digest(value: Any) -> str:
+    payload = json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+__all__ = ["ArchiveStats", "PlanArchive", "SearchHit", "load_plans", "tokenize"]
@@ -0,0 +1,153 @@
+# Author: everettjf
+"""Batch planning: run many ideas through one planner and stream results as JSONL."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Set
+
+from .planner import IdeaPlanner
+
+
+@dataclass
+class BatchSummary:
+    """Counts for one batch run; ``total`` is the sum of the other four.
+
+    ``skipped`` ideas already had a successful line in the output (when resuming) and
+    ``duplicates`` repeat an idea listed earlier in the same input.
+    """
+
+    total: int
+    skipped: int
+    succeeded: int
+    failed: int
+    duplicates: int = 0
+
+
+def load_ideas(path: Path) -> List[str]:
+    """Read ideas from a JSONL file.
+
+    Each non-blank line is either a JSON string or an object with an ``idea`` key.
+    """
+    ideas: List[str] = []
+    with path.open(encoding="utf-8") as handle:
+        for line_number, line in enumerate(handle, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"{path}:{line_number}: invalid JSON ({exc.msg})") from exc
+            idea = record.get("idea") if isinstance(record, dict) else record
+            if not isinstance(idea, str) or not idea.strip():
+                raise ValueError(f"{path}:{line_number}: expected a string or an object with an 'idea' key")
+            ideas.append(idea.strip())
+    return ideas
+
+
+def load_completed(path: Path) -> Set[str]:
+    """Return ideas that already have a successful line in ``path``.
+
+    Error lines are not counted, so failed ideas are retried on resume. A torn final
+    line left behind by an interrupted run is ignored.
+    """
+    completed: Set[str] = set()
+    if not path.exists():
+        return completed
+    with path.open(encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(record, dict) and record.get("status") == "ok":
+                completed.add(record.get("idea", ""))
+    return completed
+
+
+async def run_batch(
+    planner: IdeaPlanner,
+    ideas: Iterable[str],
+    output_path: Path,
+    workers: int = 4,
+    resume: bool = True,
+    on_record: Callable[[Dict[str, Any]], None] | None = None,
+    deadline: float | None = None,
+) -> BatchSummary:
+    """Plan every idea with up to ``workers`` in flight, appending one line per result.
+
+    Lines are written and flushed as soon as each idea finishes, in completion order.
+    Per-idea failures become ``{"status": "error"}`` lines instead of aborting the run.
+    ``deadline`` is passed to :meth:`IdeaPlanner.aplan` for each idea.
+    """
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    pending: List[str] = []
+    completed: Set[str] = load_completed(output_path) if resume else set()
+    seen: Set[str] = set()
+    skipped = duplicates = 0
+    total = 0
+    for idea in ideas:
+        total += 1
+        if idea in seen:
+            duplicates += 1
+            continue
+        seen.add(idea)
+        if idea in completed:
+            skipped += 1
+            continue
+        pending.append(idea)
+
+    queue: asyncio.Queue[str] = asyncio.Queue()
+    for idea in pending:
+        queue.put_nowait(idea)
+    counts = {"ok": 0, "error": 0}
+
+    mode = "a" if resume else "w"
+    needs_newline = resume and _ends_without_newline(output_path)
+    with output_path.open(mode, encoding="utf-8") as handle:
+        if needs_newline:
+            handle.write("\n")
+
+        async def worker() -> None:
+            while True:
+                try:
+                    idea = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    result = await planner.aplan(idea, deadline=deadline)
+                except Exception as exc:  # noqa: BLE001 - recorded per idea
+                    record: Dict[str, Any] = {
+                        "idea": idea,
+                        "status": "error",
+                        "error": f"{type(exc).__name__}: {exc}",
+                    }
+                else:
+                    record = {"idea": idea, "status": "ok", **result.to_dict()}
+                counts[record["status"]] += 1
+                handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+                handle.flush()
+                if on_record:
+                    on_record(record)
+
+        await asyncio.gather(*(worker() for _ in range(min(workers, len(pending)) or 1)))
+
+    return BatchSummary(
+        total=total, skipped=skipped, succeeded=counts["ok"], failed=counts["error"], duplicates=duplicates
+    )
+
+
+def _ends_without_newline(path: Path) -> bool:
+    if not path.exists() or path.stat().st_size == 0:
+        return False
+    with path.open("rb") as handle:
+        handle.seek(-1, 2)
+        return handle.read(1) != b"\n"
+
+
+__all__ = ["BatchSummary", "load_completed", "load_ideas", "run_batch"]
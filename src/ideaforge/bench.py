@@ -0,0 +1,355 @@
+# Author: everettjf
+"""Offline planner benchmarks driven by deterministic stand-in models."""
+
+from __future__ import annotations
+
+import asyncio
+import gc
+import hashlib
+import heapq
+import json
+import random
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, replace
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Sequence, Tuple
+
+from .planner import IdeaPlanner, PlanResult, render_tree
+
+if TYPE_CHECKING:
+    from langchain_core.messages import AIMessage, AIMessageChunk
+
+MALFORMED_MODES = ("prose", "trailing-comma", "broken")
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """Shape of the simulated workload.
+
+    Every model call sleeps ``latency`` ± ``jitter`` seconds. Each objective expands into
+    a tree ``depth`` levels deep with ``width`` children per node, and every node carries
+    ``padding`` extra characters of summary text. A ``malformed_rate`` share of responses
+    is damaged (wrapped in prose, given trailing commas, or broken so a repair round-trip
+    is needed). ``pipeline`` plans with ``IdeaPlanner(pipeline=True)``, overlapping the
+    streamed outline with objective expansion.
+    """
+
+    name: str
+    objectives: int = 4
+    width: int = 3
+    depth: int = 2
+    padding: int = 40
+    latency: float = 0.005
+    jitter: float = 0.002
+    malformed_rate: float = 0.0
+    parallel: int = 1
+    pipeline: bool = False
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in (
+        Scenario("overhead", latency=0.0, jitter=0.0),
+        Scenario("baseline"),
+        Scenario("wide", objectives=6, width=25, depth=1, padding=400),
+        Scenario("deep", objectives=3, width=3, depth=5),
+        Scenario("malformed", malformed_rate=0.5),
+        Scenario("parallel", objectives=8, latency=0.02, jitter=0.01, parallel=4),
+        Scenario("pipelined", objectives=8, latency=0.02, jitter=0.01, parallel=4, pipeline=True),
+    )
+}
+
+
+class SimulatedModel:
+    """Chat model stand-in that answers outline, ReAct and repair prompts.
+
+    Responses depend only on the scenario, the seed and the prompt, so runs are
+    reproducible; latency is simulated with ``asyncio.sleep``. :meth:`astream` spreads
+    the same latency over one chunk per outline objective, like a model writing tokens.
+    """
+
+    def __init__(self, scenario: Scenario, seed: int = 0) -> None:
+        self.scenario = scenario
+        self.seed = seed
+        self.calls = 0
+
+    async def ainvoke(self, messages: Sequence[Any], *_args: Any, **_kwargs: Any) -> AIMessage:
+        from langchain_core.messages import AIMessage
+
+        delay, text = self._respond(messages)
+        if delay:
+            await asyncio.sleep(delay)
+        return AIMessage(content=text)
+
+    async def astream(self, messages: Sequence[Any], *_args: Any, **_kwargs: Any) -> AsyncIterator[AIMessageChunk]:
+        from langchain_core.messages import AIMessageChunk
+
+        delay, text = self._respond(messages)
+        parts = max(1, self.scenario.objectives)
+        size = -(-len(text) // parts)
+        for start in range(0, len(text), size):
+            if delay:
+                await asyncio.sleep(delay / parts)
+            yield AIMessageChunk(content=text[start : start + size])
+
+    def _respond(self, messages: Sequence[Any]) -> Tuple[float, str]:
+        self.calls += 1
+        prompt = str(messages[-1].content)
+        rng = random.Random(f"{self.seed}:{hashlib.sha1(prompt.encode()).hexdigest()}")
+        scenario = self.scenario
+        delay = 0.0
+        if scenario.latency or scenario.jitter:
+            delay = max(0.0, scenario.latency + rng.uniform(-scenario.jitter, scenario.jitter))
+        if "Broken output:" in prompt:
+            text = prompt.split("Broken output:\n", 1)[1]
+            return delay, json.dumps(self._payload_for(text))
+        if "Top-level objective: " in prompt:
+            title = prompt.split("Top-level objective: ", 1)[1].split("\n", 1)[0]
+            payload: Dict[str, Any] = {
+                "analysis": [f"Thought: break down {title}", "Final: expansion ready"],
+                "tasks": self._tree(title, scenario.depth),
+            }
+        else:
+            payload = {
+                "plan": [
+                    {
+                        "title": f"Objective {index + 1}",
+                        "summary": self._padding(),
+                        "deliverable": f"Deliverable {index + 1}",
+                        "tasks": [],
+                    }
+                    for index in range(scenario.objectives)
+                ]
+            }
+        text = json.dumps(payload)
+        if rng.random() < scenario.malformed_rate:
+            text = _damage(text, rng.choice(MALFORMED_MODES))
+        return delay, text
+
+    def _payload_for(self, broken: str) -> Dict[str, Any]:
+        if '"plan"' in broken[:200]:
+            objectives = range(self.scenario.objectives)
+            return {"plan": [{"title": f"Objective {index + 1}", "tasks": []} for index in objectives]}
+        return {"analysis": ["Final: repaired"], "tasks": self._tree("Repaired", self.scenario.depth)}
+
+    def _tree(self, prefix: str, depth: int) -> List[Dict[str, Any]]:
+        if depth <= 0:
+            return []
+        return [
+            {
+                "title": f"{prefix}.{index + 1}",
+                "summary": self._padding(),
+                "deliverable": f"{prefix}.{index + 1} done",
+                "tasks": self._tree(f"{prefix}.{index + 1}", depth - 1),
+            }
+            for index in range(self.scenario.width)
+        ]
+
+    def _padding(self) -> str:
+        return ("Detail {with} braces and \"quotes\". " * (self.scenario.padding // 36 + 1))[: self.scenario.padding]
+
+
+class QuotaModel:
+    """Wraps a model with a provider-style rate limit that rejects calls over quota.
+
+    Requests are metered by a token bucket refilling ``requests_per_minute`` per minute
+    that holds ``burst_seconds`` worth of requests; a call arriving at an empty bucket
+    fails immediately with :class:`~ideaforge.ratelimit.RateLimitError` carrying the
+    time until the next request is allowed, like an HTTP 429 with ``Retry-After``.
+    """
+
+    def __init__(self, model: Any, requests_per_minute: float, burst_seconds: float = 1.0) -> None:
+        self.model = model
+        self.rate = requests_per_minute / 60
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+        self.accepted = 0
+        self.rejected = 0
+
+    async def ainvoke(self, messages: Sequence[Any], *args: Any, **kwargs: Any) -> Any:
+        from .ratelimit import RateLimitError
+
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.level < 1:
+            self.rejected += 1
+            raise RateLimitError(retry_after=(1 - self.level) / self.rate)
+        self.level -= 1
+        self.accepted += 1
+        return await self.model.ainvoke(messages, *args, **kwargs)
+
+
+def _damage(text: str, mode: str) -> str:
+    if mode == "prose":
+        return f"Thought: drafting.\nAction: emit {{final}} answer\n```json\n{text}\n```\nDone."
+    if mode == "trailing-comma":
+        return text.replace("}]", "},]", 1)
+    # Dropping every key/value colon defeats local recovery, so a repair round-trip is needed.
+    return text.replace('":', '" ')
+
+
+@dataclass
+class ScenarioReport:
+    """Aggregated measurements for one scenario; times are in milliseconds."""
+
+    scenario: str
+    runs: int
+    throughput: float
+    p50_ms: float
+    p95_ms: float
+    overhead_ms: float
+    parse_ms: float
+    render_ms: float
+    peak_memory_kb: float
+    nodes: int
+    retries: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+async def run_scenario(scenario: Scenario, runs: int = 5, seed: int = 0) -> ScenarioReport:
+    """Plan ``runs`` ideas one after another and aggregate their measurements.
+
+    Graph overhead is the run wall time minus the model and parse time on the critical
+    path (objective expansions scheduled over ``scenario.parallel`` slots, each starting
+    no earlier than its share of the outline has streamed in pipelined scenarios). Peak memory
+    comes from one extra traced run so tracing does not distort the timings.
+    """
+    if runs < 1:
+        raise ValueError("runs must be at least 1")
+    model = SimulatedModel(scenario, seed)
+    planner = IdeaPlanner(model, model, max_parallel_objectives=scenario.parallel, pipeline=scenario.pipeline)
+    latencies: List[float] = []
+    overheads: List[float] = []
+    parse_times: List[float] = []
+    render_times: List[float] = []
+    nodes = retries = 0
+    started = time.perf_counter()
+    for index in range(runs):
+        result = await planner.aplan(f"Benchmark idea {index}")
+        latencies.append(result.metrics.wall_seconds)
+        critical = _critical_model_seconds(result, scenario.parallel, scenario.pipeline)
+        overheads.append(result.metrics.wall_seconds - critical)
+        parse_times.append(result.metrics.parse_seconds)
+        render_times.append(_time_render(result))
+        nodes += sum(1 for root in result.tree for _ in root.iter_nodes())
+        retries += result.metrics.retries
+    elapsed = time.perf_counter() - started
+    return ScenarioReport(
+        scenario=scenario.name,
+        runs=runs,
+        throughput=runs / elapsed if elapsed else 0.0,
+        p50_ms=percentile(latencies, 50) * 1000,
+        p95_ms=percentile(latencies, 95) * 1000,
+        overhead_ms=percentile(overheads, 50) * 1000,
+        parse_ms=percentile(parse_times, 50) * 1000,
+        render_ms=percentile(render_times, 50) * 1000,
+        peak_memory_kb=await _peak_memory(planner) / 1024,
+        nodes=nodes // runs,
+        retries=retries,
+    )
+
+
+async def run_suite(
+    names: Sequence[str] | None = None, runs: int = 5, seed: int = 0, latency_scale: float = 1.0
+) -> List[ScenarioReport]:
+    """Run the named scenarios (all by default), optionally scaling simulated latency."""
+    selected = list(names) if names else list(SCENARIOS)
+    unknown = [name for name in selected if name not in SCENARIOS]
+    if unknown:
+        raise KeyError(f"Unknown scenario(s): {', '.join(unknown)}")
+    reports: List[ScenarioReport] = []
+    for name in selected:
+        scenario = SCENARIOS[name]
+        if latency_scale != 1.0:
+            scenario = replace(
+                scenario, latency=scenario.latency * latency_scale, jitter=scenario.jitter * latency_scale
+            )
+        reports.append(await run_scenario(scenario, runs=runs, seed=seed))
+    return reports
+
+
+def compare_reports(
+    reports: Sequence[ScenarioReport], baseline: Sequence[Dict[str, Any]], tolerance: float = 0.2
+) -> List[str]:
+    """Describe every scenario whose p50 or overhead regressed past ``tolerance`` of ``baseline``."""
+    previous = {entry["scenario"]: entry for entry in baseline}
+    regressions: List[str] = []
+    for report in reports:
+        before = previous.get(report.scenario)
+        if before is None:
+            continue
+        for key in ("p50_ms", "overhead_ms"):
+            current, reference = getattr(report, key), float(before[key])
+            # Sub-millisecond figures are dominated by timer noise.
+            if current > max(reference * (1 + tolerance), reference + 1.0):
+                regressions.append(f"{report.scenario}: {key} {reference:.2f} -> {current:.2f}")
+    return regressions
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Linearly interpolated ``q``-th percentile of ``values``."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def _critical_model_seconds(result: PlanResult, parallel: int, pipeline: bool = False) -> float:
+    nodes = result.metrics.nodes
+    if pipeline:
+        # Objective i can start once i + 1 of the n outline entries have streamed in.
+        outline = sum(node.model_seconds + node.parse_seconds for node in nodes if node.node == "plan")
+        objectives = [node for node in nodes if node.node == "react"]
+        slots = [0.0] * parallel
+        for index, node in enumerate(objectives):
+            ready = outline * (index + 1) / len(objectives)
+            heapq.heapreplace(slots, max(slots[0], ready) + node.model_seconds + node.parse_seconds)
+        rest = sum(node.model_seconds + node.parse_seconds for node in nodes if node.node not in ("plan", "react"))
+        return max(outline, *slots) + rest
+    serial = 0.0
+    slots = [0.0] * parallel
+    for node in nodes:
+        busy = node.model_seconds + node.parse_seconds
+        if node.node == "react" and parallel > 1:
+            heapq.heapreplace(slots, slots[0] + busy)
+        else:
+            serial += busy
+    return serial + max(slots)
+
+
+def _time_render(result: PlanResult) -> float:
+    started = time.perf_counter()
+    "\n".join(render_tree(result.tree))
+    json.dumps(result.to_dict())
+    return time.perf_counter() - started
+
+
+async def _peak_memory(planner: IdeaPlanner) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = await planner.aplan("Benchmark idea (memory)")
+        _time_render(result)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+__all__ = [
+    "SCENARIOS",
+    "Scenario",
+    "QuotaModel",
+    "ScenarioReport",
+    "SimulatedModel",
+    "compare_reports",
+    "percentile",
+    "run_scenario",
+    "run_suite",
+]
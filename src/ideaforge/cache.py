@@ -0,0 +1,220 @@
+# Author: everettjf
+"""Local SQLite cache for planner and ReAct model responses."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Sequence
+
+DEFAULT_MAX_ENTRIES = 10_000
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+
+
+@dataclass
+class CacheStats:
+    hits: int
+    misses: int
+    entries: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ResponseCache:
+    """Response store keyed on model identity and the exact message list.
+
+    Entries older than ``ttl_seconds`` are ignored and purged, and the least recently
+    used entries are evicted once the store grows past ``max_entries``.
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float | None = DEFAULT_TTL_SECONDS,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed_at)")
+
+    @staticmethod
+    def make_key(model_id: str, temperature: Any, messages: Sequence[Any]) -> str:
+        payload = json.dumps(
+            {"model": model_id, "temperature": temperature, "messages": [_message_key(m) for m in messages]},
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Any | None:
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or self._expired(row[1], now):
+                self.misses += 1
+                return None
+            self._connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Any) -> None:
+        now = time.time()
+        encoded = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, encoded, now, now),
+            )
+            self._evict(now)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            (entries,) = self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()
+        return CacheStats(hits=self.hits, misses=self.misses, entries=entries)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def _evict(self, now: float) -> None:
+        if self.ttl_seconds is not None:
+            self._connection.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        (entries,) = self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()
+        overflow = entries - self.max_entries
+        if overflow > 0:
+            self._connection.execute(
+                "DELETE FROM responses WHERE key IN"
+                " (SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,),
+            )
+
+
+class CachedModel:
+    """Wraps a chat model so identical requests are answered from a :class:`ResponseCache`."""
+
+    def __init__(self, model: Any, cache: ResponseCache) -> None:
+        self.model = model
+        self.cache = cache
+        self.model_id = _model_id(model)
+        self.temperature = getattr(model, "temperature", None)
+
+    def invoke(self, messages: Sequence[Any], *args: Any, **kwargs: Any) -> Any:
+        key = self._key(messages)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return _decode_response(cached)
+        response = self.model.invoke(messages, *args, **kwargs)
+        self.cache.put(key, _encode_response(response))
+        return response
+
+    async def ainvoke(self, messages: Sequence[Any], *args: Any, **kwargs: Any) -> Any:
+        key = self._key(messages)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return _decode_response(cached)
+        response = await self._ainvoke_model(messages, *args, **kwargs)
+        self.cache.put(key, _encode_response(response))
+        return response
+
+    async def astream(self, messages: Sequence[Any], *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        """Stream from the wrapped model on a miss; replay a hit as a single chunk."""
+        key = self._key(messages)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield _decode_response(cached)
+            return
+        response: Any = None
+        if hasattr(self.model, "astream"):
+            async for chunk in self.model.astream(messages, *args, **kwargs):
+                response = chunk if response is None else response + chunk
+                yield chunk
+        else:
+            response = await self._ainvoke_model(messages, *args, **kwargs)
+            yield response
+        if response is not None:
+            self.cache.put(key, _encode_response(response))
+
+    def forget(self, messages: Sequence[Any]) -> None:
+        """Drop the cached response for ``messages`` (e.g. after it failed to parse)."""
+        self.cache.delete(self._key(messages))
+
+    async def _ainvoke_model(self, messages: Sequence[Any], *args: Any, **kwargs: Any) -> Any:
+        if hasattr(self.model, "ainvoke"):
+            return await self.model.ainvoke(messages, *args, **kwargs)
+        return await asyncio.to_thread(self.model.invoke, messages, *args, **kwargs)
+
+    def _key(self, messages: Sequence[Any]) -> str:
+        return ResponseCache.make_key(self.model_id, self.temperature, messages)
+
+
+def _model_id(model: Any) -> str:
+    for attribute in ("model_name", "model"):
+        value = getattr(model, attribute, None)
+        if isinstance(value, str) and value:
+            return value
+    return type(model).__name__
+
+
+def _message_key(message: Any) -> Dict[str, Any] | str:
+    if hasattr(message, "content"):
+        return {"type": getattr(message, "type", type(message).__name__), "content": message.content}
+    return str(message)
+
+
+def _encode_response(response: Any) -> Dict[str, Any]:
+    if isinstance(response, dict):
+        return {"json": response}
+    if hasattr(response, "content"):
+        return {"content": response.content}  # type: ignore[attr-defined]
+    return {"content": str(response)}
+
+
+def _decode_response(value: Dict[str, Any]) -> Any:
+    if "json" in value:
+        return value["json"]
+    from langchain_core.messages import AIMessage
+
+    content: str | List[Any] = value["content"]
+    return AIMessage(content=content, response_metadata={"cache_hit": True})
+
+
+__all__ = ["CacheStats", "CachedModel", "ResponseCache"]
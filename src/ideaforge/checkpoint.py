@@ -0,0 +1,304 @@
+# Author: everettjf
+"""SQLite-backed LangGraph checkpointer so interrupted plans can be resumed."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    SerializerProtocol,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS checkpoints ("
+    " thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, checkpoint_id TEXT NOT NULL,"
+    " parent_checkpoint_id TEXT, type TEXT NOT NULL, checkpoint BLOB NOT NULL,"
+    " metadata_type TEXT NOT NULL, metadata BLOB NOT NULL,"
+    " PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id))",
+    "CREATE TABLE IF NOT EXISTS blobs ("
+    " thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, channel TEXT NOT NULL, version TEXT NOT NULL,"
+    " type TEXT NOT NULL, value BLOB,"
+    " PRIMARY KEY (thread_id, checkpoint_ns, channel, version))",
+    "CREATE TABLE IF NOT EXISTS writes ("
+    " thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, checkpoint_id TEXT NOT NULL,"
+    " task_id TEXT NOT NULL, idx INTEGER NOT NULL, channel TEXT NOT NULL, type TEXT NOT NULL,"
+    " value BLOB, task_path TEXT NOT NULL DEFAULT '',"
+    " PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx))",
+)
+
+
+class SqliteCheckpointSaver(BaseCheckpointSaver[str]):
+    """Durable checkpointer storing every graph step in a local SQLite file.
+
+    Mirrors LangGraph's in-memory saver: channel values are stored once per version and
+    pending writes of finished tasks are kept, so a resumed run only re-executes the
+    steps that had not completed.
+    """
+
+    def __init__(self, path: Path | str, *, serde: SerializerProtocol | None = None) -> None:
+        super().__init__(serde=serde)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        with self._connection:
+            for statement in _SCHEMA:
+                self._connection.execute(statement)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        thread_id: str = config["configurable"]["thread_id"]
+        checkpoint_ns: str = config["configurable"].get("checkpoint_ns", "")
+        query = (
+            "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata"
+            " FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?"
+        )
+        params: Tuple[Any, ...] = (thread_id, checkpoint_ns)
+        if checkpoint_id := get_checkpoint_id(config):
+            query += " AND checkpoint_id = ?"
+            params += (checkpoint_id,)
+        else:
+            query += " ORDER BY checkpoint_id DESC LIMIT 1"
+        with self._lock:
+            row = self._connection.execute(query, params).fetchone()
+            if row is None:
+                return None
+            return self._to_tuple(thread_id, checkpoint_ns, row)
+
+    def list(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: Dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> Iterator[CheckpointTuple]:
+        query = (
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id,"
+            " type, checkpoint, metadata_type, metadata FROM checkpoints WHERE 1 = 1"
+        )
+        params: Tuple[Any, ...] = ()
+        if config:
+            query += " AND thread_id = ?"
+            params += (config["configurable"]["thread_id"],)
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                query += " AND checkpoint_ns = ?"
+                params += (checkpoint_ns,)
+            if checkpoint_id := get_checkpoint_id(config):
+                query += " AND checkpoint_id = ?"
+                params += (checkpoint_id,)
+        if before and (before_id := get_checkpoint_id(before)):
+            query += " AND checkpoint_id < ?"
+            params += (before_id,)
+        query += " ORDER BY checkpoint_id DESC"
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+            results: List[CheckpointTuple] = []
+            for thread_id, checkpoint_ns, *row in rows:
+                if limit is not None and len(results) >= limit:
+                    break
+                metadata = self.serde.loads_typed((row[4], row[5]))
+                if filter and not all(metadata.get(key) == value for key, value in filter.items()):
+                    continue
+                results.append(self._to_tuple(thread_id, checkpoint_ns, row))
+        yield from results
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        stored = checkpoint.copy()
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        values: Dict[str, Any] = stored.pop("channel_values")  # type: ignore[misc]
+        blob_rows = []
+        for channel, version in new_versions.items():
+            value_type, value = (
+                self.serde.dumps_typed(values[channel]) if channel in values else ("empty", None)
+            )
+            blob_rows.append((thread_id, checkpoint_ns, channel, str(version), value_type, value))
+        checkpoint_type, checkpoint_blob = self.serde.dumps_typed(stored)
+        metadata_type, metadata_blob = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        with self._lock, self._connection:
+            self._connection.executemany("INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?)", blob_rows)
+            self._connection.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id,
+                    checkpoint_ns,
+                    checkpoint["id"],
+                    config["configurable"].get("checkpoint_id"),
+                    checkpoint_type,
+                    checkpoint_blob,
+                    metadata_type,
+                    metadata_blob,
+                ),
+            )
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        rows = []
+        for index, (channel, value) in enumerate(writes):
+            value_type, blob = self.serde.dumps_typed(value)
+            rows.append(
+                (
+                    thread_id,
+                    checkpoint_ns,
+                    checkpoint_id,
+                    task_id,
+                    WRITES_IDX_MAP.get(channel, index),
+                    channel,
+                    value_type,
+                    blob,
+                    task_path,
+                )
+            )
+        # Regular writes are kept from the first attempt; special writes (errors, ...) are replaced.
+        regular = [row for row in rows if row[4] >= 0]
+        special = [row for row in rows if row[4] < 0]
+        with self._lock, self._connection:
+            self._connection.executemany("INSERT OR IGNORE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", regular)
+            self._connection.executemany("INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", special)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock, self._connection:
+            for table in ("checkpoints", "blobs", "writes"):
+                self._connection.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: Dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def get_next_version(self, current: str | None, channel: None) -> str:
+        if current is None:
+            current_version = 0
+        elif isinstance(current, int):
+            current_version = current
+        else:
+            current_version = int(current.split(".")[0])
+        return f"{current_version + 1:032}.{random.random():016}"
+
+    def _to_tuple(self, thread_id: str, checkpoint_ns: str, row: Sequence[Any]) -> CheckpointTuple:
+        checkpoint_id, parent_checkpoint_id, checkpoint_type, checkpoint_blob, metadata_type, metadata_blob = row
+        checkpoint: Checkpoint = self.serde.loads_typed((checkpoint_type, checkpoint_blob))
+        writes = self._connection.execute(
+            "SELECT task_id, channel, type, value FROM writes"
+            " WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?"
+            " ORDER BY task_path, task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={
+                **checkpoint,
+                "channel_values": self._load_blobs(thread_id, checkpoint_ns, checkpoint["channel_versions"]),
+            },
+            metadata=self.serde.loads_typed((metadata_type, metadata_blob)),
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed((value_type, value)))
+                for task_id, channel, value_type, value in writes
+            ],
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            ),
+        )
+
+    def _load_blobs(self, thread_id: str, checkpoint_ns: str, versions: ChannelVersions) -> Dict[str, Any]:
+        values: Dict[str, Any] = {}
+        for channel, version in versions.items():
+            row = self._connection.execute(
+                "SELECT type, value FROM blobs"
+                " WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                (thread_id, checkpoint_ns, channel, str(version)),
+            ).fetchone()
+            if row is None or row[0] == "empty":
+                continue
+            values[channel] = self.serde.loads_typed((row[0], row[1]))
+        return values
+
+
+__all__ = ["SqliteCheckpointSaver"]
@@ -3,25 +3,55 @@
 
 from __future__ import annotations
 
+import asyncio
+import json
 import os
 import sys
-from typing import Optional
+import time
+import uuid
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence
 
 import typer
-from langchain_openai import ChatOpenAI
 from rich.console import Console
+from rich.markup import escape
 from rich.panel import Panel
+from rich.progress import BarColumn, MofNCompleteColumn, Progress, TextColumn, TimeElapsedColumn
+from rich.table import Table
 
-from .planner import IdeaPlanner, PlanNode, PlanResult
+from .archive import PlanArchive, load_plans
+from .batch import load_completed, load_ideas, run_batch
+from .bench import SCENARIOS, compare_reports, run_suite
+from .cache import CachedModel, ResponseCache
+from .dedupe import DEFAULT_THRESHOLD
+from .events import EventCallback, NodeCompleted, PlanEvent
+from .expansion import ExpansionBudget
+from .planner import IdeaPlanner, PlanNode, PlanResult, ProgressCallback, render_tree
+from .prompts import PROMPT_VERSION
+from .ratelimit import PRIORITY_OUTLINE, RateLimits, RateLimitScheduler, ScheduledModel
+from .server import DEFAULT_HOST, DEFAULT_PORT, PlanService, start_server
+
+# The OpenAI client and the LangGraph checkpointer are imported only by the commands that
+# use them, so `--help` and offline commands start without loading the LangChain stack.
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+
+    from .checkpoint import SqliteCheckpointSaver
 
 cli_app = typer.Typer(help="Generate launch-ready TODO trees for product ideas.")
 console = Console()
 
+_ROOT_OPTIONS = ("--help", "--install-completion", "--show-completion")
+
 
-def _build_model(model: str, temperature: float, api_key: Optional[str]) -> ChatOpenAI:
-    kwargs = {"model": model, "temperature": temperature}
+def _build_model(model: str, temperature: float, api_key: Optional[str], retries: Optional[int] = None) -> ChatOpenAI:
+    from langchain_openai import ChatOpenAI
+
+    kwargs: Dict[str, Any] = {"model": model, "temperature": temperature}
     if api_key:
         kwargs["api_key"] = api_key
+    if retries is not None:
+        kwargs["max_retries"] = retries
     return ChatOpenAI(**kwargs)
 
 
@@ -31,28 +61,79 @@ def _build_planner(
     temperature: float,
     react_temperature: Optional[float],
     api_key: str,
+    max_parallel_objectives: int = 1,
+    cache: Optional[ResponseCache] = None,
+    checkpointer: Optional[SqliteCheckpointSaver] = None,
+    repair_model: Optional[str] = None,
+    repair_attempts: int = 2,
+    expansion_budget: Optional[ExpansionBudget] = None,
+    dedupe_threshold: Optional[float] = None,
+    scheduler: Optional[RateLimitScheduler] = None,
+    cascade_models: Sequence[str] = (),
+    cascade_min_tasks: int = 2,
+    pipeline: bool = False,
 ) -> IdeaPlanner:
-    planner_llm = _build_model(plan_model, temperature, api_key)
-    executor_llm = _build_model(react_model or plan_model, react_temperature or min(0.6, temperature + 0.2), api_key)
-    return IdeaPlanner(planner_llm, executor_llm)
+    # With a scheduler, 429s must reach it instead of being retried blindly by the client.
+    retries = 0 if scheduler is not None else None
+    planner_llm: Any = _build_model(plan_model, temperature, api_key, retries)
+    execute_temperature = react_temperature or min(0.6, temperature + 0.2)
+    executor_llm: Any = _build_model(react_model or plan_model, execute_temperature, api_key, retries)
+    repair_llm: Any = _build_model(repair_model, 0.0, api_key, retries) if repair_model else None
+    cascade_llms: List[Any] = [_build_model(name, execute_temperature, api_key, retries) for name in cascade_models]
+    if scheduler is not None:
+        planner_llm = ScheduledModel(planner_llm, scheduler, priority=PRIORITY_OUTLINE)
+        executor_llm = ScheduledModel(executor_llm, scheduler)
+        cascade_llms = [ScheduledModel(llm, scheduler) for llm in cascade_llms]
+        if repair_llm is not None:
+            repair_llm = ScheduledModel(repair_llm, scheduler)
+    if cache is not None:
+        planner_llm = CachedModel(planner_llm, cache)
+        executor_llm = CachedModel(executor_llm, cache)
+        cascade_llms = [CachedModel(llm, cache) for llm in cascade_llms]
+        if repair_llm is not None:
+            repair_llm = CachedModel(repair_llm, cache)
+    return IdeaPlanner(
+        planner_llm,
+        executor_llm,
+        max_parallel_objectives=max_parallel_objectives,
+        checkpointer=checkpointer,
+        repair_model=repair_llm,
+        max_repair_attempts=repair_attempts,
+        expansion_budget=expansion_budget,
+        dedupe_threshold=dedupe_threshold,
+        cascade_models=cascade_llms,
+        cascade_min_tasks=cascade_min_tasks,
+        pipeline=pipeline,
+    )
 
 
-def _render_tree(tree: list[PlanNode]) -> str:
-    lines: list[str] = []
-    for index, node in enumerate(tree):
-        lines.extend(node.render(is_last=index == len(tree) - 1))
-    return "\n".join(lines)
+def _expansion_budget(
+    depth: Optional[int], max_nodes: int, max_tokens: Optional[int], time_budget: Optional[float]
+) -> Optional[ExpansionBudget]:
+    if depth is None:
+        return None
+    return ExpansionBudget(max_depth=depth, max_nodes=max_nodes, max_tokens=max_tokens, max_seconds=time_budget)
 
 
-@cli_app.command(name="plan")
-def plan_command(
-    idea: str = typer.Argument(..., help="One-line description of the product idea."),
-    plan_model: str = typer.Option("gpt-4o-mini", help="Model used for the planning pass."),
-    react_model: Optional[str] = typer.Option(None, help="Optional override for the ReAct execution model."),
-    temperature: float = typer.Option(0.2, help="Base temperature for plan generation."),
-    react_temperature: Optional[float] = typer.Option(None, help="Temperature for the execute/ReAct stage."),
-    show_analysis: bool = typer.Option(True, help="Display ReAct reasoning traces."),
-) -> None:
+def _rate_scheduler(rpm: Optional[float], tpm: Optional[float], max_concurrency: int) -> Optional[RateLimitScheduler]:
+    if rpm is None and tpm is None:
+        return None
+    limits = RateLimits(requests_per_minute=rpm, tokens_per_minute=tpm, max_concurrency=max_concurrency)
+    return RateLimitScheduler(limits)
+
+
+def _report_scheduler(scheduler: Optional[RateLimitScheduler]) -> None:
+    if scheduler is None:
+        return
+    stats = scheduler.stats()
+    console.print(
+        f"[dim]Rate limits: {stats.calls} calls, {stats.rate_limited} rate-limited, "
+        f"{stats.wait_seconds:.1f}s queued, concurrency {stats.concurrency_limit:.1f} "
+        f"(peak {stats.peak_in_flight})[/dim]"
+    )
+
+
+def _resolve_api_key() -> str:
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         console.print("[bold yellow]OPENAI_API_KEY is not set. Enter it now to continue.[/bold yellow]")
@@ -61,9 +142,142 @@ def plan_command(
             console.print("[bold red]An OpenAI API key is required to run IdeaForge.")
             raise typer.Exit(code=1)
         os.environ["OPENAI_API_KEY"] = api_key
+    return api_key
 
-    planner = _build_planner(plan_model, react_model, temperature, react_temperature, api_key)
-    console.print(Panel.fit(f"Idea: {idea}", title="IdeaForge", border_style="cyan"))
+
+def _open_cache(cache_dir: Optional[Path], no_cache: bool) -> Optional[ResponseCache]:
+    if no_cache or cache_dir is None:
+        return None
+    return ResponseCache(cache_dir.expanduser() / "responses.sqlite3")
+
+
+def _open_archive(archive_dir: Path) -> PlanArchive:
+    return PlanArchive(archive_dir.expanduser() / "plans.sqlite3")
+
+
+def _archive_result(archive_dir: Optional[Path], result: PlanResult) -> None:
+    if archive_dir is None:
+        return
+    archive = _open_archive(archive_dir)
+    try:
+        plan_id, added = archive.add(result)
+    finally:
+        archive.close()
+    console.print(f"[dim]{'Archived' if added else 'Already archived'} as plan {plan_id}[/dim]")
+
+
+def _report_cache(cache: Optional[ResponseCache]) -> None:
+    if cache is None:
+        return
+    stats = cache.stats()
+    console.print(
+        f"[dim]Cache: {stats.hits} hits, {stats.misses} misses, {stats.entries} entries ({cache.path})[/dim]"
+    )
+
+
+def _report_repairs(result: PlanResult) -> None:
+    if not result.repairs:
+        return
+    details = ", ".join(
+        f"{repair.title or 'objective'} ({repair.attempts} attempt{'s' if repair.attempts > 1 else ''})"
+        for repair in result.repairs
+    )
+    console.print(f"[dim]Repaired {len(result.repairs)} malformed responses: {escape(details)}[/dim]")
+
+
+def _report_expansion(result: PlanResult) -> None:
+    outcome = result.expansion
+    if outcome is None:
+        return
+    message = (
+        f"Deepened {outcome.expanded} tasks (+{outcome.added} nodes, {outcome.tokens} tokens, {outcome.seconds:.1f}s)"
+    )
+    if outcome.failed:
+        message += f", {outcome.failed} failed"
+    if outcome.stop_reason != "complete":
+        message += f"; stopped on the {outcome.stop_reason} budget with {outcome.pending} tasks left"
+    console.print(f"[dim]{message}[/dim]")
+
+
+def _report_duplicates(result: PlanResult) -> None:
+    if not result.duplicates:
+        return
+    titles = ", ".join(duplicate.title for duplicate in result.duplicates)
+    console.print(f"[dim]Merged {len(result.duplicates)} duplicate tasks: {escape(titles)}[/dim]")
+
+
+def _report_cascade(result: PlanResult, cascade_models: Optional[List[str]]) -> None:
+    rates = result.metrics.tier_hit_rates
+    if not cascade_models or not rates:
+        return
+    names = [*cascade_models, "ReAct model"]
+    details = ", ".join(f"{names[tier]} {rate:.0%}" for tier, rate in enumerate(rates))
+    console.print(f"[dim]Cascade hit rates: {escape(details)}[/dim]")
+
+
+def _report_incomplete(result: PlanResult) -> None:
+    if not result.incomplete:
+        return
+    numbers = ", ".join(str(index + 1) for index in result.incomplete)
+    console.print(f"[bold yellow]Deadline reached: objectives {numbers} left incomplete[/bold yellow]")
+
+
+def _print_profile(result: PlanResult) -> None:
+    metrics = result.metrics
+    table = Table(title="Planning profile", title_style="bold", show_footer=True, footer_style="bold")
+    table.add_column("Node", footer="Total", no_wrap=True)
+    table.add_column("Title")
+    table.add_column("Wall", justify="right", footer=f"{metrics.wall_seconds:.2f}s")
+    table.add_column("Model", justify="right", footer=f"{metrics.model_seconds:.2f}s")
+    table.add_column("Parse", justify="right", footer=f"{metrics.parse_seconds * 1000:.1f}ms")
+    table.add_column("Calls", justify="right", footer=str(sum(node.model_calls for node in metrics.nodes)))
+    table.add_column("In tok", justify="right", footer=str(metrics.prompt_tokens))
+    table.add_column("Cached", justify="right", footer=f"{metrics.cache_hit_rate:.0%}")
+    table.add_column("Out tok", justify="right", footer=str(metrics.completion_tokens))
+    table.add_column("Retry", justify="right", footer=str(metrics.retries))
+    for node in metrics.nodes:
+        label = node.node + "".join(f" #{index + 1}" for index in node.path)
+        table.add_row(
+            label,
+            escape(node.title),
+            f"{node.wall_seconds:.2f}s",
+            f"{node.model_seconds:.2f}s",
+            f"{node.parse_seconds * 1000:.1f}ms",
+            str(node.model_calls),
+            str(node.prompt_tokens),
+            str(node.cached_tokens),
+            str(node.completion_tokens),
+            str(node.retries),
+        )
+    console.print(table)
+
+
+def _write_metrics(result: PlanResult, metrics_out: Optional[Path]) -> None:
+    if metrics_out is None:
+        return
+    payload = {"run_id": result.run_id, "prompt_version": PROMPT_VERSION, **result.metrics.to_dict()}
+    metrics_out.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+    console.print(f"[dim]Metrics written to {metrics_out}[/dim]")
+
+
+def _write_plan(result: PlanResult, out: Optional[Path]) -> None:
+    if out is None:
+        return
+    out.write_text(json.dumps(result.to_dict(), ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    console.print(f"[dim]Plan written to {out}[/dim]")
+
+
+def _open_checkpointer(checkpoint_dir: Optional[Path]) -> Optional[SqliteCheckpointSaver]:
+    if checkpoint_dir is None:
+        return None
+    from .checkpoint import SqliteCheckpointSaver
+
+    return SqliteCheckpointSaver(checkpoint_dir.expanduser() / "checkpoints.sqlite3")
+
+
+def _run_with_status(
+    run: Callable[[ProgressCallback, Optional[EventCallback]], PlanResult], stream: bool = True
+) -> PlanResult:
     progress_log: list[str] = []
 
     def handle_progress(message: str) -> None:
@@ -74,17 +288,618 @@ def plan_command(
             progress_log.append(message)
             status.console.print(f"[bold cyan]Working[/bold cyan] {message}")
 
+    def handle_event(event: PlanEvent) -> None:
+        if isinstance(event, NodeCompleted):
+            status.console.print(_format_node_event(event), highlight=False)
+
     with console.status("[bold cyan]Working[/bold cyan] Generating roadmap...", spinner="dots") as status:
-        result: PlanResult = planner.plan(idea, progress=handle_progress)
+        return run(handle_progress, handle_event if stream else None)
+
+
+def _format_node_event(event: NodeCompleted) -> str:
+    number = ".".join(str(index + 1) for index in event.path)
+    headline = event.node.title
+    if event.node.deliverable:
+        headline += f" → {event.node.deliverable}"
+    indent = "  " * (event.depth - 1)
+    return f"{indent}[green]✓[/green] [dim]{number}[/dim] {escape(headline)}"
+
+
+def _print_result(result: PlanResult, show_analysis: bool) -> None:
     console.print(Panel(_render_tree(result.tree), title="Launch TODO Tree", border_style="green"))
     if show_analysis and result.analyses:
         analysis_text = "\n".join(f"- {entry}" for entry in result.analyses)
         console.print(Panel(analysis_text, title="ReAct Analysis", border_style="magenta"))
 
 
+def _render_tree(tree: list[PlanNode]) -> str:
+    return "\n".join(render_tree(tree))
+
+
+# Options shared by plan, resume, batch and serve (and partly refine). Declaring each once keeps
+# their flags, defaults and help text from drifting apart between the commands.
+_PLAN_MODEL_OPTION = typer.Option("gpt-4o-mini", help="Model used for the planning pass.")
+_REACT_MODEL_OPTION = typer.Option(None, help="Optional override for the ReAct execution model.")
+_TEMPERATURE_OPTION = typer.Option(0.2, help="Base temperature for plan generation.")
+_REACT_TEMPERATURE_OPTION = typer.Option(None, help="Temperature for the execute/ReAct stage.")
+_SHOW_ANALYSIS_OPTION = typer.Option(True, help="Display ReAct reasoning traces.")
+_STREAM_OPTION = typer.Option(True, help="Stream model output and print tree nodes as they complete.")
+_PARALLEL_OPTION = typer.Option(1, "--parallel", min=1, help="Expand up to N top-level objectives concurrently.")
+_CACHE_DIR_OPTION = typer.Option(
+    None, "--cache-dir", envvar="IDEAFORGE_CACHE_DIR", help="Cache model responses in this directory."
+)
+_NO_CACHE_OPTION = typer.Option(False, "--no-cache", help="Disable the response cache even if configured.")
+_ARCHIVE_DIR_OPTION = typer.Option(
+    None, "--archive-dir", envvar="IDEAFORGE_ARCHIVE_DIR", help="Add finished plans to the archive here."
+)
+_REPAIR_MODEL_OPTION = typer.Option(
+    None, "--repair-model", help="Model that fixes malformed JSON responses (defaults to the stage model)."
+)
+_REPAIR_ATTEMPTS_OPTION = typer.Option(
+    2, "--repair-attempts", min=0, help="Repair round-trips per malformed response before failing."
+)
+_DEPTH_OPTION = typer.Option(None, "--depth", min=1, help="Break leaf tasks down until the tree is N levels deep.")
+_MAX_NODES_OPTION = typer.Option(200, "--max-nodes", min=1, help="Stop deepening once the tree has N nodes.")
+_MAX_TOKENS_OPTION = typer.Option(
+    None, "--max-tokens", min=0, help="Stop deepening after spending N model tokens on it."
+)
+_TIME_BUDGET_OPTION = typer.Option(
+    None, "--time-budget", min=0.0, help="Stop deepening after N seconds, keeping what is done."
+)
+_DEDUPE_OPTION = typer.Option(False, "--dedupe", help="Merge near-duplicate tasks of the finished plan.")
+_DEDUPE_THRESHOLD_OPTION = typer.Option(
+    DEFAULT_THRESHOLD, "--dedupe-threshold", min=0.01, max=1.0, help="Similarity at which --dedupe merges tasks."
+)
+_RPM_OPTION = typer.Option(
+    None, "--rpm", min=0.01, help="Provider requests-per-minute quota; calls queue locally to stay under it."
+)
+_TPM_OPTION = typer.Option(None, "--tpm", min=1.0, help="Provider tokens-per-minute quota.")
+_MAX_CONCURRENCY_OPTION = typer.Option(
+    16, "--max-concurrency", min=1, help="Upper bound on model calls in flight when --rpm/--tpm is set."
+)
+_CASCADE_MODEL_OPTION = typer.Option(
+    None, "--cascade-model", help="Cheaper model tried before the ReAct model (repeatable, cheapest first)."
+)
+_CASCADE_MIN_TASKS_OPTION = typer.Option(
+    2, "--cascade-min-tasks", min=1, help="Fewest tasks a cascade model's answer may have to be accepted."
+)
+_PIPELINE_OPTION = typer.Option(False, "--pipeline", help="Expand objectives while the outline is still streaming in.")
+_DEADLINE_OPTION = typer.Option(
+    None, "--deadline", min=0.01, help="Return a partial plan after N seconds, marking unfinished objectives."
+)
+_PROFILE_OPTION = typer.Option(False, "--profile", help="Print per-node latency, token and retry metrics.")
+_METRICS_OUT_OPTION = typer.Option(
+    None, "--metrics-out", dir_okay=False, help="Write per-node metrics to this JSON file."
+)
+
+
+@cli_app.command(name="plan")
+def plan_command(
+    idea: str = typer.Argument(..., help="One-line description of the product idea."),
+    plan_model: str = _PLAN_MODEL_OPTION,
+    react_model: Optional[str] = _REACT_MODEL_OPTION,
+    temperature: float = _TEMPERATURE_OPTION,
+    react_temperature: Optional[float] = _REACT_TEMPERATURE_OPTION,
+    show_analysis: bool = _SHOW_ANALYSIS_OPTION,
+    stream: bool = _STREAM_OPTION,
+    parallel: int = _PARALLEL_OPTION,
+    cache_dir: Optional[Path] = _CACHE_DIR_OPTION,
+    no_cache: bool = _NO_CACHE_OPTION,
+    archive_dir: Optional[Path] = _ARCHIVE_DIR_OPTION,
+    repair_model: Optional[str] = _REPAIR_MODEL_OPTION,
+    repair_attempts: int = _REPAIR_ATTEMPTS_OPTION,
+    depth: Optional[int] = _DEPTH_OPTION,
+    max_nodes: int = _MAX_NODES_OPTION,
+    max_tokens: Optional[int] = _MAX_TOKENS_OPTION,
+    time_budget: Optional[float] = _TIME_BUDGET_OPTION,
+    dedupe: bool = _DEDUPE_OPTION,
+    dedupe_threshold: float = _DEDUPE_THRESHOLD_OPTION,
+    rpm: Optional[float] = _RPM_OPTION,
+    tpm: Optional[float] = _TPM_OPTION,
+    max_concurrency: int = _MAX_CONCURRENCY_OPTION,
+    cascade_model: Optional[List[str]] = _CASCADE_MODEL_OPTION,
+    cascade_min_tasks: int = _CASCADE_MIN_TASKS_OPTION,
+    pipeline: bool = _PIPELINE_OPTION,
+    deadline: Optional[float] = _DEADLINE_OPTION,
+    profile: bool = _PROFILE_OPTION,
+    metrics_out: Optional[Path] = _METRICS_OUT_OPTION,
+    out: Optional[Path] = typer.Option(
+        None, "--out", dir_okay=False, help="Save the plan as JSON (for `ideaforge refine`)."
+    ),
+    checkpoint_dir: Optional[Path] = typer.Option(
+        None,
+        "--checkpoint-dir",
+        envvar="IDEAFORGE_CHECKPOINT_DIR",
+        help="Persist every planning step here so a failed run can be resumed.",
+    ),
+) -> None:
+    """Plan a single idea and print the launch TODO tree."""
+    api_key = _resolve_api_key()
+    cache = _open_cache(cache_dir, no_cache)
+    scheduler = _rate_scheduler(rpm, tpm, max_concurrency)
+    checkpointer = _open_checkpointer(checkpoint_dir)
+    planner = _build_planner(
+        plan_model,
+        react_model,
+        temperature,
+        react_temperature,
+        api_key,
+        parallel,
+        cache=cache,
+        checkpointer=checkpointer,
+        repair_model=repair_model,
+        repair_attempts=repair_attempts,
+        expansion_budget=_expansion_budget(depth, max_nodes, max_tokens, time_budget),
+        dedupe_threshold=dedupe_threshold if dedupe else None,
+        scheduler=scheduler,
+        cascade_models=cascade_model or (),
+        cascade_min_tasks=cascade_min_tasks,
+        pipeline=pipeline,
+    )
+    console.print(Panel.fit(f"Idea: {idea}", title="IdeaForge", border_style="cyan"))
+    run_id = uuid.uuid4().hex if checkpointer is not None else None
+    try:
+        result = _run_with_status(
+            lambda progress, on_event: planner.plan(
+                idea, progress=progress, run_id=run_id, on_event=on_event, deadline=deadline
+            ),
+            stream,
+        )
+    except Exception:
+        if run_id is not None:
+            console.print(f"[bold yellow]Planning stopped. Continue with:[/bold yellow] ideaforge resume {run_id}")
+        raise
+    _print_result(result, show_analysis)
+    _report_repairs(result)
+    _report_expansion(result)
+    _report_duplicates(result)
+    _report_cascade(result, cascade_model)
+    _report_incomplete(result)
+    if profile:
+        _print_profile(result)
+    _write_metrics(result, metrics_out)
+    _write_plan(result, out)
+    _archive_result(archive_dir, result)
+    _report_cache(cache)
+    _report_scheduler(scheduler)
+
+
+@cli_app.command(name="resume")
+def resume_command(
+    run_id: str = typer.Argument(..., help="Run id printed by an interrupted `ideaforge plan`."),
+    checkpoint_dir: Path = typer.Option(
+        ...,
+        "--checkpoint-dir",
+        envvar="IDEAFORGE_CHECKPOINT_DIR",
+        help="Directory that holds the run's checkpoints.",
+    ),
+    plan_model: str = _PLAN_MODEL_OPTION,
+    react_model: Optional[str] = _REACT_MODEL_OPTION,
+    temperature: float = _TEMPERATURE_OPTION,
+    react_temperature: Optional[float] = _REACT_TEMPERATURE_OPTION,
+    show_analysis: bool = _SHOW_ANALYSIS_OPTION,
+    stream: bool = _STREAM_OPTION,
+    parallel: int = _PARALLEL_OPTION,
+    cache_dir: Optional[Path] = _CACHE_DIR_OPTION,
+    no_cache: bool = _NO_CACHE_OPTION,
+    archive_dir: Optional[Path] = _ARCHIVE_DIR_OPTION,
+    repair_model: Optional[str] = _REPAIR_MODEL_OPTION,
+    repair_attempts: int = _REPAIR_ATTEMPTS_OPTION,
+    depth: Optional[int] = _DEPTH_OPTION,
+    max_nodes: int = _MAX_NODES_OPTION,
+    max_tokens: Optional[int] = _MAX_TOKENS_OPTION,
+    time_budget: Optional[float] = _TIME_BUDGET_OPTION,
+    dedupe: bool = _DEDUPE_OPTION,
+    dedupe_threshold: float = _DEDUPE_THRESHOLD_OPTION,
+    rpm: Optional[float] = _RPM_OPTION,
+    tpm: Optional[float] = _TPM_OPTION,
+    max_concurrency: int = _MAX_CONCURRENCY_OPTION,
+    cascade_model: Optional[List[str]] = _CASCADE_MODEL_OPTION,
+    cascade_min_tasks: int = _CASCADE_MIN_TASKS_OPTION,
+    pipeline: bool = _PIPELINE_OPTION,
+    profile: bool = _PROFILE_OPTION,
+    metrics_out: Optional[Path] = _METRICS_OUT_OPTION,
+    out: Optional[Path] = typer.Option(
+        None, "--out", dir_okay=False, help="Save the plan as JSON (for `ideaforge refine`)."
+    ),
+) -> None:
+    """Continue an interrupted plan from its last completed objective."""
+    api_key = _resolve_api_key()
+    cache = _open_cache(cache_dir, no_cache)
+    scheduler = _rate_scheduler(rpm, tpm, max_concurrency)
+    planner = _build_planner(
+        plan_model,
+        react_model,
+        temperature,
+        react_temperature,
+        api_key,
+        parallel,
+        cache=cache,
+        checkpointer=_open_checkpointer(checkpoint_dir),
+        repair_model=repair_model,
+        repair_attempts=repair_attempts,
+        expansion_budget=_expansion_budget(depth, max_nodes, max_tokens, time_budget),
+        dedupe_threshold=dedupe_threshold if dedupe else None,
+        scheduler=scheduler,
+        cascade_models=cascade_model or (),
+        cascade_min_tasks=cascade_min_tasks,
+        pipeline=pipeline,
+    )
+    try:
+        result = _run_with_status(
+            lambda progress, on_event: planner.resume(run_id, progress=progress, on_event=on_event), stream
+        )
+    except KeyError as exc:
+        console.print(f"[bold red]No checkpointed run {run_id} in {checkpoint_dir}")
+        raise typer.Exit(code=1) from exc
+    _print_result(result, show_analysis)
+    _report_repairs(result)
+    _report_expansion(result)
+    _report_duplicates(result)
+    _report_cascade(result, cascade_model)
+    _report_incomplete(result)
+    if profile:
+        _print_profile(result)
+    _write_metrics(result, metrics_out)
+    _write_plan(result, out)
+    _archive_result(archive_dir, result)
+    _report_cache(cache)
+    _report_scheduler(scheduler)
+
+
+@cli_app.command(name="refine")
+def refine_command(
+    plan_file: Path = typer.Argument(..., exists=True, dir_okay=False, help="Plan JSON saved with `plan --out`."),
+    objective: int = typer.Option(..., "--objective", min=1, help="Number of the top-level objective to redo."),
+    feedback: str = typer.Option(..., "--feedback", prompt=True, help="What to change about that objective."),
+    out: Optional[Path] = typer.Option(
+        None, "--out", dir_okay=False, help="Where to write the updated plan (defaults to PLAN_FILE)."
+    ),
+    react_model: str = typer.Option("gpt-4o-mini", help="Model used for the ReAct expansion."),
+    react_temperature: float = typer.Option(0.4, help="Temperature for the execute/ReAct stage."),
+    show_analysis: bool = _SHOW_ANALYSIS_OPTION,
+    stream: bool = _STREAM_OPTION,
+    cache_dir: Optional[Path] = _CACHE_DIR_OPTION,
+    no_cache: bool = _NO_CACHE_OPTION,
+    archive_dir: Optional[Path] = _ARCHIVE_DIR_OPTION,
+    repair_model: Optional[str] = _REPAIR_MODEL_OPTION,
+    repair_attempts: int = _REPAIR_ATTEMPTS_OPTION,
+    profile: bool = _PROFILE_OPTION,
+) -> None:
+    """Redo one objective of a saved plan with feedback, keeping the rest of the tree."""
+    try:
+        saved = PlanResult.from_dict(json.loads(plan_file.read_text(encoding="utf-8")))
+    except ValueError as exc:
+        console.print(f"[bold red]Cannot read plan {plan_file}: {exc}")
+        raise typer.Exit(code=1) from exc
+    if objective > len(saved.tree):
+        console.print(f"[bold red]{plan_file} has {len(saved.tree)} objectives; there is no objective {objective}.")
+        raise typer.Exit(code=1)
+    if not saved.idea:
+        console.print(f"[bold red]{plan_file} does not record its idea; save plans with `ideaforge plan --out`.")
+        raise typer.Exit(code=1)
+
+    api_key = _resolve_api_key()
+    cache = _open_cache(cache_dir, no_cache)
+    # Only the ReAct stage runs, so the outline model is never called.
+    planner = _build_planner(
+        react_model,
+        react_model,
+        react_temperature,
+        react_temperature,
+        api_key,
+        cache=cache,
+        repair_model=repair_model,
+        repair_attempts=repair_attempts,
+    )
+    heading = f"Idea: {saved.idea}\nObjective {objective}: {saved.tree[objective - 1].title}"
+    console.print(Panel.fit(heading, title="IdeaForge", border_style="cyan"))
+    result = _run_with_status(
+        lambda progress, on_event: planner.refine(saved, objective - 1, feedback, progress=progress, on_event=on_event),
+        stream,
+    )
+    _print_result(result, show_analysis)
+    _report_repairs(result)
+    if profile:
+        _print_profile(result)
+    _write_plan(result, out or plan_file)
+    _archive_result(archive_dir, result)
+    _report_cache(cache)
+
+
+@cli_app.command(name="batch")
+def batch_command(
+    ideas_file: Path = typer.Argument(..., exists=True, dir_okay=False, help="JSONL file with one idea per line."),
+    out: Path = typer.Option(..., "--out", help="JSONL file that receives one plan (or error) per line."),
+    workers: int = typer.Option(4, "--workers", min=1, help="Number of ideas planned concurrently."),
+    resume: bool = typer.Option(True, help="Skip ideas that already have a successful line in --out."),
+    plan_model: str = _PLAN_MODEL_OPTION,
+    react_model: Optional[str] = _REACT_MODEL_OPTION,
+    temperature: float = _TEMPERATURE_OPTION,
+    react_temperature: Optional[float] = _REACT_TEMPERATURE_OPTION,
+    parallel: int = _PARALLEL_OPTION,
+    cache_dir: Optional[Path] = _CACHE_DIR_OPTION,
+    no_cache: bool = _NO_CACHE_OPTION,
+    archive_dir: Optional[Path] = _ARCHIVE_DIR_OPTION,
+    repair_model: Optional[str] = _REPAIR_MODEL_OPTION,
+    repair_attempts: int = _REPAIR_ATTEMPTS_OPTION,
+    depth: Optional[int] = _DEPTH_OPTION,
+    max_nodes: int = _MAX_NODES_OPTION,
+    max_tokens: Optional[int] = _MAX_TOKENS_OPTION,
+    time_budget: Optional[float] = _TIME_BUDGET_OPTION,
+    dedupe: bool = _DEDUPE_OPTION,
+    dedupe_threshold: float = _DEDUPE_THRESHOLD_OPTION,
+    rpm: Optional[float] = _RPM_OPTION,
+    tpm: Optional[float] = _TPM_OPTION,
+    max_concurrency: int = _MAX_CONCURRENCY_OPTION,
+    cascade_model: Optional[List[str]] = _CASCADE_MODEL_OPTION,
+    cascade_min_tasks: int = _CASCADE_MIN_TASKS_OPTION,
+    pipeline: bool = _PIPELINE_OPTION,
+    deadline: Optional[float] = _DEADLINE_OPTION,
+) -> None:
+    """Plan every idea in a JSONL file, streaming results to --out."""
+    try:
+        ideas = load_ideas(ideas_file)
+    except ValueError as exc:
+        console.print(f"[bold red]{exc}")
+        raise typer.Exit(code=1) from exc
+    already_done = len(set(ideas) & load_completed(out)) if resume else 0
+
+    api_key = _resolve_api_key()
+    cache = _open_cache(cache_dir, no_cache)
+    scheduler = _rate_scheduler(rpm, tpm, max_concurrency)
+    planner = _build_planner(
+        plan_model,
+        react_model,
+        temperature,
+        react_temperature,
+        api_key,
+        parallel,
+        cache=cache,
+        repair_model=repair_model,
+        repair_attempts=repair_attempts,
+        expansion_budget=_expansion_budget(depth, max_nodes, max_tokens, time_budget),
+        dedupe_threshold=dedupe_threshold if dedupe else None,
+        scheduler=scheduler,
+        cascade_models=cascade_model or (),
+        cascade_min_tasks=cascade_min_tasks,
+        pipeline=pipeline,
+    )
+    archive = _open_archive(archive_dir) if archive_dir is not None else None
+    progress = Progress(
+        TextColumn("[bold cyan]Planning"),
+        BarColumn(),
+        MofNCompleteColumn(),
+        TextColumn("[red]{task.fields[failed]} failed"),
+        TimeElapsedColumn(),
+        console=console,
+    )
+    with progress:
+        task_id = progress.add_task("batch", total=len(set(ideas)), completed=already_done, failed=0)
+        failures = 0
+
+        def handle_record(record: Dict[str, Any]) -> None:
+            nonlocal failures
+            if record["status"] == "error":
+                failures += 1
+                progress.console.print(f"[red]Failed[/red] {record['idea']}: {record['error']}")
+            elif archive is not None:
+                # Indexed as each plan finishes, so the archive is searchable mid-batch.
+                archive.add(PlanResult.from_dict(record))
+            progress.update(task_id, advance=1, failed=failures)
+
+        try:
+            summary = asyncio.run(
+                run_batch(
+                    planner, ideas, out, workers=workers, resume=resume, on_record=handle_record, deadline=deadline
+                )
+            )
+        finally:
+            if archive is not None:
+                archive.close()
+    duplicates = f", {summary.duplicates} duplicates ignored" if summary.duplicates else ""
+    console.print(
+        f"[bold green]Batch complete[/bold green]: {summary.succeeded} planned, "
+        f"{summary.failed} failed, {summary.skipped} skipped{duplicates} → {out}"
+    )
+    _report_cache(cache)
+    _report_scheduler(scheduler)
+    if summary.failed:
+        raise typer.Exit(code=1)
+
+
+@cli_app.command(name="serve")
+def serve_command(
+    host: str = typer.Option(DEFAULT_HOST, "--host", help="Interface to listen on."),
+    port: int = typer.Option(DEFAULT_PORT, "--port", min=0, max=65535, help="Port to listen on (0 picks a free one)."),
+    workers: int = typer.Option(4, "--workers", min=1, help="Number of ideas planned concurrently."),
+    queue_size: int = typer.Option(
+        64, "--queue-size", min=1, help="Ideas that may wait for a worker before requests get 503."
+    ),
+    plan_model: str = _PLAN_MODEL_OPTION,
+    react_model: Optional[str] = _REACT_MODEL_OPTION,
+    temperature: float = _TEMPERATURE_OPTION,
+    react_temperature: Optional[float] = _REACT_TEMPERATURE_OPTION,
+    parallel: int = _PARALLEL_OPTION,
+    cache_dir: Optional[Path] = _CACHE_DIR_OPTION,
+    no_cache: bool = _NO_CACHE_OPTION,
+    repair_model: Optional[str] = _REPAIR_MODEL_OPTION,
+    repair_attempts: int = _REPAIR_ATTEMPTS_OPTION,
+    dedupe: bool = _DEDUPE_OPTION,
+    dedupe_threshold: float = _DEDUPE_THRESHOLD_OPTION,
+    rpm: Optional[float] = _RPM_OPTION,
+    tpm: Optional[float] = _TPM_OPTION,
+    max_concurrency: int = _MAX_CONCURRENCY_OPTION,
+    cascade_model: Optional[List[str]] = _CASCADE_MODEL_OPTION,
+    cascade_min_tasks: int = _CASCADE_MIN_TASKS_OPTION,
+    pipeline: bool = _PIPELINE_OPTION,
+    deadline: Optional[float] = _DEADLINE_OPTION,
+) -> None:
+    """Serve plan and stream endpoints over local HTTP with one long-lived planner."""
+    api_key = _resolve_api_key()
+    cache = _open_cache(cache_dir, no_cache)
+    scheduler = _rate_scheduler(rpm, tpm, max_concurrency)
+    planner = _build_planner(
+        plan_model,
+        react_model,
+        temperature,
+        react_temperature,
+        api_key,
+        parallel,
+        cache=cache,
+        repair_model=repair_model,
+        repair_attempts=repair_attempts,
+        dedupe_threshold=dedupe_threshold if dedupe else None,
+        scheduler=scheduler,
+        cascade_models=cascade_model or (),
+        cascade_min_tasks=cascade_min_tasks,
+        pipeline=pipeline,
+    )
+
+    async def serve() -> None:
+        async with PlanService(planner, workers=workers, max_queue=queue_size, deadline=deadline) as service:
+            server = await start_server(service, host, port)
+            address = server.sockets[0].getsockname()
+            console.print(
+                f"[bold green]Serving[/bold green] on http://{address[0]}:{address[1]} "
+                "(POST /plan, POST /stream, GET /health; Ctrl+C to stop)"
+            )
+            async with server:
+                await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        console.print("[dim]Server stopped[/dim]")
+    _report_cache(cache)
+    _report_scheduler(scheduler)
+
+
+@cli_app.command(name="archive")
+def archive_command(
+    files: Optional[List[Path]] = typer.Argument(
+        None, exists=True, dir_okay=False, help="Plan JSON files (`plan --out`) or batch JSONL outputs to add."
+    ),
+    archive_dir: Path = typer.Option(
+        ..., "--archive-dir", envvar="IDEAFORGE_ARCHIVE_DIR", help="Directory that holds the plan archive."
+    ),
+) -> None:
+    """Add saved plans to the searchable archive and report its size."""
+    archive = _open_archive(archive_dir)
+    try:
+        added = duplicates = 0
+        started = time.perf_counter()
+        for path in files or []:
+            try:
+                results = archive.add_many(load_plans(path))
+            except ValueError as exc:
+                console.print(f"[bold red]Cannot read plans from {path}: {exc}")
+                raise typer.Exit(code=1) from exc
+            added += sum(1 for _, new in results if new)
+            duplicates += sum(1 for _, new in results if not new)
+        if files:
+            elapsed = (time.perf_counter() - started) * 1000
+            console.print(f"Archived {added} new plans ({duplicates} already present) in {elapsed:.0f} ms")
+        stats = archive.stats()
+    finally:
+        archive.close()
+    console.print(
+        f"[dim]Archive: {stats.plans} plans, {stats.occurrences} nodes ({stats.nodes} distinct), "
+        f"{stats.terms} terms, {stats.postings} postings, {stats.size_bytes / 1_048_576:.1f} MB ({archive.path})[/dim]"
+    )
+
+
+@cli_app.command(name="search")
+def search_command(
+    query: str = typer.Argument(..., help="Words every matching task must contain (prefixes match)."),
+    archive_dir: Path = typer.Option(
+        ..., "--archive-dir", envvar="IDEAFORGE_ARCHIVE_DIR", help="Directory that holds the plan archive."
+    ),
+    limit: int = typer.Option(20, "--limit", min=1, help="Maximum number of matching tasks to show."),
+) -> None:
+    """Search task titles, summaries and deliverables across every archived plan."""
+    archive = _open_archive(archive_dir)
+    try:
+        started = time.perf_counter()
+        hits = archive.search(query, limit=limit)
+        elapsed = (time.perf_counter() - started) * 1000
+        stats = archive.stats()
+    finally:
+        archive.close()
+    if hits:
+        table = Table(show_header=True, header_style="bold")
+        table.add_column("Plan", justify="right")
+        table.add_column("Idea")
+        table.add_column("Task", no_wrap=True)
+        table.add_column("Title")
+        table.add_column("Deliverable")
+        for hit in hits:
+            number = ".".join(str(index + 1) for index in hit.path)
+            table.add_row(str(hit.plan_id), escape(hit.idea), number, escape(hit.title), escape(hit.deliverable))
+        console.print(table)
+    console.print(
+        f"[dim]{len(hits)} matches in {elapsed:.1f} ms across {stats.plans} plans "
+        f"({stats.terms} terms, {stats.size_bytes / 1_048_576:.1f} MB index)[/dim]"
+    )
+
+
+@cli_app.command(name="bench")
+def bench_command(
+    scenario: Optional[List[str]] = typer.Option(
+        None, "--scenario", help=f"Scenario to run (repeatable): {', '.join(SCENARIOS)}. Default: all."
+    ),
+    runs: int = typer.Option(5, "--runs", min=1, help="Plans per scenario."),
+    seed: int = typer.Option(0, "--seed", help="Seed for the simulated models."),
+    latency_scale: float = typer.Option(
+        1.0, "--latency-scale", min=0.0, help="Multiply simulated model latency (0 measures pure overhead)."
+    ),
+    json_out: Optional[Path] = typer.Option(None, "--json-out", dir_okay=False, help="Write the report as JSON."),
+    baseline: Optional[Path] = typer.Option(
+        None, "--baseline", exists=True, dir_okay=False, help="Fail when p50 or overhead regress past this report."
+    ),
+    tolerance: float = typer.Option(0.2, "--tolerance", min=0.0, help="Allowed regression against --baseline."),
+) -> None:
+    """Benchmark the planner offline with simulated models."""
+    try:
+        reports = asyncio.run(run_suite(scenario, runs=runs, seed=seed, latency_scale=latency_scale))
+    except KeyError as exc:
+        console.print(f"[bold red]{exc.args[0]}")
+        raise typer.Exit(code=1) from exc
+    table = Table(title=f"IdeaForge benchmark ({runs} runs per scenario, times in ms)", title_style="bold")
+    table.add_column("Scenario", no_wrap=True)
+    for column in ("Nodes", "Plan/s", "p50", "p95", "Overhead", "Parse", "Render", "Peak KB", "Retry"):
+        table.add_column(column, justify="right")
+    for report in reports:
+        table.add_row(
+            report.scenario,
+            str(report.nodes),
+            f"{report.throughput:.1f}",
+            f"{report.p50_ms:.1f}",
+            f"{report.p95_ms:.1f}",
+            f"{report.overhead_ms:.1f}",
+            f"{report.parse_ms:.2f}",
+            f"{report.render_ms:.2f}",
+            f"{report.peak_memory_kb:.0f}",
+            str(report.retries),
+        )
+    console.print(table)
+    if json_out is not None:
+        json_out.write_text(json.dumps([report.to_dict() for report in reports], indent=2) + "\n", encoding="utf-8")
+        console.print(f"[dim]Report written to {json_out}[/dim]")
+    if baseline is not None:
+        regressions = compare_reports(reports, json.loads(baseline.read_text(encoding="utf-8")), tolerance)
+        for regression in regressions:
+            console.print(f"[bold red]Regression[/bold red] {regression}")
+        if regressions:
+            raise typer.Exit(code=1)
+        console.print(f"[bold green]No regressions[/bold green] against {baseline}")
+
+
 def main() -> None:  # pragma: no cover - thin wrapper for entry point
-    if len(sys.argv) > 1 and sys.argv[1].lower() == "plan":
-        sys.argv.pop(1)
+    # Keep `ideaforge "idea"` working as shorthand for `ideaforge plan "idea"`.
+    commands = {command.name for command in cli_app.registered_commands}
+    if len(sys.argv) > 1 and sys.argv[1] not in commands and sys.argv[1] not in _ROOT_OPTIONS:
+        sys.argv.insert(1, "plan")
     cli_app()
 
 
@@ -0,0 +1,157 @@
+# Author: everettjf
+"""Near-duplicate task detection and merging with MinHash signatures."""
+
+from __future__ import annotations
+
+import random
+import re
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Set, Tuple
+
+PlanDict = Dict[str, Any]
+NodePath = Tuple[int, ...]
+
+_WORD = re.compile(r"[^\W_]+")
+_STOP_WORDS = frozenset(
+    "a an and are as at be by for from in into is it of on or the their this to with".split()
+)
+_PRIME = (1 << 61) - 1
+DEFAULT_THRESHOLD = 0.7
+# 32 bands of 2 rows: pairs from about 0.2 similarity up share a bucket in some band, so
+# the exact check below sees almost every pair above the threshold.
+_BANDS = 32
+_ROWS = 2
+
+
+@dataclass
+class DuplicateRecord:
+    """A task merged into an earlier, near-identical one.
+
+    Paths are positions in the plan before merging. The removed task's sub-tasks were
+    moved under the kept task.
+    """
+
+    kept: NodePath
+    removed: NodePath
+    title: str
+    similarity: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "kept": list(self.kept),
+            "removed": list(self.removed),
+            "title": self.title,
+            "similarity": self.similarity,
+        }
+
+
+def dedupe_plan(plan: List[PlanDict], threshold: float = DEFAULT_THRESHOLD, seed: int = 0) -> List[DuplicateRecord]:
+    """Merge near-duplicate tasks of ``plan`` in place and return what was merged.
+
+    Each task is reduced to two word sets, stop words removed: its label (title and
+    deliverable) and its full text (title, summary and deliverable). Two tasks are as
+    similar as the closer of the two Jaccard similarities, so "Conduct Market Research ->
+    Market Research Report" matches "Market Research -> Market Research Report" even when
+    their summaries are worded differently. MinHash signatures bucketed by band propose
+    candidate pairs without comparing every pair; candidates are then scored exactly.
+
+    A task is merged into the earliest (preorder) task it matches at ``threshold`` or
+    above, unless one contains the other; its sub-tasks move under the kept task.
+    Top-level objectives are never removed, but tasks elsewhere can be merged into them.
+    """
+    if not 0 < threshold <= 1:
+        raise ValueError("threshold must be in (0, 1]")
+    nodes, parents = _index(plan)
+    features = [_features(node) for _, node in nodes]
+    permutations = _permutations(_BANDS * _ROWS, seed)
+    buckets: Dict[Tuple[int, int, Tuple[int, ...]], List[int]] = defaultdict(list)
+    for index, sets in enumerate(features):
+        for kind, words in enumerate(sets):
+            if not words:
+                continue
+            signature = _signature(words, permutations)
+            for band in range(_BANDS):
+                buckets[(kind, band, signature[band * _ROWS : (band + 1) * _ROWS])].append(index)
+    candidates: Dict[int, Set[int]] = defaultdict(set)
+    for members in buckets.values():
+        for position, later in enumerate(members):
+            candidates[later].update(members[:position])
+
+    records: List[DuplicateRecord] = []
+    removed: Set[int] = set()
+    for later in sorted(candidates):
+        path, node = nodes[later]
+        if len(path) == 1:
+            continue
+        best: Tuple[float, int] | None = None
+        for earlier in candidates[later]:
+            if earlier in removed or _related(nodes[earlier][0], path):
+                continue
+            similarity = max(_jaccard(left, right) for left, right in zip(features[earlier], features[later]))
+            if similarity >= threshold and (best is None or (similarity, -earlier) > (best[0], -best[1])):
+                best = (similarity, earlier)
+        if best is None:
+            continue
+        similarity, earlier = best
+        keeper = nodes[earlier][1]
+        siblings = parents[id(node)]
+        siblings[:] = [item for item in siblings if item is not node]
+        keeper.setdefault("tasks", []).extend(node.get("tasks") or [])
+        for child in node.get("tasks") or []:
+            parents[id(child)] = keeper["tasks"]
+        removed.add(later)
+        records.append(DuplicateRecord(nodes[earlier][0], path, str(node.get("title", "")), round(similarity, 3)))
+    return records
+
+
+def _index(plan: List[PlanDict]) -> Tuple[List[Tuple[NodePath, PlanDict]], Dict[int, List[PlanDict]]]:
+    """Preorder ``(path, node)`` pairs and, per node id, the task list that holds it."""
+    nodes: List[Tuple[NodePath, PlanDict]] = []
+    parents: Dict[int, List[PlanDict]] = {}
+    stack: List[Tuple[NodePath, PlanDict, List[PlanDict]]] = [
+        ((index,), item, plan) for index, item in reversed(list(enumerate(plan)))
+    ]
+    while stack:
+        path, node, siblings = stack.pop()
+        if not isinstance(node, dict):
+            continue
+        nodes.append((path, node))
+        parents[id(node)] = siblings
+        children = node.get("tasks") or []
+        for index in range(len(children) - 1, -1, -1):
+            stack.append((path + (index,), children[index], children))
+    return nodes, parents
+
+
+def _features(node: PlanDict) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    label = _words(str(node.get("title", ""))) | _words(str(node.get("deliverable", "")))
+    return frozenset(label), frozenset(label | _words(str(node.get("summary", ""))))
+
+
+def _words(text: str) -> Set[str]:
+    return {word for word in _WORD.findall(text.casefold()) if word not in _STOP_WORDS}
+
+
+def _permutations(count: int, seed: int) -> List[Tuple[int, int]]:
+    rng = random.Random(seed)
+    return [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(count)]
+
+
+def _signature(words: FrozenSet[str], permutations: List[Tuple[int, int]]) -> Tuple[int, ...]:
+    hashes = [zlib.crc32(word.encode("utf-8")) for word in words]
+    return tuple(min((a * value + b) % _PRIME for value in hashes) for a, b in permutations)
+
+
+def _jaccard(left: FrozenSet[str], right: FrozenSet[str]) -> float:
+    union = len(left | right)
+    return len(left & right) / union if union else 0.0
+
+
+def _related(first: NodePath, second: NodePath) -> bool:
+    shorter, longer = sorted((first, second), key=len)
+    return longer[: len(shorter)] == shorter
+
+
+__all__ = ["DEFAULT_THRESHOLD", "DuplicateRecord", "dedupe_plan"]
@@ -0,0 +1,76 @@
+# Author: everettjf
+"""Structured events emitted while a plan is being generated."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Awaitable, Callable, Tuple, Union
+
+from .metrics import NodeMetrics
+
+if TYPE_CHECKING:
+    from .planner import PlanNode, PlanResult
+
+
+@dataclass(frozen=True)
+class NodeCompleted:
+    """A TODO tree node finished streaming.
+
+    ``path`` is the node's position in the final tree: ``(2,)`` is the third top-level
+    objective and ``(2, 0, 1)`` the second sub-task of its first task. Children complete
+    before their parents. ``stage`` is ``"plan"`` for outline nodes and ``"react"`` for
+    nodes produced while expanding an objective.
+    """
+
+    stage: str
+    path: Tuple[int, ...]
+    node: PlanNode
+
+    @property
+    def depth(self) -> int:
+        return len(self.path)
+
+
+@dataclass(frozen=True)
+class StageCompleted:
+    """A graph node (outline, one objective expansion or finalization) finished."""
+
+    metrics: NodeMetrics
+
+
+@dataclass(frozen=True)
+class ObjectiveCompleted:
+    """A top-level objective was expanded (or given up on at the deadline).
+
+    ``node`` is the objective with its expanded subtree and ``metrics`` the expansion's
+    timing. Objectives may complete out of order when they are expanded in parallel.
+    """
+
+    index: int
+    node: PlanNode
+    analysis: str
+    metrics: NodeMetrics
+    incomplete: bool = False
+
+
+@dataclass(frozen=True)
+class PlanCompleted:
+    """The whole plan is ready; always the last event of :meth:`IdeaPlanner.astream`."""
+
+    result: PlanResult
+
+
+PlanEvent = Union[NodeCompleted, StageCompleted, ObjectiveCompleted]
+PlanStreamEvent = Union[ObjectiveCompleted, PlanCompleted]
+EventCallback = Callable[[PlanEvent], Union[None, Awaitable[None]]]
+
+
+__all__ = [
+    "EventCallback",
+    "NodeCompleted",
+    "ObjectiveCompleted",
+    "PlanCompleted",
+    "PlanEvent",
+    "PlanStreamEvent",
+    "StageCompleted",
+]
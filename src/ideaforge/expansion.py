@@ -0,0 +1,199 @@
+# Author: everettjf
+"""Budget-driven, breadth-first expansion of plan leaves into deeper sub-tasks."""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Tuple
+
+PlanDict = Dict[str, Any]
+NodePath = Tuple[int, ...]
+# Expands one leaf: receives the node, its path and its ancestors' titles, returns the new
+# children and the tokens spent producing them. A failing expander raises, preferably
+# ExpansionFailed so the tokens it spent still count against the budget.
+Expander = Callable[[PlanDict, NodePath, Tuple[str, ...]], Awaitable[Tuple[List[PlanDict], int]]]
+ExpandedCallback = Callable[[PlanDict, NodePath, List[PlanDict]], Awaitable[None]]
+
+
+class ExpansionFailed(RuntimeError):
+    """An expander gave up on a node after spending ``tokens`` on it."""
+
+    def __init__(self, message: str, tokens: int = 0) -> None:
+        super().__init__(message)
+        self.tokens = tokens
+
+
+@dataclass(frozen=True)
+class ExpansionBudget:
+    """Limits for deepening a plan.
+
+    ``max_depth`` counts tree levels (top-level objectives are level 1), ``max_nodes``
+    caps the size of the whole tree, ``max_tokens`` the tokens spent on deepening and
+    ``max_seconds`` its wall time. Whichever runs out first stops the expansion.
+    """
+
+    max_depth: int = 3
+    max_nodes: int = 200
+    max_tokens: int | None = None
+    max_seconds: float | None = None
+
+    def __post_init__(self) -> None:
+        if self.max_depth < 1:
+            raise ValueError("max_depth must be at least 1")
+        if self.max_nodes < 1:
+            raise ValueError("max_nodes must be at least 1")
+        if self.max_tokens is not None and self.max_tokens < 0:
+            raise ValueError("max_tokens must not be negative")
+        if self.max_seconds is not None and self.max_seconds < 0:
+            raise ValueError("max_seconds must not be negative")
+
+
+@dataclass
+class ExpansionOutcome:
+    """What a deepening pass did and why it stopped.
+
+    ``stop_reason`` is ``"complete"`` when every leaf above ``max_depth`` was expanded,
+    otherwise the exhausted budget: ``"nodes"``, ``"tokens"`` or ``"time"``.
+    """
+
+    expanded: int = 0
+    added: int = 0
+    failed: int = 0
+    pending: int = 0
+    tokens: int = 0
+    seconds: float = 0.0
+    stop_reason: str = "complete"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+async def expand_tree(
+    plan: List[PlanDict],
+    expand: Expander,
+    budget: ExpansionBudget,
+    concurrency: int = 1,
+    on_expanded: ExpandedCallback | None = None,
+) -> ExpansionOutcome:
+    """Expand the leaves of ``plan`` in place, shallowest first, until a budget runs out.
+
+    Every node with empty ``tasks`` above ``budget.max_depth`` is a work item in a
+    priority queue ordered by depth, so levels fill breadth-first. Up to ``concurrency``
+    expansions run at once; new children join the queue as they arrive. An expander that
+    raises (an unusable response, a provider or network error) leaves its node as a leaf
+    and counts towards ``outcome.failed``; the rest of the tree still deepens, and the
+    tokens an :class:`ExpansionFailed` reports count towards ``outcome.tokens``. Running out
+    of nodes or tokens stops scheduling and lets in-flight expansions finish; running out
+    of time cancels them.
+    """
+    started = time.monotonic()
+    deadline = None if budget.max_seconds is None else started + budget.max_seconds
+    order = itertools.count()
+    queue: List[Tuple[int, int, NodePath, Tuple[str, ...], PlanDict]] = []
+    for path, ancestors, node in _leaves(plan, (), ()):
+        if len(path) < budget.max_depth:
+            heapq.heappush(queue, (len(path), next(order), path, ancestors, node))
+    total_nodes = _count_nodes(plan)
+    outcome = ExpansionOutcome()
+    running: Dict[asyncio.Task[Tuple[List[PlanDict], int]], Tuple[NodePath, Tuple[str, ...], PlanDict]] = {}
+    stop: str | None = None
+    try:
+        while True:
+            while queue and stop is None and len(running) < concurrency:
+                if total_nodes + len(running) >= budget.max_nodes:
+                    stop = "nodes"
+                elif budget.max_tokens is not None and outcome.tokens >= budget.max_tokens:
+                    stop = "tokens"
+                elif deadline is not None and time.monotonic() >= deadline:
+                    stop = "time"
+                else:
+                    _, _, path, ancestors, node = heapq.heappop(queue)
+                    running[asyncio.ensure_future(expand(node, path, ancestors))] = (path, ancestors, node)
+            if not running:
+                break
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                stop = "time"
+                break
+            for task in done:
+                path, ancestors, node = running.pop(task)
+                try:
+                    children, tokens = task.result()
+                except Exception as exc:  # noqa: BLE001 - one failed node must not lose the whole plan
+                    outcome.failed += 1
+                    if isinstance(exc, ExpansionFailed):
+                        outcome.tokens += exc.tokens
+                    continue
+                outcome.tokens += tokens
+                children = _fit(children, budget.max_nodes - total_nodes)
+                if not children:
+                    continue
+                node["tasks"] = children
+                added = _count_nodes(children)
+                total_nodes += added
+                outcome.expanded += 1
+                outcome.added += added
+                if on_expanded is not None:
+                    await on_expanded(node, path, children)
+                lineage = ancestors + (str(node.get("title", "")),)
+                for child_path, child_ancestors, leaf in _leaves(children, path, lineage):
+                    if len(child_path) < budget.max_depth:
+                        heapq.heappush(queue, (len(child_path), next(order), child_path, child_ancestors, leaf))
+    finally:
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+    outcome.pending = len(queue) + len(running)
+    outcome.seconds = time.monotonic() - started
+    if stop is not None and outcome.pending:
+        outcome.stop_reason = stop
+    return outcome
+
+
+def _leaves(
+    items: List[PlanDict], prefix: NodePath, ancestors: Tuple[str, ...]
+) -> Iterator[Tuple[NodePath, Tuple[str, ...], PlanDict]]:
+    stack = [(prefix + (index,), ancestors, item) for index, item in reversed(list(enumerate(items)))]
+    while stack:
+        path, lineage, node = stack.pop()
+        if not isinstance(node, dict):
+            continue
+        children = node.get("tasks") or []
+        if not children:
+            yield path, lineage, node
+            continue
+        child_lineage = lineage + (str(node.get("title", "")),)
+        for index in range(len(children) - 1, -1, -1):
+            stack.append((path + (index,), child_lineage, children[index]))
+
+
+def _count_nodes(items: List[PlanDict]) -> int:
+    count = 0
+    stack = list(items)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            count += 1
+            stack.extend(node.get("tasks") or [])
+    return count
+
+
+def _fit(children: List[PlanDict], capacity: int) -> List[PlanDict]:
+    """Keep leading children whose subtrees fit in ``capacity`` nodes."""
+    kept: List[PlanDict] = []
+    for child in children:
+        size = _count_nodes([child])
+        if size > capacity:
+            break
+        kept.append(child)
+        capacity -= size
+    return kept
+
+
+__all__ = ["ExpansionBudget", "ExpansionFailed", "ExpansionOutcome", "expand_tree"]
@@ -0,0 +1,169 @@
+# Author: everettjf
+"""Per-node latency and token accounting for planning runs."""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Tuple
+
+
+@dataclass
+class NodeMetrics:
+    """Measurements for one graph node execution.
+
+    ``node`` is the graph node (``"plan"``, ``"react"``, ``"deepen"``, ``"finalize"`` or
+    ``"dedupe"``) and ``path`` the tree position it worked on: ``()`` for the outline and
+    whole-plan stages, ``(index,)`` for a top-level objective and longer paths for
+    deepened tasks.
+    ``model_seconds`` and the token counts cover every model call made by the node,
+    repair round-trips included; ``retries`` counts those repairs. ``cached_tokens`` is
+    the part of ``prompt_tokens`` the provider served from its prompt cache. With a model
+    cascade, ``tier`` is the position of the model whose answer was kept (the final,
+    strongest model's position when every cheaper one failed); ``None`` otherwise.
+    """
+
+    node: str
+    path: Tuple[int, ...] = ()
+    title: str = ""
+    wall_seconds: float = 0.0
+    model_seconds: float = 0.0
+    parse_seconds: float = 0.0
+    model_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    retries: int = 0
+    tier: int | None = None
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def record_call(self, response: Any, seconds: float) -> None:
+        prompt_tokens, completion_tokens = token_usage(response)
+        self.model_calls += 1
+        self.model_seconds += seconds
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.cached_tokens += cached_prompt_tokens(response)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["path"] = list(self.path)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "NodeMetrics":
+        return cls(**{**data, "path": tuple(data.get("path", ()))})
+
+
+@dataclass
+class PlanMetrics:
+    """All node measurements of a run, in completion order, with run-level totals."""
+
+    nodes: List[NodeMetrics] = field(default_factory=list)
+    wall_seconds: float = 0.0
+
+    @property
+    def model_seconds(self) -> float:
+        return sum(node.model_seconds for node in self.nodes)
+
+    @property
+    def parse_seconds(self) -> float:
+        return sum(node.parse_seconds for node in self.nodes)
+
+    @property
+    def prompt_tokens(self) -> int:
+        return sum(node.prompt_tokens for node in self.nodes)
+
+    @property
+    def completion_tokens(self) -> int:
+        return sum(node.completion_tokens for node in self.nodes)
+
+    @property
+    def cached_tokens(self) -> int:
+        return sum(node.cached_tokens for node in self.nodes)
+
+    @property
+    def cache_hit_rate(self) -> float:
+        """Share of prompt tokens served from the provider's prompt cache."""
+        return self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def retries(self) -> int:
+        return sum(node.retries for node in self.nodes)
+
+    @property
+    def tier_hit_rates(self) -> List[float]:
+        """For each cascade tier, the share of the nodes that reached it which it answered.
+
+        Every cascaded node starts at tier 0 and escalates one tier per rejected answer, so
+        tier ``i`` was reached by the nodes that ended at tier ``i`` or later. The last
+        entry, the final model, answers everything that reaches it.
+        """
+        tiers = [node.tier for node in self.nodes if node.tier is not None]
+        if not tiers:
+            return []
+        answered = [0] * (max(tiers) + 1)
+        for tier in tiers:
+            answered[tier] += 1
+        rates: List[float] = []
+        reached = len(tiers)
+        for count in answered:
+            rates.append(count / reached if reached else 0.0)
+            reached -= count
+        return rates
+
+    def estimate_cost(self, prompt_price: float, completion_price: float, cached_price: float | None = None) -> float:
+        """Cost of the run given prices per million prompt and completion tokens.
+
+        Cached prompt tokens are billed at ``cached_price`` when it is given.
+        """
+        prompt_cost = self.prompt_tokens * prompt_price
+        if cached_price is not None:
+            prompt_cost -= self.cached_tokens * (prompt_price - cached_price)
+        return (prompt_cost + self.completion_tokens * completion_price) / 1_000_000
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "wall_seconds": self.wall_seconds,
+            "model_seconds": self.model_seconds,
+            "parse_seconds": self.parse_seconds,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_tokens": self.cached_tokens,
+            "retries": self.retries,
+            "tier_hit_rates": self.tier_hit_rates,
+            "nodes": [node.to_dict() for node in self.nodes],
+        }
+
+
+def token_usage(response: Any) -> Tuple[int, int]:
+    """Return ``(prompt_tokens, completion_tokens)`` reported by a chat model response."""
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        return int(usage.get("input_tokens", 0)), int(usage.get("output_tokens", 0))
+    metadata = getattr(response, "response_metadata", None) or {}
+    usage = metadata.get("token_usage") or metadata.get("usage") or {}
+    return int(usage.get("prompt_tokens", 0) or 0), int(usage.get("completion_tokens", 0) or 0)
+
+
+def cached_prompt_tokens(response: Any) -> int:
+    """Return how many prompt tokens of a response were read from the provider's prompt cache."""
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        details = usage.get("input_token_details") or {}
+        if "cache_read" in details:
+            return int(details["cache_read"] or 0)
+    metadata = getattr(response, "response_metadata", None) or {}
+    usage = metadata.get("token_usage") or metadata.get("usage") or {}
+    # OpenAI reports ``prompt_tokens_details.cached_tokens``; Anthropic ``cache_read_input_tokens``.
+    details = usage.get("prompt_tokens_details") or {}
+    return int(details.get("cached_tokens") or usage.get("cache_read_input_tokens") or 0)
+
+
+__all__ = ["NodeMetrics", "PlanMetrics", "cached_prompt_tokens", "token_usage"]
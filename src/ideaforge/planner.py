@@ -3,27 +3,131 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import inspect
 import json
-from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, Iterable, List, TypedDict
+import operator
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import (
+    TYPE_CHECKING,
+    Annotated,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Sequence,
+    Tuple,
+    TypedDict,
+    TypeVar,
+)
 
-from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_core.runnables.base import Runnable
-from langgraph.graph import END, START, StateGraph
+from .dedupe import DuplicateRecord, dedupe_plan
+from .events import (
+    EventCallback,
+    NodeCompleted,
+    ObjectiveCompleted,
+    PlanCompleted,
+    PlanEvent,
+    PlanStreamEvent,
+    StageCompleted,
+)
+from .expansion import ExpansionBudget, ExpansionFailed, ExpansionOutcome, expand_tree
+from .metrics import NodeMetrics, PlanMetrics
+from .prompts import (
+    idea_context,
+    objective_messages,
+    plan_messages,
+    repair_messages,
+    shared_context,
+    subtask_messages,
+)
+from .recovery import recover_json, select_expected
+from .streaming import IncrementalJSONParser
+
+# LangChain and LangGraph are imported where they are first needed, so importing the
+# package (and starting the CLI) does not pay for the whole stack.
+if TYPE_CHECKING:
+    from langchain_core.messages import BaseMessage
+    from langchain_core.runnables import RunnableConfig
+    from langchain_core.runnables.base import Runnable
+    from langgraph.checkpoint.base import BaseCheckpointSaver
+    from langgraph.graph.state import CompiledStateGraph
+    from langgraph.types import Send
+else:
+    # LangGraph resolves node annotations when the graph is built. RunnableConfig and Send
+    # only need to resolve to something there: a config is a plain mapping at runtime.
+    RunnableConfig = Dict[str, Any]
+    Send = Any
+
+ProgressCallback = Callable[[str], None | Awaitable[None]]
+ObjectiveCallback = Callable[[ObjectiveCompleted], None]
+
+_PLAN_SHAPE = (
+    'an object with key "plan": a non-empty list of objects with title, summary, deliverable and tasks (a list)'
+)
+_EXPANSION_SHAPE = (
+    'an object with keys "analysis" (a list of strings) and "tasks": a non-empty list of objects with title,'
+    " summary, deliverable and tasks (a list of the same objects)"
+)
+_MAX_REPAIR_REASON = 200
+
+_T = TypeVar("_T")
 
 
 class PlannerState(TypedDict, total=False):
-    """Mutable state that flows through the planning LangGraph."""
+    """Mutable state that flows through the planning LangGraph.
+
+    List keys with an ``operator.add`` reducer are append-only: nodes return just their
+    new entries and LangGraph concatenates them onto the current list, instead of each
+    node rebuilding the whole state.
+    """
 
     idea: str
     plan: List[Dict[str, Any]]
+    context: str
     current_index: int
-    analyses: List[str]
+    analyses: Annotated[List[str], operator.add]
+    expansions: Annotated[List[Dict[str, Any]], operator.add]
+    repairs: Annotated[List[Dict[str, Any]], operator.add]
+    metrics: Annotated[List[Dict[str, Any]], operator.add]
+    incomplete: Annotated[List[int], operator.add]
+    expansion: Dict[str, Any]
+    duplicates: List[Dict[str, Any]]
 
 
-@dataclass
+# An objective's new tasks, its formatted analysis and its ``repairs``/``metrics`` updates.
+_Expansion = Tuple[List[Dict[str, Any]], str, PlannerState]
+
+
+class ObjectiveState(TypedDict):
+    """Payload sent to a single fan-out expansion branch."""
+
+    idea: str
+    context: str
+    index: int
+    total: int
+    objective: Dict[str, Any]
+
+
+@dataclass(slots=True)
 class PlanNode:
-    """Node in the hierarchical TODO tree."""
+    """Node in the hierarchical TODO tree.
+
+    Slotted to keep very large trees compact. Construction, traversal, serialization and
+    rendering use explicit stacks, so cost is linear in the node count and deep trees
+    never hit the recursion limit.
+    """
 
     title: str
     summary: str = ""
@@ -32,48 +136,125 @@ class PlanNode:
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "PlanNode":
-        tasks = [cls.from_dict(child) for child in data.get("tasks", [])]
-        return cls(
-            title=data.get("title", "Untitled"),
-            summary=data.get("summary", ""),
-            deliverable=data.get("deliverable", ""),
-            tasks=tasks,
-        )
+        root = cls(data.get("title", "Untitled"), data.get("summary", ""), data.get("deliverable", ""))
+        stack = [(root, data)]
+        pop, push = stack.pop, stack.append
+        while stack:
+            node, source = pop()
+            children = source.get("tasks")
+            if not children:
+                continue
+            tasks = node.tasks
+            for child_data in children:
+                child = cls(
+                    child_data.get("title", "Untitled"),
+                    child_data.get("summary", ""),
+                    child_data.get("deliverable", ""),
+                )
+                tasks.append(child)
+                push((child, child_data))
+        return root
 
     def to_dict(self) -> Dict[str, Any]:
-        return {
-            "title": self.title,
-            "summary": self.summary,
-            "deliverable": self.deliverable,
-            "tasks": [task.to_dict() for task in self.tasks],
-        }
+        root: Dict[str, Any] = {"title": self.title, "summary": self.summary, "deliverable": self.deliverable}
+        stack = [(self, root)]
+        pop, push = stack.pop, stack.append
+        while stack:
+            node, target = pop()
+            children = []
+            for child in node.tasks:
+                child_dict = {"title": child.title, "summary": child.summary, "deliverable": child.deliverable}
+                children.append(child_dict)
+                push((child, child_dict))
+            target["tasks"] = children
+        return root
+
+    def iter_nodes(self) -> Iterator["PlanNode"]:
+        """Yield this node and its descendants depth-first, parents before children."""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.tasks))
 
-    def iter_nodes(self) -> Iterable["PlanNode"]:
-        yield self
-        for child in self.tasks:
-            yield from child.iter_nodes()
+    def iter_lines(self, prefix: str = "", is_last: bool = True) -> Iterator[str]:
+        """Yield the rendered lines of this subtree one at a time."""
+        stack = [(self, prefix, is_last)]
+        while stack:
+            node, node_prefix, last = stack.pop()
+            headline = node.title
+            if node.deliverable:
+                headline += f" → {node.deliverable}"
+            yield f"{node_prefix}{'└── ' if last else '├── '}{headline}"
+            detail_prefix = node_prefix + ("    " if last else "│   ")
+            if node.summary:
+                yield f"{detail_prefix}summary: {node.summary}"
+            final = len(node.tasks) - 1
+            for index in range(final, -1, -1):
+                stack.append((node.tasks[index], detail_prefix, index == final))
 
     def render(self, prefix: str = "", is_last: bool = True) -> List[str]:
-        connector = "└── " if is_last else "├── "
-        headline = f"{self.title}"
-        if self.deliverable:
-            headline += f" → {self.deliverable}"
-        lines = [f"{prefix}{connector}{headline}"]
-        detail_prefix = "    " if is_last else "│   "
-        if self.summary:
-            lines.append(f"{prefix}{detail_prefix}summary: {self.summary}")
-        for index, child in enumerate(self.tasks):
-            lines.extend(child.render(prefix + detail_prefix, index == len(self.tasks) - 1))
-        return lines
+        return list(self.iter_lines(prefix, is_last))
 
 
 PlanTree = List[PlanNode]
 
 
+def render_tree(tree: PlanTree) -> Iterator[str]:
+    """Stream the lines of a whole plan tree, ready to be written straight to the output."""
+    for index, node in enumerate(tree):
+        yield from node.iter_lines(is_last=index == len(tree) - 1)
+
+
+@dataclass
+class RepairRecord:
+    """A malformed model response that was fixed by the repair model.
+
+    ``path`` is ``()`` for the roadmap outline and ``(index,)`` for a top-level objective;
+    ``attempts`` counts the repair round-trips it took.
+    """
+
+    stage: str
+    path: Tuple[int, ...]
+    title: str
+    attempts: int
+
+
 @dataclass
 class PlanResult:
     tree: PlanTree
     analyses: List[str]
+    run_id: str | None = None
+    repairs: List[RepairRecord] = field(default_factory=list)
+    metrics: PlanMetrics = field(default_factory=PlanMetrics)
+    expansion: ExpansionOutcome | None = None
+    idea: str = ""
+    duplicates: List[DuplicateRecord] = field(default_factory=list)
+    # Indices of top-level objectives left unexpanded because the deadline was reached.
+    incomplete: List[int] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "idea": self.idea,
+            "tree": [node.to_dict() for node in self.tree],
+            "analyses": list(self.analyses),
+        }
+        if self.incomplete:
+            data["incomplete"] = list(self.incomplete)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PlanResult":
+        """Load a plan saved with :meth:`to_dict` (run details such as metrics are not kept)."""
+        tree = data.get("tree")
+        if not isinstance(tree, list):
+            raise ValueError("Saved plan must contain a tree list")
+        return cls(
+            tree=[PlanNode.from_dict(item) for item in tree],
+            analyses=list(data.get("analyses", [])),
+            idea=data.get("idea", ""),
+            incomplete=list(data.get("incomplete", [])),
+        )
 
 
 class IdeaPlanner:
@@ -83,145 +264,967 @@ class IdeaPlanner:
         self,
         planner_model: Runnable,
         react_model: Runnable,
+        max_parallel_objectives: int = 1,
+        checkpointer: BaseCheckpointSaver | None = None,
+        repair_model: Runnable | None = None,
+        max_repair_attempts: int = 2,
+        expansion_budget: ExpansionBudget | None = None,
+        dedupe_threshold: float | None = None,
+        cascade_models: Sequence[Runnable] = (),
+        cascade_min_tasks: int = 2,
+        pipeline: bool = False,
     ) -> None:
+        """Create a planner.
+
+        A response that cannot be parsed or fails validation is sent, alone, to
+        ``repair_model`` (the model that produced it when omitted) with a short fix-it
+        instruction, up to ``max_repair_attempts`` times before the run fails.
+
+        With an ``expansion_budget`` the remaining leaves of the expanded plan are broken
+        down further, level by level, until the budget's depth, node, token or time limit
+        is reached (see :func:`~ideaforge.expansion.expand_tree`).
+
+        With a ``dedupe_threshold`` near-identical tasks of the finished plan are merged
+        (see :func:`~ideaforge.dedupe.dedupe_plan`) and listed in ``PlanResult.duplicates``.
+
+        ``cascade_models`` (cheapest first) are tried before ``react_model`` for every
+        objective and deepened task. An answer is accepted from a cascade model only if it
+        parses into at least ``cascade_min_tasks`` tasks that all have a title, summary and
+        deliverable; otherwise the next model is asked, and ``react_model`` (with repairs)
+        answers what no cheaper model could. Each node's answering tier is kept in its
+        metrics (see :attr:`~ideaforge.metrics.PlanMetrics.tier_hit_rates`).
+
+        With ``pipeline`` the outline is streamed and each objective is expanded (up to
+        ``max_parallel_objectives`` at a time) as soon as its JSON object closes, while
+        later objectives are still being written. Those calls share a context prefix
+        holding only the idea (so prompt caching still applies) and carry the outline
+        written before their objective in the final message, instead of the whole
+        outline the staged mode sends. Objectives that the final, fully parsed outline
+        changes (after a repair, say) are expanded again, so the tree has the same
+        structure as in the staged mode. Deepening uses the complete outline.
+        """
+        if max_parallel_objectives < 1:
+            raise ValueError("max_parallel_objectives must be at least 1")
+        if max_repair_attempts < 0:
+            raise ValueError("max_repair_attempts must not be negative")
+        if dedupe_threshold is not None and not 0 < dedupe_threshold <= 1:
+            raise ValueError("dedupe_threshold must be in (0, 1]")
+        if cascade_min_tasks < 1:
+            raise ValueError("cascade_min_tasks must be at least 1")
         self._planner_model = planner_model
         self._react_model = react_model
-        self._graph = self._build_graph()
-        self._progress_callback: Callable[[str], None] | None = None
+        self._max_parallel_objectives = max_parallel_objectives
+        self._checkpointer = checkpointer
+        self._repair_model = repair_model
+        self._max_repair_attempts = max_repair_attempts
+        self._expansion_budget = expansion_budget
+        self._dedupe_threshold = dedupe_threshold
+        self._cascade_models = tuple(cascade_models)
+        self._cascade_min_tasks = cascade_min_tasks
+        self._pipeline = pipeline
+        self._compiled_graph: CompiledStateGraph | None = None
 
-    def plan(self, idea: str, progress: Callable[[str], None] | None = None) -> PlanResult:
-        previous_callback = self._progress_callback
-        self._progress_callback = progress
-        self._emit_progress("Generating roadmap outline")
-        state: PlannerState = {"idea": idea}
+    def plan(
+        self,
+        idea: str,
+        progress: ProgressCallback | None = None,
+        run_id: str | None = None,
+        on_event: EventCallback | None = None,
+        deadline: float | None = None,
+    ) -> PlanResult:
+        """Blocking wrapper around :meth:`aplan`."""
+        return _run_sync(self.aplan(idea, progress=progress, run_id=run_id, on_event=on_event, deadline=deadline))
+
+    async def aplan(
+        self,
+        idea: str,
+        progress: ProgressCallback | None = None,
+        run_id: str | None = None,
+        on_event: EventCallback | None = None,
+        deadline: float | None = None,
+    ) -> PlanResult:
+        """Plan ``idea`` on the running event loop.
+
+        Progress callbacks may be plain functions or coroutine functions. Each call keeps
+        its own callback, so a single planner can serve many concurrent plans.
+
+        With a checkpointer every graph step is persisted under ``run_id`` (generated when
+        omitted), so a failed run can be continued with :meth:`resume`.
+
+        When ``on_event`` is given, models that support ``astream`` are streamed and a
+        :class:`NodeCompleted` event is emitted for every tree node as soon as its JSON
+        object closes, long before the full response has arrived.
+
+        With a ``deadline`` (seconds from now), model calls still running when it passes
+        are cancelled and objectives not expanded by then keep their outline entry; they
+        are listed in ``PlanResult.incomplete``. Deepening stops at the deadline too, and
+        launch coverage is still checked. Only an outline that is not ready in time raises
+        :class:`TimeoutError`, since there is nothing to return without it.
+        """
+        return await self._plan(idea, progress, run_id, on_event, deadline)
+
+    def stream(
+        self,
+        idea: str,
+        progress: ProgressCallback | None = None,
+        run_id: str | None = None,
+        on_event: EventCallback | None = None,
+        deadline: float | None = None,
+    ) -> Iterator[PlanStreamEvent]:
+        """Blocking wrapper around :meth:`astream`; planning runs on a helper thread.
+
+        Closing the iterator early cancels the run.
+        """
+        return _iterate_sync(self.astream(idea, progress=progress, run_id=run_id, on_event=on_event, deadline=deadline))
+
+    async def astream(
+        self,
+        idea: str,
+        progress: ProgressCallback | None = None,
+        run_id: str | None = None,
+        on_event: EventCallback | None = None,
+        deadline: float | None = None,
+    ) -> AsyncIterator[PlanStreamEvent]:
+        """Plan ``idea`` like :meth:`aplan`, yielding each objective as soon as it is expanded.
+
+        Yields an :class:`ObjectiveCompleted` per top-level objective, in completion order,
+        then a :class:`PlanCompleted` with the final result (after launch coverage,
+        deepening and deduplication, which may still change the tree). In pipelined mode
+        an objective that a repaired outline changes is yielded again. A failed run raises
+        from the iterator; closing it early cancels the run.
+        """
+        finished: asyncio.Queue[ObjectiveCompleted | None] = asyncio.Queue()
+        task = asyncio.create_task(self._plan(idea, progress, run_id, on_event, deadline, finished.put_nowait))
+        task.add_done_callback(lambda _: finished.put_nowait(None))
         try:
-            result = self._graph.invoke(state)
-            self._emit_progress("Finalizing launch plan")
-            plan_dicts = result["plan"]
-            analyses = result.get("analyses", [])
-            tree = [PlanNode.from_dict(item) for item in plan_dicts]
-            self._emit_progress("Launch plan ready")
-            return PlanResult(tree=tree, analyses=analyses)
+            while (event := await finished.get()) is not None:
+                yield event
+            yield PlanCompleted(result=await task)
         finally:
-            self._progress_callback = previous_callback
+            if not task.done():
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+
+    async def _plan(
+        self,
+        idea: str,
+        progress: ProgressCallback | None,
+        run_id: str | None,
+        on_event: EventCallback | None,
+        deadline: float | None,
+        on_objective: ObjectiveCallback | None = None,
+    ) -> PlanResult:
+        if deadline is not None and deadline <= 0:
+            raise ValueError("deadline must be positive")
+        if self._checkpointer is not None and run_id is None:
+            run_id = uuid.uuid4().hex
+        started = time.perf_counter()
+        config = self._run_config(progress, run_id, on_event)
+        if deadline is not None:
+            config["configurable"]["deadline"] = time.monotonic() + deadline
+        if on_objective is not None:
+            config["configurable"]["objectives"] = on_objective
+        await self._emit_progress(config, "Generating roadmap outline")
+        state: PlannerState = {"idea": idea}
+        result = await self._graph.ainvoke(state, config)
+        return await self._build_result(config, result, run_id, started)
+
+    def resume(
+        self, run_id: str, progress: ProgressCallback | None = None, on_event: EventCallback | None = None
+    ) -> PlanResult:
+        """Blocking wrapper around :meth:`aresume`."""
+        return _run_sync(self.aresume(run_id, progress=progress, on_event=on_event))
+
+    async def aresume(
+        self, run_id: str, progress: ProgressCallback | None = None, on_event: EventCallback | None = None
+    ) -> PlanResult:
+        """Continue a checkpointed run from its last completed step.
+
+        Metrics of nodes completed before the interruption are kept; the run wall time
+        only covers this call.
+        """
+        started = time.perf_counter()
+        if self._checkpointer is None:
+            raise ValueError("Resuming requires an IdeaPlanner created with a checkpointer")
+        config = self._run_config(progress, run_id, on_event)
+        snapshot = await self._graph.aget_state(config)
+        if not snapshot.values:
+            raise KeyError(f"No checkpointed run with id {run_id!r}")
+        if snapshot.next:
+            await self._emit_progress(config, f"Resuming run {run_id}")
+        result = await self._graph.ainvoke(None, config)
+        return await self._build_result(config, result, run_id, started)
+
+    def refine(
+        self,
+        plan_result: PlanResult,
+        objective_index: int,
+        feedback: str,
+        progress: ProgressCallback | None = None,
+        on_event: EventCallback | None = None,
+    ) -> PlanResult:
+        """Blocking wrapper around :meth:`arefine`."""
+        return _run_sync(
+            self.arefine(plan_result, objective_index, feedback, progress=progress, on_event=on_event)
+        )
+
+    async def arefine(
+        self,
+        plan_result: PlanResult,
+        objective_index: int,
+        feedback: str,
+        progress: ProgressCallback | None = None,
+        on_event: EventCallback | None = None,
+    ) -> PlanResult:
+        """Re-expand one top-level objective of an existing plan according to ``feedback``.
+
+        Only that objective's ReAct expansion is re-run (a single model call plus any
+        repairs); the outline and every other branch are kept as they are, and launch
+        coverage is checked again. ``objective_index`` is zero-based. Returns a new result;
+        ``plan_result`` is not modified.
+        """
+        plan = [node.to_dict() for node in plan_result.tree]
+        if not 0 <= objective_index < len(plan):
+            raise IndexError(f"Plan has {len(plan)} objectives; objective index {objective_index} is out of range")
+        if not plan_result.idea:
+            raise ValueError("Refining requires a plan that records its idea")
+        started = time.perf_counter()
+        config = self._run_config(progress, None, on_event)
+        target = plan[objective_index]
+        tasks, analysis, records = await self._expand_objective(
+            config, shared_context(plan_result.idea, plan), target, objective_index, len(plan), feedback=feedback
+        )
+        target["tasks"] = tasks
+        self._ensure_release_step(plan)
+        analyses = list(plan_result.analyses)
+        if objective_index < len(analyses):
+            analyses[objective_index] = analysis
+        else:
+            analyses.append(analysis)
+        incomplete = [index for index in plan_result.incomplete if index != objective_index]
+        state: PlannerState = {
+            "idea": plan_result.idea,
+            "plan": plan,
+            "analyses": analyses,
+            **records,
+            "incomplete": incomplete + records.get("incomplete", []),
+        }
+        return await self._build_result(config, state, None, started)
+
+    def _run_config(
+        self, progress: ProgressCallback | None, run_id: str | None, on_event: EventCallback | None
+    ) -> RunnableConfig:
+        configurable: Dict[str, Any] = {"progress": progress, "events": on_event}
+        if run_id is not None:
+            configurable["thread_id"] = run_id
+        return {"max_concurrency": self._max_parallel_objectives, "configurable": configurable}
+
+    async def _build_result(
+        self, config: RunnableConfig, result: PlannerState, run_id: str | None, started: float
+    ) -> PlanResult:
+        await self._emit_progress(config, "Finalizing launch plan")
+        plan_dicts = result["plan"]
+        analyses = result.get("analyses", [])
+        tree = [PlanNode.from_dict(item) for item in plan_dicts]
+        repairs = [
+            RepairRecord(stage=item["stage"], path=tuple(item["path"]), title=item["title"], attempts=item["attempts"])
+            for item in result.get("repairs", [])
+        ]
+        metrics = PlanMetrics(
+            nodes=[NodeMetrics.from_dict(item) for item in result.get("metrics", [])],
+            wall_seconds=time.perf_counter() - started,
+        )
+        expansion = result.get("expansion")
+        await self._emit_progress(config, "Launch plan ready")
+        return PlanResult(
+            tree=tree,
+            analyses=analyses,
+            run_id=run_id,
+            repairs=repairs,
+            metrics=metrics,
+            expansion=None if expansion is None else ExpansionOutcome(**expansion),
+            idea=result.get("idea", ""),
+            incomplete=sorted(result.get("incomplete", [])),
+            duplicates=[
+                DuplicateRecord(
+                    kept=tuple(item["kept"]),
+                    removed=tuple(item["removed"]),
+                    title=item["title"],
+                    similarity=item["similarity"],
+                )
+                for item in result.get("duplicates", [])
+            ],
+        )
+
+    @property
+    def _graph(self) -> CompiledStateGraph:
+        # Compiled on first use so constructing a planner stays cheap.
+        if self._compiled_graph is None:
+            self._compiled_graph = self._build_graph()
+        return self._compiled_graph
+
+    def _build_graph(self) -> CompiledStateGraph:
+        from langgraph.graph import END, START, StateGraph
 
-    def _build_graph(self):
         graph: StateGraph[PlannerState] = StateGraph(PlannerState)
 
-        graph.add_node("plan", self._plan_node)
-        graph.add_node("react", self._react_node)
+        if not self._pipeline:
+            graph.add_node("plan", self._plan_node)
+            graph.add_node("react", self._react_node)
+            graph.add_node("expand", self._expand_node)
+            graph.add_node("merge", self._merge_node)
         graph.add_node("finalize", self._finalize_node)
+        # Deepening runs once every objective is expanded, before launch coverage is checked.
+        after_objectives = "finalize"
+        if self._expansion_budget is not None:
+            graph.add_node("deepen", self._deepen_node)
+            graph.add_edge("deepen", "finalize")
+            after_objectives = "deepen"
+
+        if self._pipeline:
+            graph.add_node("pipeline", self._pipeline_node)
+            graph.add_edge(START, "pipeline")
+            graph.add_edge("pipeline", after_objectives)
+        else:
+            graph.add_edge(START, "plan")
+            graph.add_conditional_edges("plan", self._route_objectives, ["react", "expand", "finalize"])
+            graph.add_conditional_edges("react", self._should_continue, {True: "react", False: after_objectives})
+            graph.add_edge("expand", "merge")
+            graph.add_edge("merge", after_objectives)
+        if self._dedupe_threshold is not None:
+            graph.add_node("dedupe", self._dedupe_node)
+            graph.add_edge("finalize", "dedupe")
+            graph.add_edge("dedupe", END)
+        else:
+            graph.add_edge("finalize", END)
+
+        return graph.compile(checkpointer=self._checkpointer)
+
+    async def _emit_progress(self, config: RunnableConfig, message: str) -> None:
+        callback = config.get("configurable", {}).get("progress")
+        if callback is None:
+            return
+        outcome = callback(message)
+        if inspect.isawaitable(outcome):
+            await outcome
+
+    async def _emit_event(self, config: RunnableConfig, event: PlanEvent) -> None:
+        callback = config.get("configurable", {}).get("events")
+        if callback is None:
+            return
+        outcome = callback(event)
+        if inspect.isawaitable(outcome):
+            await outcome
+
+    async def _emit_objective(
+        self,
+        config: RunnableConfig,
+        index: int,
+        target: Dict[str, Any],
+        tasks: List[Dict[str, Any]],
+        analysis: str,
+        records: PlannerState,
+    ) -> None:
+        configurable = config.get("configurable", {})
+        on_objective = configurable.get("objectives")
+        if on_objective is None and configurable.get("events") is None:
+            return
+        event = ObjectiveCompleted(
+            index=index,
+            node=PlanNode.from_dict({**target, "tasks": tasks}),
+            analysis=analysis,
+            metrics=NodeMetrics.from_dict(records["metrics"][-1]),
+            incomplete=bool(records.get("incomplete")),
+        )
+        if on_objective is not None:
+            on_objective(event)
+        await self._emit_event(config, event)
+
+    async def _emit_tree_events(
+        self, config: RunnableConfig, stage: str, prefix: Tuple[int, ...], items: List[Dict[str, Any]]
+    ) -> None:
+        # Children before parents, matching the order in which streamed objects close. Each
+        # item is converted once; events share its subtrees instead of rebuilding them.
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                continue
+            stack = [(prefix + (index,), PlanNode.from_dict(item), False)]
+            while stack:
+                path, node, children_done = stack.pop()
+                if children_done:
+                    await self._emit_event(config, NodeCompleted(stage=stage, path=path, node=node))
+                    continue
+                stack.append((path, node, True))
+                for child_index in range(len(node.tasks) - 1, -1, -1):
+                    stack.append((path + (child_index,), node.tasks[child_index], False))
+
+    async def _finish_stage(self, config: RunnableConfig, metrics: NodeMetrics, started: float) -> List[Dict[str, Any]]:
+        metrics.wall_seconds = time.perf_counter() - started
+        await self._emit_event(config, StageCompleted(metrics=metrics))
+        return [metrics.to_dict()]
+
+    async def _invoke_model(self, model: Runnable, messages: List[BaseMessage]) -> Any:
+        if hasattr(model, "ainvoke"):
+            return await model.ainvoke(messages)
+        return await asyncio.to_thread(model.invoke, messages)
+
+    async def _call_model(
+        self,
+        config: RunnableConfig,
+        model: Runnable,
+        messages: List[BaseMessage],
+        stage: str,
+        prefix: Tuple[int, ...],
+        metrics: NodeMetrics,
+        on_objective: Callable[[int, Dict[str, Any]], None] | None = None,
+    ) -> Tuple[Any, bool]:
+        """Invoke ``model``, streaming it through the incremental parser when events are wanted.
+
+        ``on_objective`` also turns streaming on and is called with every complete
+        top-level ``plan`` entry as soon as it closes. Returns the full response and
+        whether node events were already emitted.
+        """
+        started = time.perf_counter()
+        emit = config.get("configurable", {}).get("events") is not None
+        if not (emit or on_objective) or not hasattr(model, "astream"):
+            response = await self._invoke_model(model, messages)
+            metrics.record_call(response, time.perf_counter() - started)
+            return response, False
+        parser = IncrementalJSONParser()
+        response: Any = None
+        async for chunk in model.astream(messages):
+            response = chunk if response is None else response + chunk
+            for path, value in parser.feed(self._response_text(chunk)):
+                if on_objective is not None and len(path) == 2 and path[0] == "plan":
+                    on_objective(path[1], value)
+                if emit:
+                    tree_path = prefix + tuple(part for part in path if isinstance(part, int))
+                    await self._emit_event(
+                        config, NodeCompleted(stage=stage, path=tree_path, node=PlanNode.from_dict(value))
+                    )
+        metrics.record_call(response, time.perf_counter() - started)
+        return ("" if response is None else response), emit
+
+    def _response_text(self, response: Any) -> str:
+        if isinstance(response, dict):
+            return json.dumps(response)
+        return self._stringify_content(getattr(response, "content", response))
+
+    def _forget_response(self, model: Runnable, messages: List[BaseMessage]) -> None:
+        # Caching wrappers expose ``forget`` so an unusable response is not replayed forever.
+        forget = getattr(model, "forget", None)
+        if forget is not None:
+            forget(messages)
 
-        graph.add_edge(START, "plan")
-        graph.add_conditional_edges("plan", self._plan_has_items, {True: "react", False: "finalize"})
-        graph.add_conditional_edges("react", self._should_continue, {True: "react", False: "finalize"})
-        graph.add_edge("finalize", END)
+    async def _parse_with_repair(
+        self,
+        config: RunnableConfig,
+        model: Runnable,
+        messages: List[BaseMessage],
+        response: Any,
+        parse: Callable[[Any], _T],
+        shape: str,
+        label: str,
+        metrics: NodeMetrics,
+    ) -> Tuple[_T, int]:
+        """Parse ``response``, sending it back for repair while it is malformed.
 
-        return graph.compile()
+        Only the broken output and the reason it was rejected are sent, which is far
+        cheaper than re-running the stage. Returns the parsed value and the number of
+        repair round-trips it took.
+        """
+        attempts = 0
+        while True:
+            parse_started = time.perf_counter()
+            try:
+                value = parse(response)
+            except ValueError as exc:
+                error = exc
+            else:
+                metrics.parse_seconds += time.perf_counter() - parse_started
+                return value, attempts
+            metrics.parse_seconds += time.perf_counter() - parse_started
+            self._forget_response(model, messages)
+            if attempts == self._max_repair_attempts:
+                if attempts:
+                    raise ValueError(f"{error} (still invalid after {attempts} repair attempts)") from error
+                raise error
+            attempts += 1
+            metrics.retries = attempts
+            await self._emit_progress(
+                config, f"Repairing {label} response (attempt {attempts}/{self._max_repair_attempts})"
+            )
+            model = self._repair_model or model
+            messages = self._repair_messages(response, str(error), shape)
+            call_started = time.perf_counter()
+            response = await self._invoke_model(model, messages)
+            metrics.record_call(response, time.perf_counter() - call_started)
 
-    def _emit_progress(self, message: str) -> None:
-        if self._progress_callback:
-            self._progress_callback(message)
+    def _repair_messages(self, response: Any, reason: str, shape: str) -> List[BaseMessage]:
+        if len(reason) > _MAX_REPAIR_REASON:
+            reason = reason[:_MAX_REPAIR_REASON] + "..."
+        return repair_messages(self._response_text(response), reason, shape)
 
     def _plan_has_items(self, state: PlannerState) -> bool:
         return bool(state.get("plan"))
 
+    def _route_objectives(self, state: PlannerState) -> str | List[Send]:
+        from langgraph.types import Send
+
+        if not self._plan_has_items(state):
+            return "finalize"
+        if self._max_parallel_objectives == 1:
+            return "react"
+        plan = state["plan"]
+        return [
+            Send(
+                "expand",
+                {
+                    "idea": state["idea"],
+                    "context": self._shared_context(state),
+                    "index": index,
+                    "total": len(plan),
+                    "objective": item,
+                },
+            )
+            for index, item in enumerate(plan)
+        ]
+
+    def _shared_context(self, state: PlannerState) -> str:
+        # Checkpoints written before the context was kept in state carry only the plan.
+        return state.get("context") or shared_context(state["idea"], state["plan"])
+
     def _should_continue(self, state: PlannerState) -> bool:
         current = state.get("current_index", 0)
         plan = state.get("plan", [])
         return current < len(plan)
 
-    def _plan_node(self, state: PlannerState) -> PlannerState:
+    async def _plan_node(self, state: PlannerState, config: RunnableConfig) -> PlannerState:
+        started = time.perf_counter()
+        metrics = NodeMetrics(node="plan", title="Roadmap outline")
         idea = state["idea"]
-        messages = [
-            SystemMessage(
-                content=(
-                    "You are a senior product builder. Craft high-level launch roadmaps that end in a shipped app or web product.\n"
-                    "Return strict JSON only."
+        messages = plan_messages(idea)
+        scope = asyncio.timeout(self._time_left(config))
+        try:
+            async with scope:
+                response, streamed = await self._call_model(
+                    config, self._planner_model, messages, "plan", (), metrics
                 )
-            ),
-            HumanMessage(
-                content=(
-                    "Idea: "
-                    + idea
-                    + "\nProduce JSON with key plan -> list of 3-5 ordered objects."
-                    " Each object must include title, summary, deliverable, tasks (empty list initially)."
-                    " Focus on 2-3 levels total when tasks are later expanded."
+                plan_items, repair_attempts = await self._parse_with_repair(
+                    config,
+                    self._planner_model,
+                    messages,
+                    response,
+                    self._parse_plan,
+                    _PLAN_SHAPE,
+                    "roadmap outline",
+                    metrics,
                 )
-            ),
-        ]
-        response = self._planner_model.invoke(messages)
-        plan_dict = self._coerce_to_json(response)
-        plan_items = plan_dict.get("plan")
-        if not isinstance(plan_items, list) or not plan_items:
-            raise ValueError("Planner model did not return a non-empty plan list")
-        self._emit_progress(f"Captured {len(plan_items)} top-level objectives")
+        except TimeoutError as exc:
+            if scope.expired():
+                raise TimeoutError("Deadline reached before the roadmap outline was ready") from exc
+            raise
+        if not streamed or repair_attempts:
+            await self._emit_tree_events(config, "plan", (), plan_items)
+        await self._emit_progress(config, f"Captured {len(plan_items)} top-level objectives")
+        if self._max_parallel_objectives > 1:
+            await self._emit_progress(
+                config,
+                f"Expanding {len(plan_items)} objectives with up to {self._max_parallel_objectives} in parallel",
+            )
+        repairs = [_repair_entry("plan", (), "Roadmap outline", repair_attempts)] if repair_attempts else []
         return {
-            **state,
             "plan": plan_items,
+            "context": shared_context(idea, plan_items),
             "current_index": 0,
-            "analyses": [],
+            "repairs": repairs,
+            "metrics": await self._finish_stage(config, metrics, started),
         }
 
-    def _react_node(self, state: PlannerState) -> PlannerState:
+    async def _react_node(self, state: PlannerState, config: RunnableConfig) -> PlannerState:
+        # Only changed keys are returned, and append-only keys only get the new entries.
         plan = state["plan"]
         index = state.get("current_index", 0)
-        target = plan[index]
-        total = len(plan)
-        self._emit_progress(
-            f"Refining objective {index + 1}/{total}: {target.get('title', 'Objective')}"
+        tasks, analysis, records = await self._expand_objective(
+            config, self._shared_context(state), plan[index], index, len(plan)
         )
-        messages = [
-            SystemMessage(
-                content=(
-                    "You are the execute agent in a plan-and-execute loop."
-                    " Follow a ReAct style: alternate thought and action to stress-test and expand the plan."
-                    " Always end with Final Answer JSON."
-                )
-            ),
-            HumanMessage(
-                content=(
-                    "Idea: "
-                    + state["idea"]
-                    + "\nTop-level objective: "
-                    + target.get("title", "")
-                    + "\nSummary: "
-                    + target.get("summary", "")
-                    + "\nDeliverable: "
-                    + target.get("deliverable", "")
-                    + "\nExisting tasks: "
-                    + json.dumps(target.get("tasks", []))
-                    + "\nThink through preparation, implementation, validation, and launch readiness."
-                    " Provide a JSON object with keys analysis (list of strings capturing the ReAct steps)"
-                    " and tasks (list of child task objects with title, summary, deliverable, tasks)."
-                    " Ensure child tasks cover everything necessary for this objective and include any final"
-                    " steps required to reach production. Allow third-level subtasks when helpful."
-                )
-            ),
-        ]
-        response = self._react_model.invoke(messages)
-        payload = self._coerce_to_json(response)
-        analysis = payload.get("analysis", [])
-        tasks = payload.get("tasks", [])
-        if not isinstance(tasks, list) or not tasks:
-            raise ValueError("ReAct model must return non-empty tasks list")
         plan[index]["tasks"] = tasks
-        analyses = state.get("analyses", []) + [self._format_analysis(target.get("title", ""), analysis)]
-        self._emit_progress(f"Completed objective {index + 1}/{total}")
+        await self._emit_objective(config, index, plan[index], tasks, analysis, records)
         return {
-            **state,
             "plan": plan,
             "current_index": index + 1,
+            "analyses": [analysis],
+            **records,
+        }
+
+    async def _expand_node(self, state: ObjectiveState, config: RunnableConfig) -> PlannerState:
+        index = state["index"]
+        tasks, analysis, records = await self._expand_objective(
+            config, state["context"], state["objective"], index, state["total"]
+        )
+        await self._emit_objective(config, index, state["objective"], tasks, analysis, records)
+        return {"expansions": [{"index": index, "tasks": tasks, "analysis": analysis}], **records}
+
+    def _merge_node(self, state: PlannerState) -> PlannerState:
+        plan = state["plan"]
+        expansions = sorted(state.get("expansions", []), key=lambda item: item["index"])
+        for expansion in expansions:
+            plan[expansion["index"]]["tasks"] = expansion["tasks"]
+        return {
+            "plan": plan,
+            "current_index": len(plan),
+            "analyses": [expansion["analysis"] for expansion in expansions],
+        }
+
+    async def _pipeline_node(self, state: PlannerState, config: RunnableConfig) -> PlannerState:
+        """Stream the outline and expand each objective as soon as its JSON object closes."""
+        started = time.perf_counter()
+        metrics = NodeMetrics(node="plan", title="Roadmap outline")
+        idea = state["idea"]
+        messages = plan_messages(idea)
+        slots = asyncio.Semaphore(self._max_parallel_objectives)
+        outline: List[Dict[str, Any]] = []
+        # Every objective call shares this prefix; the outline so far goes into its suffix.
+        context = idea_context(idea)
+        running: Dict[int, Tuple[List[Dict[str, Any]], asyncio.Task[_Expansion]]] = {}
+
+        async def expand(
+            item: Dict[str, Any], preceding: List[Dict[str, Any]], index: int, total: int | None
+        ) -> _Expansion:
+            async with slots:
+                outcome = await self._expand_objective(config, context, item, index, total, preceding=preceding)
+            await self._emit_objective(config, index, item, *outcome)
+            return outcome
+
+        def start(index: int, items: List[Dict[str, Any]], total: int | None = None) -> None:
+            # ``items`` is the outline up to and including this objective.
+            running[index] = (items, asyncio.create_task(expand(items[index], items[:index], index, total)))
+
+        def on_objective(index: int, item: Dict[str, Any]) -> None:
+            if index == len(outline):
+                outline.append(item)
+                start(index, list(outline))
+
+        await self._emit_progress(
+            config, f"Expanding objectives as the outline streams in, up to {self._max_parallel_objectives} at a time"
+        )
+        scope = asyncio.timeout(self._time_left(config))
+        try:
+            try:
+                async with scope:
+                    response, streamed = await self._call_model(
+                        config, self._planner_model, messages, "plan", (), metrics, on_objective
+                    )
+                    plan_items, repair_attempts = await self._parse_with_repair(
+                        config,
+                        self._planner_model,
+                        messages,
+                        response,
+                        self._parse_plan,
+                        _PLAN_SHAPE,
+                        "roadmap outline",
+                        metrics,
+                    )
+            except TimeoutError as exc:
+                if scope.expired():
+                    raise TimeoutError("Deadline reached before the roadmap outline was ready") from exc
+                raise
+            if not streamed or repair_attempts:
+                await self._emit_tree_events(config, "plan", (), plan_items)
+            total = len(plan_items)
+            await self._emit_progress(config, f"Captured {total} top-level objectives")
+            plan_metrics = await self._finish_stage(config, metrics, started)
+            # Expansions started from streamed entries the final outline disagrees with are redone.
+            for index in range(total):
+                streamed_items, task = running.get(index, (None, None))
+                if task is None or streamed_items != plan_items[: index + 1]:
+                    if task is not None:
+                        task.cancel()
+                    start(index, plan_items[: index + 1], total)
+            for index in [index for index in running if index >= total]:
+                running.pop(index)[1].cancel()
+            outcomes = [await running[index][1] for index in range(total)]
+        finally:
+            for _, task in running.values():
+                task.cancel()
+        repairs = [_repair_entry("plan", (), "Roadmap outline", repair_attempts)] if repair_attempts else []
+        analyses: List[str] = []
+        incomplete: List[int] = []
+        for item, (tasks, analysis, updates) in zip(plan_items, outcomes):
+            item["tasks"] = tasks
+            analyses.append(analysis)
+            repairs += updates["repairs"]
+            plan_metrics += updates["metrics"]
+            incomplete += updates.get("incomplete", [])
+        return {
+            "plan": plan_items,
+            "context": shared_context(idea, plan_items),
+            "current_index": total,
             "analyses": analyses,
+            "repairs": repairs,
+            "metrics": plan_metrics,
+            "incomplete": incomplete,
+        }
+
+    async def _expand_objective(
+        self,
+        config: RunnableConfig,
+        context: str,
+        target: Dict[str, Any],
+        index: int,
+        total: int | None,
+        feedback: str | None = None,
+        preceding: List[Dict[str, Any]] | None = None,
+    ) -> Tuple[List[Dict[str, Any]], str, PlannerState]:
+        """Expand one objective; also returns its ``repairs`` and ``metrics`` state updates.
+
+        ``total`` is ``None`` while the outline is still streaming in, and ``preceding``
+        holds the outline before this objective in pipelined runs.
+        """
+        started = time.perf_counter()
+        title = target.get("title", "")
+        metrics = NodeMetrics(node="react", path=(index,), title=title)
+        time_left = self._time_left(config)
+        if time_left is not None and time_left <= 0:
+            return await self._incomplete_objective(config, target, index, total, metrics, started)
+        label = f"objective {_ordinal(index, total)}"
+        await self._emit_progress(config, f"Refining {label}: {target.get('title', 'Objective')}")
+        messages = objective_messages(context, target, feedback, preceding)
+        scope = asyncio.timeout(time_left)
+        try:
+            async with scope:
+                accepted = await self._try_cascade(config, messages, label, metrics)
+                if accepted is not None:
+                    (tasks, analysis), repair_attempts, streamed = accepted, 0, False
+                else:
+                    response, streamed = await self._call_model(
+                        config, self._react_model, messages, "react", (index,), metrics
+                    )
+                    (tasks, analysis), repair_attempts = await self._parse_with_repair(
+                        config,
+                        self._react_model,
+                        messages,
+                        response,
+                        self._parse_expansion,
+                        _EXPANSION_SHAPE,
+                        label,
+                        metrics,
+                    )
+        except TimeoutError:
+            if not scope.expired():
+                raise
+            return await self._incomplete_objective(config, target, index, total, metrics, started)
+        if not streamed or repair_attempts:
+            await self._emit_tree_events(config, "react", (index,), tasks)
+        await self._emit_progress(config, f"Completed {label}")
+        repairs = [_repair_entry("react", (index,), title, repair_attempts)] if repair_attempts else []
+        records: PlannerState = {"repairs": repairs, "metrics": await self._finish_stage(config, metrics, started)}
+        return tasks, self._format_analysis(title, analysis), records
+
+    async def _incomplete_objective(
+        self,
+        config: RunnableConfig,
+        target: Dict[str, Any],
+        index: int,
+        total: int | None,
+        metrics: NodeMetrics,
+        started: float,
+    ) -> Tuple[List[Dict[str, Any]], str, PlannerState]:
+        """Give up on an objective at the deadline, keeping whatever tasks it already had."""
+        title = target.get("title", "")
+        await self._emit_progress(config, f"Deadline reached; objective {_ordinal(index, total)} left incomplete")
+        records: PlannerState = {
+            "repairs": [],
+            "metrics": await self._finish_stage(config, metrics, started),
+            "incomplete": [index],
         }
+        return list(target.get("tasks") or []), f"{title}: incomplete (deadline reached)", records
 
-    def _finalize_node(self, state: PlannerState) -> PlannerState:
+    def _time_left(self, config: RunnableConfig) -> float | None:
+        deadline = config.get("configurable", {}).get("deadline")
+        return None if deadline is None else deadline - time.monotonic()
+
+    async def _deepen_node(self, state: PlannerState, config: RunnableConfig) -> PlannerState:
+        budget = self._expansion_budget
+        assert budget is not None
+        time_left = self._time_left(config)
+        if time_left is not None:
+            seconds = time_left if budget.max_seconds is None else min(budget.max_seconds, time_left)
+            budget = replace(budget, max_seconds=max(0.0, seconds))
+        plan = state["plan"]
+        context = self._shared_context(state)
+        records: PlannerState = {"repairs": [], "metrics": []}
+
+        async def expand(
+            node: Dict[str, Any], path: Tuple[int, ...], ancestors: Tuple[str, ...]
+        ) -> Tuple[List[Dict[str, Any]], int]:
+            return await self._expand_subtask(config, context, node, path, ancestors, records)
+
+        async def on_expanded(node: Dict[str, Any], path: Tuple[int, ...], children: List[Dict[str, Any]]) -> None:
+            await self._emit_tree_events(config, "deepen", path, children)
+
+        await self._emit_progress(config, f"Deepening plan up to {budget.max_depth} levels")
+        outcome = await expand_tree(
+            plan, expand, budget, concurrency=self._max_parallel_objectives, on_expanded=on_expanded
+        )
+        summary = f"Deepened {outcome.expanded} tasks (+{outcome.added} nodes)"
+        if outcome.stop_reason != "complete":
+            summary += f"; {outcome.stop_reason} budget reached with {outcome.pending} tasks left as leaves"
+        await self._emit_progress(config, summary)
+        return {"plan": plan, **records, "expansion": outcome.to_dict()}
+
+    async def _expand_subtask(
+        self,
+        config: RunnableConfig,
+        context: str,
+        target: Dict[str, Any],
+        path: Tuple[int, ...],
+        ancestors: Tuple[str, ...],
+        records: PlannerState,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Break one leaf task into sub-tasks and return them with the tokens spent.
+
+        Repairs and metrics are appended to ``records``, including those of a response that
+        stays unusable; such a failure is raised as :class:`ExpansionFailed` carrying the
+        tokens spent, so they count against the deepening budget. Calls are not streamed:
+        children only become tree nodes once the scheduler has fitted them into the node
+        budget, and are announced then.
+        """
+        started = time.perf_counter()
+        title = target.get("title", "")
+        metrics = NodeMetrics(node="deepen", path=path, title=title)
+        messages = subtask_messages(context, target, ancestors)
+        label = f"task {title!r}"
+        repair_attempts = 0
+        try:
+            accepted = await self._try_cascade(config, messages, label, metrics)
+            if accepted is not None:
+                tasks, _ = accepted
+            else:
+                call_started = time.perf_counter()
+                response = await self._invoke_model(self._react_model, messages)
+                metrics.record_call(response, time.perf_counter() - call_started)
+                (tasks, _), repair_attempts = await self._parse_with_repair(
+                    config,
+                    self._react_model,
+                    messages,
+                    response,
+                    self._parse_expansion,
+                    _EXPANSION_SHAPE,
+                    label,
+                    metrics,
+                )
+        except Exception as exc:
+            raise ExpansionFailed(str(exc), metrics.total_tokens) from exc
+        finally:
+            records["metrics"] += await self._finish_stage(config, metrics, started)
+        if repair_attempts:
+            records["repairs"].append(_repair_entry("deepen", path, title, repair_attempts))
+        return tasks, metrics.total_tokens
+
+    async def _try_cascade(
+        self, config: RunnableConfig, messages: List[BaseMessage], label: str, metrics: NodeMetrics
+    ) -> Tuple[List[Dict[str, Any]], Any] | None:
+        """Ask the cascade models in order and return the first answer that validates.
+
+        Returns ``None`` when every cascade model failed (or none is configured), leaving
+        the node to ``react_model``. Cascade calls are not streamed, since an answer may
+        still be rejected after it has arrived, and get no repair round-trips: escalating
+        is the repair. ``metrics.tier`` records which model answered.
+        """
+        if not self._cascade_models:
+            return None
+        for tier, model in enumerate(self._cascade_models):
+            call_started = time.perf_counter()
+            try:
+                response = await self._invoke_model(model, messages)
+            except Exception as exc:  # noqa: BLE001 - any failure of a cheaper model escalates
+                metrics.model_seconds += time.perf_counter() - call_started
+                reason = f"{type(exc).__name__}: {exc}"
+            else:
+                metrics.record_call(response, time.perf_counter() - call_started)
+                parse_started = time.perf_counter()
+                try:
+                    tasks, analysis = self._parse_expansion(response)
+                    self._validate_cascade_tasks(tasks)
+                except ValueError as exc:
+                    reason = str(exc)
+                    self._forget_response(model, messages)
+                else:
+                    metrics.parse_seconds += time.perf_counter() - parse_started
+                    metrics.tier = tier
+                    return tasks, analysis
+                metrics.parse_seconds += time.perf_counter() - parse_started
+            await self._emit_progress(config, f"Escalating {label} past model tier {tier + 1}: {reason[:100]}")
+        metrics.tier = len(self._cascade_models)
+        return None
+
+    def _validate_cascade_tasks(self, tasks: List[Any]) -> None:
+        if len(tasks) < self._cascade_min_tasks:
+            raise ValueError(f"expected at least {self._cascade_min_tasks} tasks, got {len(tasks)}")
+        for position, task in enumerate(tasks, start=1):
+            if not isinstance(task, dict):
+                raise ValueError(f"task {position} is not an object")
+            missing = [key for key in ("title", "summary", "deliverable") if not str(task.get(key) or "").strip()]
+            if missing:
+                raise ValueError(f"task {position} is missing {', '.join(missing)}")
+
+    def _parse_plan(self, response: Any) -> List[Dict[str, Any]]:
+        plan_items = self._coerce_to_json(response, ("plan",)).get("plan")
+        if not isinstance(plan_items, list) or not plan_items:
+            raise ValueError("Planner model did not return a non-empty plan list")
+        self._validate_nodes(plan_items, "objective")
+        return plan_items
+
+    def _parse_expansion(self, response: Any) -> Tuple[List[Dict[str, Any]], Any]:
+        payload = self._coerce_to_json(response, ("tasks",))
+        tasks = payload.get("tasks", [])
+        if not isinstance(tasks, list) or not tasks:
+            raise ValueError("ReAct model must return non-empty tasks list")
+        self._validate_nodes(tasks, "task")
+        return tasks, payload.get("analysis", [])
+
+    def _validate_nodes(self, items: List[Any], label: str) -> None:
+        # Iterative, like the rest of the tree code, so very deep replies cannot recurse too far.
+        stack = [(str(position), item) for position, item in reversed(list(enumerate(items, start=1)))]
+        while stack:
+            position, item = stack.pop()
+            if not isinstance(item, dict):
+                raise ValueError(f"{label} {position} is not an object")
+            children = item.get("tasks")
+            if children is None:
+                continue
+            if not isinstance(children, list):
+                raise ValueError(f"{label} {position} has tasks that are not a list")
+            numbered = enumerate(children, start=1)
+            stack.extend((f"{position}.{index}", child) for index, child in reversed(list(numbered)))
+
+    async def _finalize_node(self, state: PlannerState, config: RunnableConfig) -> PlannerState:
+        started = time.perf_counter()
         plan = state.get("plan", [])
         if not plan:
             raise ValueError("Finalization received empty plan")
-        self._emit_progress("Ensuring launch coverage")
+        await self._emit_progress(config, "Ensuring launch coverage")
         self._ensure_release_step(plan)
-        return state
+        metrics = NodeMetrics(node="finalize", title="Launch coverage")
+        return {"plan": plan, "metrics": await self._finish_stage(config, metrics, started)}
+
+    async def _dedupe_node(self, state: PlannerState, config: RunnableConfig) -> PlannerState:
+        threshold = self._dedupe_threshold
+        assert threshold is not None
+        started = time.perf_counter()
+        plan = state["plan"]
+        await self._emit_progress(config, "Merging duplicate tasks")
+        records = dedupe_plan(plan, threshold)
+        if records:
+            await self._emit_progress(config, f"Merged {len(records)} duplicate tasks")
+        metrics = NodeMetrics(node="dedupe", title="Duplicate tasks")
+        return {
+            "plan": plan,
+            "duplicates": [record.to_dict() for record in records],
+            "metrics": await self._finish_stage(config, metrics, started),
+        }
 
     def _ensure_release_step(self, plan: List[Dict[str, Any]]) -> None:
         release_keywords = ("launch", "release", "deploy", "submission", "publish")
@@ -251,16 +1254,18 @@ class IdeaPlanner:
         )
 
     def _contains_release(self, item: Dict[str, Any], keywords: Iterable[str]) -> bool:
-        text = " ".join(
-            str(part).lower()
-            for part in [item.get("title"), item.get("summary"), item.get("deliverable")]
-            if part
-        )
-        if any(keyword in text for keyword in keywords):
-            return True
-        for child in item.get("tasks", []) or []:
-            if self._contains_release(child, keywords):
+        keywords = tuple(keywords)
+        stack = [item]
+        while stack:
+            current = stack.pop()
+            text = " ".join(
+                str(part).lower()
+                for part in [current.get("title"), current.get("summary"), current.get("deliverable")]
+                if part
+            )
+            if any(keyword in text for keyword in keywords):
                 return True
+            stack.extend(current.get("tasks", []) or [])
         return False
 
     def _format_analysis(self, title: str, analysis: Any) -> str:
@@ -269,7 +1274,7 @@ class IdeaPlanner:
             return f"{title}: {cleaned}" if cleaned else title
         return f"{title}: {analysis}"
 
-    def _coerce_to_json(self, response: Any) -> Dict[str, Any]:
+    def _coerce_to_json(self, response: Any, expected_keys: Sequence[str] = ()) -> Dict[str, Any]:
         if isinstance(response, dict):
             return response
         if hasattr(response, "content"):
@@ -283,32 +1288,14 @@ class IdeaPlanner:
             text = text[len("```json") :]
         text = text.strip("`\n ")
         try:
-            return json.loads(text)
+            payload = select_expected(json.loads(text), expected_keys)
         except json.JSONDecodeError:
-            candidate = self._extract_first_json_block(text)
-            if candidate is not None:
-                return json.loads(candidate)
-            raise ValueError(f"Model did not return valid JSON: {text}")
-
-    def _extract_first_json_block(self, text: str) -> str | None:
-        for opener, closer in ('{}', '[]'):
-            stack = 0
-            start = None
-            for index, char in enumerate(text):
-                if char == opener:
-                    if stack == 0:
-                        start = index
-                    stack += 1
-                elif char == closer and stack:
-                    stack -= 1
-                    if stack == 0 and start is not None:
-                        candidate = text[start:index + 1]
-                        try:
-                            json.loads(candidate)
-                        except json.JSONDecodeError:
-                            continue
-                        return candidate
-        return None
+            payload = recover_json(text, expected_keys)
+            if payload is None:
+                raise ValueError(f"Model did not return valid JSON: {text}")
+        if not isinstance(payload, dict):
+            raise ValueError(f"Model returned JSON {type(payload).__name__} instead of an object")
+        return payload
 
     def _stringify_content(self, payload: Any) -> str:
         if isinstance(payload, str):
@@ -326,4 +1313,62 @@ class IdeaPlanner:
         return str(payload)
 
 
-__all__ = ["IdeaPlanner", "PlanTree", "PlanNode", "PlanResult"]
+def _ordinal(index: int, total: int | None) -> str:
+    return f"{index + 1}/{total}" if total is not None else str(index + 1)
+
+
+def _repair_entry(stage: str, path: Tuple[int, ...], title: str, attempts: int) -> Dict[str, Any]:
+    return {"stage": stage, "path": list(path), "title": title, "attempts": attempts}
+
+
+def _iterate_sync(stream: AsyncIterator[_T]) -> Iterator[_T]:
+    """Iterate ``stream`` from synchronous code, running it on a helper thread's event loop."""
+    items: queue.Queue[Tuple[bool, Any]] = queue.Queue()
+    ready = threading.Event()
+    handle: Dict[str, Any] = {}
+
+    async def pump() -> None:
+        handle["loop"], handle["task"] = asyncio.get_running_loop(), asyncio.current_task()
+        ready.set()
+        try:
+            async for item in stream:
+                items.put((True, item))
+        except BaseException as exc:  # noqa: BLE001 - re-raised in the consuming thread
+            items.put((False, exc))
+        else:
+            items.put((False, None))
+
+    thread = threading.Thread(target=asyncio.run, args=(pump(),), daemon=True)
+    thread.start()
+    ready.wait()
+    try:
+        while True:
+            ok, value = items.get()
+            if ok:
+                yield value
+            elif value is not None:
+                raise value
+            else:
+                return
+    finally:
+        if thread.is_alive():
+            with contextlib.suppress(RuntimeError):  # the loop closed in the meantime
+                handle["loop"].call_soon_threadsafe(handle["task"].cancel)
+        thread.join()
+
+
+def _run_sync(coroutine: Coroutine[Any, Any, _T]) -> _T:
+    """Run ``coroutine`` to completion from synchronous code.
+
+    Falls back to a helper thread when called from inside a running event loop
+    (e.g. notebooks), where ``asyncio.run`` is not allowed.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coroutine).result()
+
+
+__all__ = ["IdeaPlanner", "PlanTree", "PlanNode", "PlanResult", "RepairRecord", "render_tree"]
@@ -0,0 +1,158 @@
+# Author: everettjf
+"""Versioned prompt templates for every planner stage.
+
+Providers cache the longest previously seen prompt prefix, so every execute-stage call
+of a run (objective expansion and deepening) starts with the same two messages: the
+execute instructions and a context block holding the idea and the roadmap outline. Only
+the final message, describing the objective or task at hand, differs between calls.
+Anything that varies per call must therefore go into that last message. Pipelined runs
+expand objectives before the outline is complete, so their objective calls share a
+context block holding only the idea, and the outline written so far goes into the last
+message.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any, Dict, List, Sequence
+
+if TYPE_CHECKING:
+    from langchain_core.messages import BaseMessage
+
+# Bump whenever a template changes, so runs (and their metrics) can be told apart.
+PROMPT_VERSION = "3"
+
+PLAN_SYSTEM = (
+    "You are a senior product builder. Craft high-level launch roadmaps that end in a shipped app or web product.\n"
+    "Return strict JSON only."
+)
+PLAN_TEMPLATE = (
+    "Idea: {idea}\n"
+    "Produce JSON with key plan -> list of 3-5 ordered objects."
+    " Each object must include title, summary, deliverable, tasks (empty list initially)."
+    " Focus on 2-3 levels total when tasks are later expanded."
+)
+
+EXECUTE_SYSTEM = (
+    "You are the execute agent in a plan-and-execute loop."
+    " Follow a ReAct style: alternate thought and action to stress-test and expand the plan."
+    " Always end with Final Answer JSON."
+)
+CONTEXT_TEMPLATE = "Idea: {idea}\nRoadmap outline (JSON):\n{outline}"
+IDEA_CONTEXT_TEMPLATE = "Idea: {idea}"
+# Leads the objective message in pipelined runs, where the outline is still being written.
+PRECEDING_TEMPLATE = "Roadmap so far, before this objective (JSON; more may follow):\n{outline}\n"
+OBJECTIVE_TEMPLATE = (
+    "Top-level objective: {title}\n"
+    "Summary: {summary}\n"
+    "Deliverable: {deliverable}\n"
+    "Existing tasks: {tasks}\n"
+    "Think through preparation, implementation, validation, and launch readiness."
+    " Provide a JSON object with keys analysis (list of strings capturing the ReAct steps)"
+    " and tasks (list of child task objects with title, summary, deliverable, tasks)."
+    " Ensure child tasks cover everything necessary for this objective and include any final"
+    " steps required to reach production. Allow third-level subtasks when helpful."
+)
+# Appended to an objective prompt when a user asks for one branch to be redone.
+FEEDBACK_TEMPLATE = (
+    "\nReviewer feedback on the existing tasks: {feedback}\n"
+    "Rewrite the tasks for this objective to address the feedback; keep what it does not ask to change."
+)
+SUBTASK_TEMPLATE = (
+    "Parent tasks: {ancestors}\n"
+    "Task: {title}\n"
+    "Summary: {summary}\n"
+    "Deliverable: {deliverable}\n"
+    "Break this single task into concrete sub-tasks."
+    " Provide a JSON object with keys analysis (list of strings) and tasks (list of 2-5 child"
+    " task objects with title, summary, deliverable and tasks as an empty list)."
+)
+
+REPAIR_SYSTEM = (
+    "You repair malformed JSON produced by another model."
+    " Return only the corrected JSON, without commentary or code fences."
+    " Keep every item that is present; do not invent new content."
+)
+REPAIR_TEMPLATE = "Required shape: {shape}\nProblem: {reason}\nBroken output:\n{output}"
+
+_OUTLINE_FIELDS = ("title", "summary", "deliverable")
+
+
+def plan_messages(idea: str) -> List[BaseMessage]:
+    from langchain_core.messages import HumanMessage, SystemMessage
+
+    return [SystemMessage(content=PLAN_SYSTEM), HumanMessage(content=PLAN_TEMPLATE.format(idea=idea))]
+
+
+def shared_context(idea: str, plan: Sequence[Dict[str, Any]]) -> str:
+    """Render the run-wide context block shared by every execute-stage prompt.
+
+    Only the outline fields that never change during a run are included, serialized
+    canonically, so the block stays byte-identical while objectives gain tasks.
+    """
+    return CONTEXT_TEMPLATE.format(idea=idea, outline=_outline_json(plan))
+
+
+def idea_context(idea: str) -> str:
+    """Context block of pipelined objective calls: the idea alone, identical for every call."""
+    return IDEA_CONTEXT_TEMPLATE.format(idea=idea)
+
+
+def objective_messages(
+    context: str,
+    objective: Dict[str, Any],
+    feedback: str | None = None,
+    preceding: Sequence[Dict[str, Any]] | None = None,
+) -> List[BaseMessage]:
+    """Messages expanding ``objective``; ``preceding`` is the partial outline of a pipelined run."""
+    from langchain_core.messages import HumanMessage, SystemMessage
+
+    suffix = "" if preceding is None else PRECEDING_TEMPLATE.format(outline=_outline_json(preceding))
+    suffix += OBJECTIVE_TEMPLATE.format(
+        title=objective.get("title", ""),
+        summary=objective.get("summary", ""),
+        deliverable=objective.get("deliverable", ""),
+        tasks=_canonical_json(objective.get("tasks", [])),
+    )
+    if feedback:
+        suffix += FEEDBACK_TEMPLATE.format(feedback=feedback)
+    return [SystemMessage(content=EXECUTE_SYSTEM), HumanMessage(content=context), HumanMessage(content=suffix)]
+
+
+def subtask_messages(context: str, task: Dict[str, Any], ancestors: Sequence[str]) -> List[BaseMessage]:
+    from langchain_core.messages import HumanMessage, SystemMessage
+
+    suffix = SUBTASK_TEMPLATE.format(
+        ancestors=" > ".join(ancestors),
+        title=task.get("title", ""),
+        summary=task.get("summary", ""),
+        deliverable=task.get("deliverable", ""),
+    )
+    return [SystemMessage(content=EXECUTE_SYSTEM), HumanMessage(content=context), HumanMessage(content=suffix)]
+
+
+def repair_messages(output: str, reason: str, shape: str) -> List[BaseMessage]:
+    from langchain_core.messages import HumanMessage, SystemMessage
+
+    content = REPAIR_TEMPLATE.format(shape=shape, reason=reason, output=output)
+    return [SystemMessage(content=REPAIR_SYSTEM), HumanMessage(content=content)]
+
+
+def _outline_json(plan: Sequence[Dict[str, Any]]) -> str:
+    outline = [{key: item.get(key, "") for key in _OUTLINE_FIELDS} for item in plan if isinstance(item, dict)]
+    return _canonical_json(outline)
+
+
+def _canonical_json(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+__all__ = [
+    "PROMPT_VERSION",
+    "idea_context",
+    "objective_messages",
+    "plan_messages",
+    "repair_messages",
+    "shared_context",
+    "subtask_messages",
+]
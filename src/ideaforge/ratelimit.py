@@ -0,0 +1,340 @@
+# Author: everettjf
+"""Process-wide scheduling of model calls under provider rate limits.
+
+Every wrapped model call first takes a slot from a shared :class:`RateLimitScheduler`:
+
+- token buckets hold requests and tokens per minute under the configured quota, so
+  parallel objectives and concurrent plans queue locally instead of bursting into 429s;
+- concurrency adapts AIMD-style: each success raises the limit by about one slot per
+  window, each rate-limit error halves it and pauses dispatch for the provider's
+  ``Retry-After`` (or a short backoff);
+- waiting calls are served by priority, so outline calls are never stuck behind a
+  queue of ReAct expansions from other plans.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Dict, List, Sequence, Tuple
+
+from .cache import _model_id
+from .metrics import token_usage
+
+# Lower numbers are served first.
+PRIORITY_OUTLINE = 0
+PRIORITY_EXPAND = 1
+DEFAULT_BACKOFF_SECONDS = 1.0
+
+
+@dataclass(frozen=True)
+class RateLimits:
+    """Quota shared by every call that goes through one scheduler (``None`` = unlimited).
+
+    Providers enforce per-minute quotas over shorter windows too, so bursts are capped
+    at ``burst_seconds`` worth of the quota rather than a whole minute's.
+    """
+
+    requests_per_minute: float | None = None
+    tokens_per_minute: float | None = None
+    burst_seconds: float = 1.0
+    max_concurrency: int = 16
+    min_concurrency: int = 1
+    initial_concurrency: int = 4
+
+    def __post_init__(self) -> None:
+        if self.requests_per_minute is not None and self.requests_per_minute <= 0:
+            raise ValueError("requests_per_minute must be positive")
+        if self.tokens_per_minute is not None and self.tokens_per_minute <= 0:
+            raise ValueError("tokens_per_minute must be positive")
+        if self.burst_seconds <= 0:
+            raise ValueError("burst_seconds must be positive")
+        if not 1 <= self.min_concurrency <= self.max_concurrency:
+            raise ValueError("concurrency limits must satisfy 1 <= min_concurrency <= max_concurrency")
+
+
+@dataclass
+class SchedulerStats:
+    calls: int = 0
+    rate_limited: int = 0
+    wait_seconds: float = 0.0
+    peak_in_flight: int = 0
+    concurrency_limit: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class RateLimitError(RuntimeError):
+    """A provider rejected a call for exceeding its rate limit (HTTP 429)."""
+
+    def __init__(self, message: str = "rate limit exceeded", retry_after: float | None = None) -> None:
+        super().__init__(message)
+        self.status_code = 429
+        self.retry_after = retry_after
+
+
+class _TokenBucket:
+    """Refills ``per_minute`` units per minute, holding at most ``burst_seconds`` worth (and at least 1)."""
+
+    def __init__(self, per_minute: float, burst_seconds: float, now: float) -> None:
+        self.rate = per_minute / 60
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity
+        self.updated = now
+
+    def delay(self, amount: float, now: float) -> float:
+        self._refill(now)
+        needed = min(amount, self.capacity)
+        return 0.0 if self.level >= needed else (needed - self.level) / self.rate
+
+    def take(self, amount: float, now: float) -> None:
+        # A negative amount returns an over-estimate; the level may dip below zero on overuse.
+        self._refill(now)
+        self.level = min(self.capacity, self.level - amount)
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+@dataclass
+class _Grant:
+    tokens: int
+    started: float
+
+
+class RateLimitScheduler:
+    """Admits model calls under a shared :class:`RateLimits` quota.
+
+    One scheduler is meant to be shared by every model of a process (all planner stages,
+    all concurrent plans). It must be used from one event loop at a time.
+    """
+
+    def __init__(self, limits: RateLimits | None = None) -> None:
+        self.limits = limits or RateLimits()
+        now = time.monotonic()
+        self._requests = _bucket(self.limits.requests_per_minute, self.limits.burst_seconds, now)
+        self._tokens = _bucket(self.limits.tokens_per_minute, self.limits.burst_seconds, now)
+        initial = min(max(self.limits.initial_concurrency, self.limits.min_concurrency), self.limits.max_concurrency)
+        self._limit = float(initial)
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._last_backoff = float("-inf")
+        self._waiters: List[Tuple[int, int, int, asyncio.Future[_Grant]]] = []
+        self._sequence = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+        self._stats = SchedulerStats(concurrency_limit=self._limit)
+
+    def stats(self) -> SchedulerStats:
+        return SchedulerStats(**{**self._stats.to_dict(), "concurrency_limit": self._limit})
+
+    async def acquire(self, priority: int = PRIORITY_EXPAND, tokens: int = 0) -> _Grant:
+        """Wait until a call of about ``tokens`` tokens may start."""
+        future: asyncio.Future[_Grant] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), tokens, future))
+        started = time.monotonic()
+        self._dispatch()
+        try:
+            grant = await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(future.result())
+            raise
+        self._stats.wait_seconds += time.monotonic() - started
+        return grant
+
+    def release(
+        self,
+        grant: _Grant,
+        tokens_used: int | None = None,
+        rate_limited: bool = False,
+        retry_after: float | None = None,
+    ) -> None:
+        """Finish a call: settle its token estimate and adapt concurrency to the outcome."""
+        self._in_flight -= 1
+        now = time.monotonic()
+        if self._tokens is not None and tokens_used is not None:
+            self._tokens.take(tokens_used - grant.tokens, now)
+        limits = self.limits
+        if rate_limited:
+            self._stats.rate_limited += 1
+            # Calls already in flight when the limit was cut report the same overload once.
+            if grant.started >= self._last_backoff:
+                self._limit = max(float(limits.min_concurrency), self._limit / 2)
+                self._last_backoff = now
+            pause = retry_after if retry_after is not None else DEFAULT_BACKOFF_SECONDS
+            self._paused_until = max(self._paused_until, now + pause)
+        else:
+            self._limit = min(float(limits.max_concurrency), self._limit + 1 / self._limit)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        while self._waiters:
+            if self._in_flight >= int(self._limit):
+                return
+            if now < self._paused_until:
+                self._wake_in(self._paused_until - now)
+                return
+            _, _, tokens, future = self._waiters[0]
+            if future.done():  # the waiting call was cancelled
+                heapq.heappop(self._waiters)
+                continue
+            delay = max(
+                self._requests.delay(1, now) if self._requests is not None else 0.0,
+                self._tokens.delay(tokens, now) if self._tokens is not None else 0.0,
+            )
+            if delay > 0:
+                self._wake_in(delay)
+                return
+            heapq.heappop(self._waiters)
+            if self._requests is not None:
+                self._requests.take(1, now)
+            if self._tokens is not None:
+                self._tokens.take(tokens, now)
+            self._in_flight += 1
+            self._stats.calls += 1
+            self._stats.peak_in_flight = max(self._stats.peak_in_flight, self._in_flight)
+            future.set_result(_Grant(tokens=tokens, started=now))
+
+    def _wake_in(self, delay: float) -> None:
+        loop = asyncio.get_running_loop()
+        when = loop.time() + delay
+        if self._timer is not None and not self._timer.cancelled() and self._timer.when() <= when:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = loop.call_at(when, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+
+class ScheduledModel:
+    """Wraps an async chat model so every call is admitted by a :class:`RateLimitScheduler`.
+
+    Calls that fail with a rate-limit error are retried (up to ``max_retries`` times)
+    once the scheduler lets them through again; other errors propagate unchanged. The
+    token cost of a call is estimated from the prompt length plus
+    ``completion_tokens`` and settled with the provider's reported usage afterwards.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        scheduler: RateLimitScheduler,
+        priority: int = PRIORITY_EXPAND,
+        max_retries: int = 6,
+        completion_tokens: int = 1024,
+    ) -> None:
+        self.model = model
+        self.scheduler = scheduler
+        self.priority = priority
+        self.max_retries = max_retries
+        self.completion_tokens = completion_tokens
+        # Read by the response cache to key entries on the underlying model.
+        self.model_name = _model_id(model)
+        self.temperature = getattr(model, "temperature", None)
+
+    async def ainvoke(self, messages: Sequence[Any], *args: Any, **kwargs: Any) -> Any:
+        estimate = self._estimate(messages)
+        for attempt in range(self.max_retries + 1):
+            grant = await self.scheduler.acquire(self.priority, estimate)
+            try:
+                response = await self._ainvoke_model(messages, *args, **kwargs)
+            except Exception as exc:
+                limited = is_rate_limit_error(exc)
+                self.scheduler.release(grant, rate_limited=limited, retry_after=_retry_after(exc))
+                if limited and attempt < self.max_retries:
+                    continue
+                raise
+            except BaseException:
+                # Cancelled (e.g. at a planning deadline): the slot must still be returned.
+                self.scheduler.release(grant)
+                raise
+            self.scheduler.release(grant, _used_tokens(response))
+            return response
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    async def astream(self, messages: Sequence[Any], *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        """Stream from the wrapped model; a rate-limited call is retried only before its first chunk."""
+        if not hasattr(self.model, "astream"):
+            yield await self.ainvoke(messages, *args, **kwargs)
+            return
+        estimate = self._estimate(messages)
+        for attempt in range(self.max_retries + 1):
+            grant = await self.scheduler.acquire(self.priority, estimate)
+            used = 0
+            received = False
+            try:
+                async for chunk in self.model.astream(messages, *args, **kwargs):
+                    received = True
+                    used += _used_tokens(chunk) or 0
+                    yield chunk
+            except Exception as exc:
+                limited = is_rate_limit_error(exc)
+                self.scheduler.release(grant, rate_limited=limited, retry_after=_retry_after(exc))
+                if limited and not received and attempt < self.max_retries:
+                    continue
+                raise
+            except BaseException:
+                self.scheduler.release(grant)
+                raise
+            self.scheduler.release(grant, used or None)
+            return
+
+    async def _ainvoke_model(self, messages: Sequence[Any], *args: Any, **kwargs: Any) -> Any:
+        if hasattr(self.model, "ainvoke"):
+            return await self.model.ainvoke(messages, *args, **kwargs)
+        return await asyncio.to_thread(self.model.invoke, messages, *args, **kwargs)
+
+    def _estimate(self, messages: Sequence[Any]) -> int:
+        characters = sum(len(str(getattr(message, "content", message))) for message in messages)
+        return characters // 4 + self.completion_tokens
+
+
+def _bucket(per_minute: float | None, burst_seconds: float, now: float) -> _TokenBucket | None:
+    return None if per_minute is None else _TokenBucket(per_minute, burst_seconds, now)
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """Recognize 429 errors from OpenAI/httpx-style clients and :class:`RateLimitError`."""
+    if getattr(exc, "status_code", None) == 429:
+        return True
+    response = getattr(exc, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        return True
+    return "RateLimit" in type(exc).__name__
+
+
+def _retry_after(exc: BaseException) -> float | None:
+    value = getattr(exc, "retry_after", None)
+    if value is None:
+        headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+        value = headers.get("retry-after") if hasattr(headers, "get") else None
+    try:
+        return None if value is None else max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _used_tokens(response: Any) -> int | None:
+    prompt, completion = token_usage(response)
+    return prompt + completion or None
+
+
+__all__ = [
+    "PRIORITY_EXPAND",
+    "PRIORITY_OUTLINE",
+    "RateLimitError",
+    "RateLimitScheduler",
+    "RateLimits",
+    "ScheduledModel",
+    "SchedulerStats",
+    "is_rate_limit_error",
+]
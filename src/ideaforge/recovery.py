@@ -0,0 +1,191 @@
+# Author: everettjf
+"""Single-pass recovery of the JSON payload buried in a chatty model response."""
+
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, Iterable, List, Sequence, Tuple
+
+# Inside a malformed region we only care about string literals and structural
+# characters; the regex engine skips everything else (numbers, literals, whitespace).
+_STRUCTURE = re.compile(r'"(?:[^"\\]+|\\.)*"?|[{}\[\],:]')
+# A JSON object opens with ``{"`` or ``{}``; braces in prose ("{option}") are skipped
+# without attempting a decode, whose error path costs O(position).
+_OBJECT_START = re.compile(r'\{(?=\s*["}])')
+_DECODER = json.JSONDecoder()
+_MAX_PARSE_ATTEMPTS = 8
+
+
+@dataclass
+class _Frame:
+    kind: str
+    start: int
+    depth: int
+    safe_end: int
+    expect_key: bool = True
+    matched: bool = False
+
+
+@dataclass
+class _Region:
+    """Structure of one malformed top-level value, as seen by :func:`_scan`."""
+
+    end: int
+    candidates: List[Tuple[int, int, int]] = field(default_factory=list)  # (depth, start, end)
+    trailing_commas: List[int] = field(default_factory=list)
+    open_frames: List[_Frame] = field(default_factory=list)
+
+
+def recover_json(text: str, expected_keys: Sequence[str] = ()) -> Any | None:
+    """Return the JSON object in ``text`` that carries one of ``expected_keys``.
+
+    Top-level objects are walked left to right in a single pass. Well-formed ones are
+    decoded in C with ``raw_decode`` and skipped over whole; only a value that fails to
+    decode is re-scanned by a structural tokenizer that understands strings and escapes,
+    tracks object keys (so candidates are matched against the schema without parsing),
+    drops trailing commas and closes a truncated tail after its last complete member.
+    Within a region the shallowest match wins; across regions the last one does, since
+    models are asked to end with their final answer. With no ``expected_keys`` any
+    object matches.
+    """
+    expected = frozenset(expected_keys)
+    found: Any | None = None
+    position = 0
+    while True:
+        match = _OBJECT_START.search(text, position)
+        if match is None:
+            return found
+        start = match.start()
+        try:
+            value, position = _DECODER.raw_decode(text, start)
+        except json.JSONDecodeError:
+            region = _scan(text, start, expected)
+            value = _best_in_region(text, region, expected)
+            position = region.end
+        else:
+            value = _find_expected(value, expected)
+        if value is not None:
+            found = value
+
+
+def select_expected(value: Any, expected_keys: Sequence[str]) -> Any:
+    """Return ``value`` or the shallowest nested object that carries an expected key."""
+    if not expected_keys:
+        return value
+    nested = _find_expected(value, frozenset(expected_keys))
+    return value if nested is None else nested
+
+
+def _find_expected(value: Any, expected: frozenset[str]) -> Any | None:
+    if not isinstance(value, dict):
+        return None
+    if not expected:
+        return value
+    queue: List[Any] = [value]
+    for item in queue:
+        if isinstance(item, dict):
+            if not expected.isdisjoint(item):
+                return item
+            queue.extend(item.values())
+        elif isinstance(item, list):
+            queue.extend(item)
+    return None
+
+
+def _scan(text: str, start: int, expected: frozenset[str]) -> _Region:
+    """Tokenize the top-level value at ``start`` until it closes or the text ends."""
+    region = _Region(end=len(text))
+    stack = [_Frame(kind="{", start=start, depth=0, safe_end=start + 1)]
+    last_comma = -1
+    position = start + 1
+    while stack:
+        match = _STRUCTURE.search(text, position)
+        if match is None:
+            break
+        token = match.group()
+        frame = stack[-1]
+        position = match.end()
+        if token[0] == '"':
+            if frame.kind == "{" and frame.expect_key and not frame.matched:
+                frame.matched = not expected or _decode_key(token) in expected
+        elif token == ":":
+            frame.expect_key = False
+        elif token == ",":
+            last_comma = match.start()
+            frame.safe_end = last_comma
+            frame.expect_key = True
+            continue
+        elif token in "{[":
+            opened = match.start()
+            stack.append(_Frame(kind=token, start=opened, depth=len(stack), safe_end=opened + 1))
+        else:
+            if last_comma >= 0 and not text[last_comma + 1 : match.start()].strip():
+                region.trailing_commas.append(last_comma)
+            closed = stack.pop()
+            if closed.kind == "{" and (closed.matched or not expected):
+                region.candidates.append((closed.depth, closed.start, position))
+            if stack:
+                stack[-1].safe_end = position
+            else:
+                region.end = position
+        last_comma = -1
+    region.open_frames = stack
+    return region
+
+
+def _best_in_region(text: str, region: _Region, expected: frozenset[str]) -> Any | None:
+    attempts = 0
+    for _, start, end in sorted(region.candidates, key=lambda item: (item[0], -item[1])):
+        if attempts == _MAX_PARSE_ATTEMPTS:
+            break
+        attempts += 1
+        try:
+            return json.loads(_without(text, start, end, region.trailing_commas))
+        except json.JSONDecodeError:
+            continue
+    return _recover_truncated(text, region, expected)
+
+
+def _recover_truncated(text: str, region: _Region, expected: frozenset[str]) -> Any | None:
+    stack = region.open_frames
+    for index, frame in enumerate(stack):
+        if frame.kind == "{" and (frame.matched or not expected):
+            break
+    else:
+        return None
+    # Keep every member that finished before the cut, then close the open containers.
+    # Innermost containers with no complete member are dropped rather than closed empty.
+    open_frames = stack[index:]
+    while len(open_frames) > 1 and open_frames[-1].safe_end == open_frames[-1].start + 1:
+        open_frames.pop()
+    cut = open_frames[-1].safe_end
+    closers = "".join("}" if open_frame.kind == "{" else "]" for open_frame in reversed(open_frames))
+    body = _without(text, frame.start, cut, region.trailing_commas).rstrip().rstrip(",")
+    try:
+        return json.loads(body + closers)
+    except json.JSONDecodeError:
+        return None
+
+
+def _without(text: str, start: int, end: int, positions: Iterable[int]) -> str:
+    """Slice ``text[start:end]`` minus the characters at ``positions`` (trailing commas)."""
+    pieces: List[str] = []
+    cursor = start
+    for position in positions:
+        if start <= position < end:
+            pieces.append(text[cursor:position])
+            cursor = position + 1
+    pieces.append(text[cursor:end])
+    return "".join(pieces)
+
+
+def _decode_key(token: str) -> str:
+    try:
+        return json.loads(token)
+    except json.JSONDecodeError:
+        return token.strip('"')
+
+
+__all__ = ["recover_json", "select_expected"]
@@ -0,0 +1,386 @@
+# Author: everettjf
+"""Local HTTP planning service: one long-lived planner shared by many requests.
+
+Endpoints (JSON in, JSON out; every response closes the connection):
+
+- ``POST /plan`` with ``{"idea": "..."}`` returns the finished plan.
+- ``POST /stream`` with the same body returns newline-delimited JSON events
+  (``progress``, ``node``, ``stage``) followed by a final ``result`` or ``error`` line.
+- ``GET /health`` returns queue and coalescing counters.
+
+Requests for an idea that is already queued or running join that run instead of
+starting another. New ideas wait in a bounded queue; when it is full the service
+answers ``503`` with ``Retry-After`` rather than accepting unbounded work.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+from .events import NodeCompleted, ObjectiveCompleted, PlanEvent, StageCompleted
+from .planner import IdeaPlanner, PlanResult
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+_MAX_BODY_BYTES = 64 * 1024
+_MAX_HEADER_LINES = 100
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class ServiceBusy(RuntimeError):
+    """The planning queue is full; the request should be retried later."""
+
+
+@dataclass
+class ServiceStats:
+    submitted: int = 0
+    coalesced: int = 0
+    rejected: int = 0
+    completed: int = 0
+    failed: int = 0
+    queued: int = 0
+    running: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class _Job:
+    """One pipeline run and everyone waiting on it."""
+
+    def __init__(self, idea: str) -> None:
+        self.idea = idea
+        self.started = False
+        self.future: asyncio.Future[PlanResult] = asyncio.get_running_loop().create_future()
+        self.history: List[Dict[str, Any] | None] = []
+        self.subscribers: List[asyncio.Queue[Dict[str, Any] | None]] = []
+
+    def publish(self, message: Dict[str, Any] | None) -> None:
+        # ``None`` marks the end of the run; late subscribers replay the history first.
+        self.history.append(message)
+        for queue in self.subscribers:
+            queue.put_nowait(message)
+
+    def subscribe(self) -> asyncio.Queue[Dict[str, Any] | None]:
+        queue: asyncio.Queue[Dict[str, Any] | None] = asyncio.Queue()
+        for message in self.history:
+            queue.put_nowait(message)
+        self.subscribers.append(queue)
+        return queue
+
+
+class PlanService:
+    """Runs plans on a shared :class:`IdeaPlanner` with coalescing and backpressure.
+
+    Up to ``workers`` plans run at once and at most ``max_queue`` more wait for a
+    worker; :meth:`submit` raises :class:`ServiceBusy` beyond that. Identical ideas
+    (compared after trimming whitespace) that are queued or running share one run.
+    With a ``deadline`` each run returns a partial plan once that many seconds have
+    passed since it started.
+    """
+
+    def __init__(
+        self, planner: IdeaPlanner, workers: int = 4, max_queue: int = 64, deadline: float | None = None
+    ) -> None:
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if max_queue < 1:
+            raise ValueError("max_queue must be at least 1")
+        self._planner = planner
+        self._workers = workers
+        self._deadline = deadline
+        self._queue: asyncio.Queue[_Job] = asyncio.Queue(maxsize=max_queue)
+        self._inflight: Dict[str, _Job] = {}
+        self._tasks: List[asyncio.Task[None]] = []
+        self._stats = ServiceStats()
+
+    async def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self._workers)]
+
+    async def close(self) -> None:
+        """Stop the workers; callers of queued and running plans get ``CancelledError``."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for job in list(self._inflight.values()):
+            self._finish(job, asyncio.CancelledError())
+
+    async def __aenter__(self) -> "PlanService":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_exc_info: Any) -> None:
+        await self.close()
+
+    def stats(self) -> ServiceStats:
+        running = sum(1 for job in self._inflight.values() if job.started)
+        return ServiceStats(**{**self._stats.to_dict(), "queued": self._queue.qsize(), "running": running})
+
+    def submit(self, idea: str) -> Tuple[_Job, bool]:
+        """Queue ``idea`` or join its in-flight run; returns the job and whether it was joined."""
+        key = idea.strip()
+        if not key:
+            raise ValueError("idea must not be empty")
+        job = self._inflight.get(key)
+        if job is not None:
+            self._stats.coalesced += 1
+            return job, True
+        job = _Job(key)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self._stats.rejected += 1
+            raise ServiceBusy(f"planning queue is full ({self._queue.maxsize} waiting)") from None
+        self._inflight[key] = job
+        self._stats.submitted += 1
+        job.publish({"type": "progress", "message": f"Queued behind {self._queue.qsize() - 1} plans"})
+        return job, False
+
+    async def plan(self, idea: str) -> PlanResult:
+        job, _ = self.submit(idea)
+        # Shielded so one caller giving up does not cancel the run others are waiting on.
+        return await asyncio.shield(job.future)
+
+    async def stream(self, idea: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the run's events as JSON-ready dicts, ending with ``result`` or ``error``."""
+        job, _ = self.submit(idea)
+        queue = job.subscribe()
+        try:
+            while True:
+                message = await queue.get()
+                if message is None:
+                    return
+                yield message
+        finally:
+            job.subscribers.remove(queue)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: _Job) -> None:
+        job.started = True
+
+        def on_progress(message: str) -> None:
+            job.publish({"type": "progress", "message": message})
+
+        def on_event(event: PlanEvent) -> None:
+            job.publish(_event_message(event))
+
+        try:
+            result = await self._planner.aplan(
+                job.idea, progress=on_progress, on_event=on_event, deadline=self._deadline
+            )
+        except Exception as exc:  # noqa: BLE001 - reported to every waiting client
+            self._stats.failed += 1
+            self._finish(job, exc)
+        else:
+            self._stats.completed += 1
+            self._finish(job, result)
+
+    def _finish(self, job: _Job, outcome: PlanResult | BaseException) -> None:
+        if self._inflight.get(job.idea) is job:
+            del self._inflight[job.idea]
+        if job.future.done():
+            return
+        if isinstance(outcome, asyncio.CancelledError):
+            job.future.cancel()
+            job.publish({"type": "error", "error": "service shut down"})
+        elif isinstance(outcome, BaseException):
+            job.future.set_exception(outcome)
+            # Stream-only jobs never await the future; mark the failure as retrieved.
+            job.future.exception()
+            job.publish({"type": "error", "error": _describe(outcome)})
+        else:
+            job.future.set_result(outcome)
+            job.publish({"type": "result", **result_payload(outcome)})
+        job.publish(None)
+
+
+def result_payload(result: PlanResult) -> Dict[str, Any]:
+    payload = result.to_dict()
+    payload["metrics"] = result.metrics.to_dict()
+    if result.expansion is not None:
+        payload["expansion"] = result.expansion.to_dict()
+    if result.duplicates:
+        payload["duplicates"] = [duplicate.to_dict() for duplicate in result.duplicates]
+    return payload
+
+
+async def start_server(service: PlanService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> asyncio.Server:
+    """Start the service's workers and listen on ``host:port`` (``0`` picks a free port)."""
+    await service.start()
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            await _handle_connection(service, reader, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+async def _handle_connection(
+    service: PlanService, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    try:
+        method, path, body = await _read_request(reader)
+    except _HTTPError as exc:
+        await _send_json(writer, exc.status, {"status": "error", "error": str(exc)})
+        return
+    if path == "/health":
+        if method != "GET":
+            await _send_json(writer, 405, {"status": "error", "error": "use GET"})
+            return
+        await _send_json(writer, 200, {"status": "ok", **service.stats().to_dict()})
+        return
+    if path not in ("/plan", "/stream"):
+        await _send_json(writer, 404, {"status": "error", "error": f"no endpoint {path}"})
+        return
+    if method != "POST":
+        await _send_json(writer, 405, {"status": "error", "error": "use POST"})
+        return
+    try:
+        idea = _parse_idea(body)
+        if path == "/plan":
+            result = await service.plan(idea)
+        else:
+            async with contextlib.aclosing(service.stream(idea)) as messages:
+                await _stream(writer, messages)
+            return
+    except _HTTPError as exc:
+        await _send_json(writer, exc.status, {"status": "error", "error": str(exc)})
+    except ServiceBusy as exc:
+        await _send_json(writer, 503, {"status": "error", "error": str(exc)}, {"Retry-After": "1"})
+    except Exception as exc:  # noqa: BLE001 - planning failures become 500 responses
+        await _send_json(writer, 500, {"status": "error", "error": _describe(exc)})
+    else:
+        await _send_json(writer, 200, {"status": "ok", **result_payload(result)})
+
+
+async def _stream(writer: asyncio.StreamWriter, messages: AsyncIterator[Dict[str, Any]]) -> None:
+    first = await anext(messages)  # raises ServiceBusy before any headers are sent
+    writer.write(_head(200, {"Content-Type": "application/x-ndjson"}))
+    writer.write(_json_line(first))
+    await writer.drain()
+    async for message in messages:
+        writer.write(_json_line(message))
+        await writer.drain()
+
+
+class _HTTPError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Tuple[str, str, bytes]:
+    request_line = (await reader.readline()).decode("latin-1").strip()
+    parts = request_line.split()
+    if len(parts) != 3:
+        raise _HTTPError(400, "malformed request line")
+    method, target, _ = parts
+    headers: Dict[str, str] = {}
+    for _ in range(_MAX_HEADER_LINES):
+        line = (await reader.readline()).decode("latin-1").strip()
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise _HTTPError(400, "too many headers")
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise _HTTPError(400, "invalid Content-Length") from None
+    if length > _MAX_BODY_BYTES:
+        raise _HTTPError(413, f"request body exceeds {_MAX_BODY_BYTES} bytes")
+    body = await reader.readexactly(length) if length > 0 else b""
+    return method.upper(), target.split("?", 1)[0], body
+
+
+def _parse_idea(body: bytes) -> str:
+    try:
+        payload = json.loads(body or b"null")
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        raise _HTTPError(400, "request body must be JSON") from None
+    idea = payload.get("idea") if isinstance(payload, dict) else None
+    if not isinstance(idea, str) or not idea.strip():
+        raise _HTTPError(400, "expected a JSON object with a non-empty 'idea' string")
+    return idea
+
+
+def _event_message(event: PlanEvent) -> Dict[str, Any]:
+    if isinstance(event, NodeCompleted):
+        return {
+            "type": "node",
+            "stage": event.stage,
+            "path": list(event.path),
+            "title": event.node.title,
+            "deliverable": event.node.deliverable,
+        }
+    if isinstance(event, StageCompleted):
+        return {"type": "stage", **event.metrics.to_dict()}
+    if isinstance(event, ObjectiveCompleted):
+        return {
+            "type": "objective",
+            "index": event.index,
+            "analysis": event.analysis,
+            "incomplete": event.incomplete,
+            "wall_seconds": event.metrics.wall_seconds,
+            "objective": event.node.to_dict(),
+        }
+    return {"type": type(event).__name__}
+
+
+def _describe(exc: BaseException) -> str:
+    return f"{type(exc).__name__}: {exc}" if str(exc) else type(exc).__name__
+
+
+def _head(status: int, headers: Dict[str, str]) -> bytes:
+    lines = [f"HTTP/1.1 {status} {_REASONS[status]}", "Connection: close", *(f"{k}: {v}" for k, v in headers.items())]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+def _json_line(message: Dict[str, Any]) -> bytes:
+    return (json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+async def _send_json(
+    writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any], headers: Dict[str, str] | None = None
+) -> None:
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = {"Content-Type": "application/json", "Content-Length": str(len(body)), **(headers or {})}
+    writer.write(_head(status, head) + body)
+    await writer.drain()
+
+
+__all__ = [
+    "DEFAULT_HOST",
+    "DEFAULT_PORT",
+    "PlanService",
+    "ServiceBusy",
+    "ServiceStats",
+    "result_payload",
+    "start_server",
+]
@@ -0,0 +1,142 @@
+# Author: everettjf
+"""Incremental JSON parsing for token-streamed model responses."""
+
+from __future__ import annotations
+
+import json
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Tuple
+
+JSONPath = Tuple[Any, ...]
+# Characters that may appear between tokens of a JSON value (numbers, literals, separators).
+# Anything else outside a string means the open "value" was a bracket in prose.
+_BARE = frozenset(" \t\r\n:,+-.0123456789eEtruefalsn")
+
+
+def is_plan_node_path(path: JSONPath) -> bool:
+    """True for objects sitting in a ``plan`` or ``tasks`` list, i.e. TODO tree nodes."""
+    return len(path) >= 2 and isinstance(path[-1], int) and path[-2] in ("plan", "tasks")
+
+
+@dataclass
+class _Frame:
+    kind: str  # "{" or "["
+    start: int
+    path: JSONPath
+    index: int = 0
+    key: str | None = None
+    expect_key: bool = True
+
+
+@dataclass
+class IncrementalJSONParser:
+    """Feed text chunks and receive every matching object as soon as it closes.
+
+    The scanner tracks strings, escapes and container nesting in a single pass, so braces
+    inside string values never desynchronise it. Text between top-level values (code
+    fences, ReAct prose) is skipped; a stray ``[`` or ``{`` in that prose is dropped at
+    the first character that cannot be JSON, so the payload after it is scanned from the
+    root and its paths carry no prefix. Only the text of the value currently being
+    scanned is retained, as the chunks it arrived in: a closed object is decoded from
+    just the chunks it spans, so each character is copied about once per enclosing node
+    rather than once per closed object.
+    """
+
+    predicate: Callable[[JSONPath], bool] = is_plan_node_path
+    _chunks: List[str] = field(default_factory=list)
+    # Stream offset at which each retained chunk starts.
+    _starts: List[int] = field(default_factory=list)
+    _offset: int = 0
+    _stack: List[_Frame] = field(default_factory=list)
+    _in_string: bool = False
+    _escaped: bool = False
+    _key_chars: List[str] | None = None
+
+    def feed(self, chunk: str) -> List[Tuple[JSONPath, Any]]:
+        """Consume ``chunk`` and return ``(path, value)`` pairs for objects completed by it."""
+        completed: List[Tuple[JSONPath, Any]] = []
+        if not chunk:
+            return completed
+        base = self._offset
+        self._chunks.append(chunk)
+        self._starts.append(base)
+        self._offset += len(chunk)
+        stack = self._stack
+        for position, char in enumerate(chunk, start=base):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._key_chars is not None:
+                        stack[-1].key = _decode_key(self._key_chars)
+                        self._key_chars = None
+                    continue
+                if self._key_chars is not None:
+                    self._key_chars.append(char)
+                continue
+            if not stack:
+                if char in "{[":
+                    self._chunks = [chunk[position - base :]]
+                    self._starts = [position]
+                    stack.append(_Frame(kind=char, start=position, path=()))
+                continue
+            frame = stack[-1]
+            if char == '"':
+                self._in_string = True
+                if frame.kind == "{" and frame.expect_key:
+                    self._key_chars = []
+            elif char == ":" and frame.kind == "{":
+                frame.expect_key = False
+            elif char == ",":
+                if frame.kind == "{":
+                    frame.expect_key = True
+                    frame.key = None
+                else:
+                    frame.index += 1
+            elif char in "{[":
+                child = frame.key if frame.kind == "{" else frame.index
+                stack.append(_Frame(kind=char, start=position, path=frame.path + (child,)))
+            elif char in "}]":
+                closed = stack.pop()
+                if closed.kind == "{" and closed.path and self.predicate(closed.path):
+                    try:
+                        value = json.loads(self._slice(closed.start, position + 1))
+                    except json.JSONDecodeError:
+                        continue
+                    completed.append((closed.path, value))
+            elif char not in _BARE:
+                # Not JSON after all: forget the prose bracket and wait for the real payload.
+                stack.clear()
+        if not stack:
+            self._chunks = []
+            self._starts = []
+        return completed
+
+    def _slice(self, start: int, end: int) -> str:
+        starts = self._starts
+        first = bisect_right(starts, start) - 1
+        last = bisect_right(starts, end - 1) - 1
+        if first == last:
+            return self._chunks[first][start - starts[first] : end - starts[first]]
+        return "".join(
+            [
+                self._chunks[first][start - starts[first] :],
+                *self._chunks[first + 1 : last],
+                self._chunks[last][: end - starts[last]],
+            ]
+        )
+
+
+def _decode_key(chars: List[str]) -> str:
+    raw = "".join(chars)
+    try:
+        return json.loads(f'"{raw}"')
+    except json.JSONDecodeError:
+        return raw
+
+
+__all__ = ["IncrementalJSONParser", "JSONPath", "is_plan_node_path"]
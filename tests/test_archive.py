@@ -0,0 +1,114 @@
+# Author: everettjf
+"""Tests for the searchable local plan archive."""
+
+from __future__ import annotations
+
+import json
+
+from ideaforge.archive import PlanArchive, load_plans, tokenize
+from ideaforge.planner import PlanResult
+
+
+def _plan(idea, *titles, summary=""):
+    return PlanResult.from_dict(
+        {
+            "idea": idea,
+            "tree": [
+                {
+                    "title": "Build",
+                    "summary": "Core product",
+                    "tasks": [{"title": title, "summary": summary, "deliverable": "", "tasks": []} for title in titles],
+                },
+                {"title": "Launch", "deliverable": "Public release", "tasks": []},
+            ],
+            "analyses": ["Build: Final: ok"],
+        }
+    )
+
+
+def test_add_deduplicates_plans_and_node_text(tmp_path):
+    archive = PlanArchive(tmp_path / "plans.sqlite3")
+
+    first = archive.add(_plan("Shop", "Stripe integration", "Product catalog"))
+    again = archive.add(_plan("Shop", "Stripe integration", "Product catalog"))
+    other = archive.add(_plan("Market", "Stripe integration"))
+
+    assert first == (1, True)
+    assert again == (1, False)
+    assert other == (2, True)
+    stats = archive.stats()
+    assert (stats.plans, stats.occurrences) == (2, 7)
+    # Build/Launch and the Stripe task are shared between the plans.
+    assert stats.nodes == 4
+
+
+def test_get_rebuilds_the_saved_tree(tmp_path):
+    archive = PlanArchive(tmp_path / "plans.sqlite3")
+    titles = [f"Task {index}" for index in range(12)]
+    original = _plan("Shop", *titles)
+
+    plan_id, _ = archive.add(original)
+
+    assert archive.get(plan_id).to_dict() == original.to_dict()
+
+
+def test_search_requires_every_word_and_matches_prefixes(tmp_path):
+    archive = PlanArchive(tmp_path / "plans.sqlite3")
+    archive.add(_plan("Shop", "Stripe integration", "Stripe dashboard"))
+    archive.add(_plan("Market", "Payments", summary="Integrate Stripe webhooks"))
+
+    hits = archive.search("stripe integ")
+
+    assert [(hit.plan_id, hit.path, hit.title) for hit in hits] == [
+        (2, (0, 0), "Payments"),
+        (1, (0, 0), "Stripe integration"),
+    ]
+    assert hits[0].idea == "Market"
+    assert archive.search("stripe billing") == []
+    assert archive.search("   ") == []
+
+
+def test_search_lists_newest_plans_first_for_common_and_rare_words(tmp_path):
+    archive = PlanArchive(tmp_path / "plans.sqlite3")
+    for index in range(30):
+        archive.add(_plan(f"Idea {index}", *(f"Design review {index} step {step}" for step in range(5))))
+
+    # Common words: nodes are walked newest first until the limit is reached.
+    newest = archive.search("design review", limit=3)
+    # A rare word drives the lookup through its postings instead.
+    rare = archive.search("design 17")
+
+    assert [(hit.plan_id, hit.path) for hit in newest] == [(30, (0, 0)), (30, (0, 1)), (30, (0, 2))]
+    assert len(archive.search("design review", limit=1000)) == 150
+    assert [(hit.plan_id, hit.path) for hit in rare] == [(18, (0, step)) for step in range(5)]
+
+
+def test_search_lists_hits_in_tree_order_past_ten_siblings(tmp_path):
+    archive = PlanArchive(tmp_path / "plans.sqlite3")
+    archive.add(_plan("Shop", *(f"Checkout step {step}" for step in range(12))))
+
+    common = archive.search("checkout step", limit=5)
+    everything = archive.search("checkout")
+
+    assert [hit.path for hit in common] == [(0, step) for step in range(5)]
+    assert [hit.path for hit in everything] == [(0, step) for step in range(12)]
+
+
+def test_load_plans_reads_plan_files_and_batch_output(tmp_path):
+    single = tmp_path / "plan.json"
+    single.write_text(json.dumps(_plan("Shop", "Checkout").to_dict()), encoding="utf-8")
+    batch = tmp_path / "plans.jsonl"
+    batch.write_text(
+        json.dumps({"status": "ok", **_plan("Market", "Listings").to_dict()})
+        + "\n"
+        + json.dumps({"idea": "Broken", "status": "error", "error": "boom"})
+        + "\n",
+        encoding="utf-8",
+    )
+
+    assert [plan.idea for plan in load_plans(single)] == ["Shop"]
+    assert [plan.idea for plan in load_plans(batch)] == ["Market"]
+
+
+def test_tokenize_folds_case_and_splits_on_punctuation():
+    assert tokenize("Stripe/PayPal integration — v2_beta!") == ["stripe", "paypal", "integration", "v2", "beta"]
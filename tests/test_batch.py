@@ -0,0 +1,92 @@
+# Author: everettjf
+"""Tests for batch planning with streaming JSONL output."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+
+os.environ.setdefault("LANGCHAIN_TRACING_V2", "false")
+os.environ.setdefault("LANGSMITH_TRACING", "false")
+
+import pytest
+
+from ideaforge.batch import load_ideas, run_batch
+from ideaforge.planner import IdeaPlanner
+
+
+class EchoPlannerModel:
+    """Builds a one-objective outline named after the idea; fails for ideas containing 'boom'."""
+
+    async def ainvoke(self, messages, *_args, **_kwargs):
+        await asyncio.sleep(0)
+        idea = messages[-1].content.split("Idea: ", 1)[1].split("\n", 1)[0]
+        if "boom" in idea:
+            raise RuntimeError("provider exploded")
+        return {"plan": [{"title": f"Launch {idea}", "summary": "", "deliverable": "", "tasks": []}]}
+
+
+class EchoReactModel:
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, *_args, **_kwargs):
+        self.calls += 1
+        await asyncio.sleep(0)
+        return {"analysis": ["Final: ok"], "tasks": [{"title": "Ship it", "tasks": []}]}
+
+
+def _read_lines(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+def test_load_ideas_accepts_strings_and_objects(tmp_path):
+    source = tmp_path / "ideas.jsonl"
+    source.write_text('"first idea"\n\n{"idea": "second idea", "owner": "me"}\n', encoding="utf-8")
+
+    assert load_ideas(source) == ["first idea", "second idea"]
+
+
+@pytest.mark.asyncio
+async def test_run_batch_records_errors_and_resumes(tmp_path):
+    out = tmp_path / "plans.jsonl"
+    react_model = EchoReactModel()
+    planner = IdeaPlanner(EchoPlannerModel(), react_model)
+    streamed: list[dict] = []
+
+    summary = await run_batch(planner, ["alpha", "boom", "gamma"], out, workers=2, on_record=streamed.append)
+
+    assert (summary.succeeded, summary.failed, summary.skipped) == (2, 1, 0)
+    lines = _read_lines(out)
+    assert {line["idea"]: line["status"] for line in lines} == {"alpha": "ok", "boom": "error", "gamma": "ok"}
+    assert lines == streamed
+    error_line = next(line for line in lines if line["status"] == "error")
+    assert error_line["error"] == "RuntimeError: provider exploded"
+    ok_line = next(line for line in lines if line["idea"] == "alpha")
+    assert ok_line["tree"][0]["title"] == "Launch alpha"
+
+    # Simulate a crash that left a torn line behind, then resume with a new idea.
+    with out.open("a", encoding="utf-8") as handle:
+        handle.write('{"idea": "delta", "status": "o')
+    calls_before = react_model.calls
+    summary = await run_batch(planner, ["alpha", "gamma", "delta"], out, workers=2)
+
+    assert (summary.succeeded, summary.skipped) == (1, 2)
+    assert react_model.calls == calls_before + 1
+    last = json.loads(out.read_text(encoding="utf-8").splitlines()[-1])
+    assert last["idea"] == "delta" and last["status"] == "ok"
+
+
+@pytest.mark.asyncio
+async def test_run_batch_counts_repeated_ideas_as_duplicates(tmp_path):
+    out = tmp_path / "plans.jsonl"
+    react_model = EchoReactModel()
+    planner = IdeaPlanner(EchoPlannerModel(), react_model)
+    await run_batch(planner, ["alpha"], out)
+
+    summary = await run_batch(planner, ["alpha", "beta", "beta", "alpha", "boom", "beta"], out, workers=2)
+
+    assert (summary.succeeded, summary.failed, summary.skipped, summary.duplicates) == (1, 1, 1, 3)
+    assert summary.total == summary.succeeded + summary.failed + summary.skipped + summary.duplicates
+    assert [line["idea"] for line in _read_lines(out)].count("beta") == 1
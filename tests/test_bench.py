@@ -0,0 +1,66 @@
+# Author: everettjf
+"""Tests for the offline benchmark harness."""
+
+from __future__ import annotations
+
+import os
+
+os.environ.setdefault("LANGCHAIN_TRACING_V2", "false")
+os.environ.setdefault("LANGSMITH_TRACING", "false")
+
+import asyncio
+from dataclasses import replace
+
+import pytest
+
+from ideaforge.bench import SCENARIOS, Scenario, ScenarioReport, compare_reports, percentile, run_scenario, run_suite
+
+
+def test_malformed_scenario_exercises_recovery_and_repair():
+    scenario = replace(SCENARIOS["malformed"], latency=0.0, jitter=0.0, malformed_rate=1.0)
+
+    report = asyncio.run(run_scenario(scenario, runs=3))
+
+    assert report.runs == 3
+    assert report.nodes > scenario.objectives
+    assert report.retries > 0
+    assert report.p95_ms >= report.p50_ms > 0
+    assert report.peak_memory_kb > 0
+
+
+def test_simulated_models_are_deterministic():
+    scenario = Scenario("tiny", objectives=2, width=2, depth=3, latency=0.0, jitter=0.0, parallel=2)
+
+    first, second = (asyncio.run(run_scenario(scenario, runs=1, seed=3)) for _ in range(2))
+
+    assert first.nodes == second.nodes == 2 + 2 * (2 + 4 + 8) + 3  # + launch step and its two tasks
+    assert first.retries == second.retries
+
+
+def test_run_suite_rejects_unknown_scenarios():
+    with pytest.raises(KeyError):
+        asyncio.run(run_suite(["missing"]))
+
+
+def test_compare_reports_flags_regressions_beyond_tolerance():
+    report = ScenarioReport("baseline", 5, 20.0, 50.0, 60.0, 12.0, 0.2, 0.3, 100.0, 55, 0)
+    baseline = [{**report.to_dict(), "p50_ms": 30.0, "overhead_ms": 11.0}]
+
+    assert compare_reports([report], baseline, tolerance=0.2) == ["baseline: p50_ms 30.00 -> 50.00"]
+    assert compare_reports([report], baseline, tolerance=1.0) == []
+
+
+def test_percentile_interpolates():
+    assert percentile([4.0, 1.0, 3.0, 2.0], 50) == 2.5
+    assert percentile([1.0], 95) == 1.0
+    assert percentile([], 50) == 0.0
+
+
+def test_pipelined_scenario_overlaps_outline_and_expansion():
+    staged_scenario = replace(SCENARIOS["pipelined"], latency=0.1, jitter=0.0, pipeline=False)
+    pipelined_scenario = replace(staged_scenario, pipeline=True)
+
+    staged, pipelined = (asyncio.run(run_scenario(item, runs=1)) for item in (staged_scenario, pipelined_scenario))
+
+    assert pipelined.nodes == staged.nodes
+    assert pipelined.p50_ms < staged.p50_ms * 0.9
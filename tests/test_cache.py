@@ -0,0 +1,91 @@
+# Author: everettjf
+"""Tests for the on-disk model response cache."""
+
+from __future__ import annotations
+
+import os
+
+os.environ.setdefault("LANGCHAIN_TRACING_V2", "false")
+os.environ.setdefault("LANGSMITH_TRACING", "false")
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from ideaforge.cache import CachedModel, ResponseCache
+from ideaforge.planner import IdeaPlanner
+
+
+class CountingModel:
+    def __init__(self, response, model_name="fake-model", temperature=0.2):
+        self.response = response
+        self.model_name = model_name
+        self.temperature = temperature
+        self.calls = 0
+
+    def invoke(self, *_args, **_kwargs):
+        self.calls += 1
+        return self.response
+
+
+PLAN = {"plan": [{"title": "Launch beta", "summary": "", "deliverable": "", "tasks": []}]}
+REACT = AIMessage(content='{"analysis": ["Final: ok"], "tasks": [{"title": "Deploy", "tasks": []}]}')
+
+
+def test_warm_rerun_skips_model_calls(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite3")
+    planner_model = CountingModel(PLAN)
+    react_model = CountingModel(REACT)
+    planner = IdeaPlanner(CachedModel(planner_model, cache), CachedModel(react_model, cache))
+
+    first = planner.plan("Cached idea")
+    second = planner.plan("Cached idea")
+
+    assert (planner_model.calls, react_model.calls) == (1, 1)
+    assert second.to_dict() == first.to_dict()
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (2, 2, 2)
+
+
+def test_key_depends_on_model_and_temperature(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite3")
+    messages = [HumanMessage(content="hello")]
+    CachedModel(CountingModel(PLAN), cache).invoke(messages)
+
+    other_temperature = CountingModel(PLAN, temperature=0.7)
+    CachedModel(other_temperature, cache).invoke(messages)
+    other_model = CountingModel(PLAN, model_name="bigger-model")
+    CachedModel(other_model, cache).invoke(messages)
+
+    assert other_temperature.calls == 1
+    assert other_model.calls == 1
+
+
+def test_ttl_and_size_eviction(tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("ideaforge.cache.time.time", lambda: clock[0])
+    cache = ResponseCache(tmp_path / "cache.sqlite3", max_entries=2, ttl_seconds=60)
+
+    cache.put("a", {"json": 1})
+    clock[0] += 1
+    cache.put("b", {"json": 2})
+    clock[0] += 1
+    assert cache.get("a") == {"json": 1}  # refreshes "a", leaving "b" least recently used
+    cache.put("c", {"json": 3})
+    assert cache.get("b") is None
+    assert cache.stats().entries == 2
+
+    clock[0] += 120
+    assert cache.get("a") is None
+
+
+def test_unparseable_response_is_not_replayed(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite3")
+    react_model = CountingModel(AIMessage(content="not json at all"))
+    planner = IdeaPlanner(CachedModel(CountingModel(PLAN), cache), CachedModel(react_model, cache))
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            planner.plan("Broken idea")
+
+    # Each run makes the original call plus two repair round-trips, none served from the cache.
+    assert react_model.calls == 6
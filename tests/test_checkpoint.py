@@ -0,0 +1,100 @@
+# Author: everettjf
+"""Tests for checkpointed planning runs and resume."""
+
+from __future__ import annotations
+
+import os
+import threading
+
+os.environ.setdefault("LANGCHAIN_TRACING_V2", "false")
+os.environ.setdefault("LANGSMITH_TRACING", "false")
+
+import pytest
+
+from ideaforge.checkpoint import SqliteCheckpointSaver
+from ideaforge.events import ObjectiveCompleted
+from ideaforge.planner import IdeaPlanner
+
+TITLES = ["Research", "Design", "Build", "Launch"]
+
+
+class OutlineModel:
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, *_args, **_kwargs):
+        self.calls += 1
+        return {"plan": [{"title": title, "summary": "", "deliverable": "", "tasks": []} for title in TITLES]}
+
+
+class FlakyReactModel:
+    """Fails on the objectives listed in ``failing`` until they are cleared.
+
+    A failing call first waits until every objective in ``wait_for`` has completed (as
+    reported to :meth:`on_event`), so concurrent branches are recorded before the run aborts.
+    """
+
+    def __init__(self, failing, wait_for=()):
+        self.failing = set(failing)
+        self.wait_for = set(wait_for)
+        self.completed: set[str] = set()
+        self.ready = threading.Event()
+        self.expanded: list[str] = []
+        if not self.wait_for:
+            self.ready.set()
+
+    def on_event(self, event):
+        if isinstance(event, ObjectiveCompleted):
+            self.completed.add(event.node.title)
+            if self.wait_for <= self.completed:
+                self.ready.set()
+
+    def invoke(self, messages, *_args, **_kwargs):
+        title = messages[-1].content.split("Top-level objective: ", 1)[1].split("\n", 1)[0]
+        if title in self.failing:
+            assert self.ready.wait(timeout=5)
+            raise TimeoutError(f"provider timed out on {title}")
+        self.expanded.append(title)
+        return {"analysis": [f"Final: {title}"], "tasks": [{"title": f"{title} task", "tasks": []}]}
+
+
+@pytest.mark.parametrize("parallel", [1, 4])
+def test_resume_continues_from_last_completed_objective(tmp_path, parallel):
+    checkpointer = SqliteCheckpointSaver(tmp_path / "checkpoints.sqlite3")
+    outline = OutlineModel()
+    # Run in parallel, Build fails only once the other three objectives are done.
+    react_model = FlakyReactModel(failing={"Build"}, wait_for=set(TITLES) - {"Build"} if parallel > 1 else ())
+    planner = IdeaPlanner(outline, react_model, max_parallel_objectives=parallel, checkpointer=checkpointer)
+
+    with pytest.raises(TimeoutError):
+        planner.plan("Resumable idea", run_id="run-1", on_event=react_model.on_event)
+    completed_before = list(react_model.expanded)
+
+    # A fresh planner on the same checkpoint file picks the run back up.
+    react_model.failing.clear()
+    reopened = SqliteCheckpointSaver(tmp_path / "checkpoints.sqlite3")
+    resumed = IdeaPlanner(outline, react_model, max_parallel_objectives=parallel, checkpointer=reopened)
+    result = resumed.resume("run-1")
+
+    assert outline.calls == 1
+    assert sorted(completed_before) == sorted(["Research", "Design"] if parallel == 1 else set(TITLES) - {"Build"})
+    assert sorted(react_model.expanded) == sorted(completed_before + [t for t in TITLES if t not in completed_before])
+    if parallel > 1:
+        assert react_model.expanded[len(completed_before) :] == ["Build"]  # finished branches were not redone
+    assert [node.title for node in result.tree] == TITLES
+    assert [node.tasks[0].title for node in result.tree] == [f"{title} task" for title in TITLES]
+    assert [entry.split(":", 1)[0] for entry in result.analyses] == TITLES
+    assert result.run_id == "run-1"
+
+
+def test_resume_unknown_run_raises(tmp_path):
+    planner = IdeaPlanner(
+        OutlineModel(), FlakyReactModel(()), checkpointer=SqliteCheckpointSaver(tmp_path / "cp.sqlite3")
+    )
+    with pytest.raises(KeyError):
+        planner.resume("missing")
+
+
+def test_resume_requires_checkpointer():
+    with pytest.raises(ValueError):
+        IdeaPlanner(OutlineModel(), FlakyReactModel(())).resume("run-1")
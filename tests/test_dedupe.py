@@ -0,0 +1,122 @@
+# Author: everettjf
+"""Tests for near-duplicate task detection and merging."""
+
+from __future__ import annotations
+
+import os
+
+os.environ.setdefault("LANGCHAIN_TRACING_V2", "false")
+os.environ.setdefault("LANGSMITH_TRACING", "false")
+
+import pytest
+
+from ideaforge.dedupe import DuplicateRecord, dedupe_plan
+from ideaforge.planner import IdeaPlanner
+
+
+def _task(title, summary="", deliverable="", tasks=None):
+    return {"title": title, "summary": summary, "deliverable": deliverable, "tasks": tasks or []}
+
+
+def _titles(items):
+    return [item["title"] for item in items]
+
+
+def test_duplicate_is_merged_into_earlier_objective_with_its_children():
+    plan = [
+        _task(
+            "Market Research",
+            "Understand user needs and the competitive landscape.",
+            "Market Research Report",
+            [_task("Draft Market Research Report", "Compile findings.", "Draft of the market research report")],
+        ),
+        _task(
+            "Define Product Requirements",
+            "Outline the key features.",
+            "PRD",
+            [
+                _task(
+                    "Conduct Market Research",
+                    "Analyze current market trends and competitor products.",
+                    "Market Research Report",
+                    [_task("Identify Competitors", deliverable="Competitor list")],
+                ),
+                _task("Prioritize Features", "Rank features by impact.", "Feature list"),
+            ],
+        ),
+    ]
+
+    records = dedupe_plan(plan)
+
+    assert records == [DuplicateRecord((0,), (1, 0), "Conduct Market Research", 0.75)]
+    # Nested tasks are never merged into their own ancestors.
+    assert _titles(plan[0]["tasks"]) == ["Draft Market Research Report", "Identify Competitors"]
+    assert _titles(plan[1]["tasks"]) == ["Prioritize Features"]
+
+
+def test_distinct_tasks_and_top_level_objectives_are_kept():
+    plan = [
+        _task("Design", tasks=[_task("Write unit tests", "Cover the sync engine."), _task("Set up CI")]),
+        _task("Design", tasks=[_task("Write release notes", "Summarize changes for users.")]),
+    ]
+
+    assert dedupe_plan(plan) == []
+    assert _titles(plan) == ["Design", "Design"]
+
+
+def test_later_copies_merge_into_the_first_and_threshold_is_respected():
+    copies = [_task("Set up analytics dashboard", "Track activation and retention.", "Dashboard") for _ in range(3)]
+    reworded = _task("Set up the analytics dashboards", "Track activation, retention and churn.", "Dashboard")
+    plan = [_task("Build", tasks=copies[:2]), _task("Launch", tasks=[copies[2], reworded])]
+
+    records = dedupe_plan(plan, threshold=1.0)
+
+    assert [(record.kept, record.removed) for record in records] == [((0, 0), (0, 1)), ((0, 0), (1, 0))]
+    assert _titles(plan[1]["tasks"]) == ["Set up the analytics dashboards"]
+    assert len(dedupe_plan(plan, threshold=0.5)) == 1
+    with pytest.raises(ValueError):
+        dedupe_plan(plan, threshold=0)
+
+
+def test_single_duplicate_is_found_in_a_large_plan():
+    plan = [
+        _task(f"Objective {index}", tasks=[_task(f"Task {index} {step} alpha{index}x{step}") for step in range(10)])
+        for index in range(50)
+    ]
+    plan[49]["tasks"].append(_task("Task 0 0 alpha0x0"))
+
+    records = dedupe_plan(plan)
+
+    assert [(record.kept, record.removed) for record in records] == [((0, 0), (49, 10))]
+
+
+class OutlineModel:
+    def invoke(self, *_args, **_kwargs):
+        return {
+            "plan": [
+                {"title": "Research", "summary": "", "deliverable": "Research report", "tasks": []},
+                {"title": "Launch", "summary": "Release", "deliverable": "Public release", "tasks": []},
+            ]
+        }
+
+
+class RepeatingReactModel:
+    def invoke(self, *_args, **_kwargs):
+        return {"analysis": [], "tasks": [_task("User interviews", "Talk to ten users.", "Interview notes")]}
+
+
+def test_planner_merges_duplicates_after_finalize():
+    result = IdeaPlanner(OutlineModel(), RepeatingReactModel(), dedupe_threshold=0.8).plan("Habit tracker")
+
+    assert [len(objective.tasks) for objective in result.tree] == [1, 0]
+    assert result.duplicates == [DuplicateRecord((0, 0), (1, 0), "User interviews", 1.0)]
+    assert [node.node for node in result.metrics.nodes][-2:] == ["finalize", "dedupe"]
+
+
+def test_planner_keeps_duplicates_without_threshold():
+    result = IdeaPlanner(OutlineModel(), RepeatingReactModel()).plan("Habit tracker")
+
+    assert [len(objective.tasks) for objective in result.tree] == [1, 1]
+    assert result.duplicates == []
+    with pytest.raises(ValueError):
+        IdeaPlanner(OutlineModel(), RepeatingReactModel(), dedupe_threshold=1.5)
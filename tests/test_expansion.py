@@ -0,0 +1,233 @@
+# Author: everettjf
+"""Tests for the budget-driven breadth-first expansion scheduler."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+
+os.environ.setdefault("LANGCHAIN_TRACING_V2", "false")
+os.environ.setdefault("LANGSMITH_TRACING", "false")
+
+import pytest
+
+from ideaforge.expansion import ExpansionBudget, ExpansionFailed, expand_tree
+from ideaforge.planner import IdeaPlanner
+
+
+def _leaf(title):
+    return {"title": title, "summary": "", "deliverable": "", "tasks": []}
+
+
+def _children_expander(width=2, tokens=10, delay=0.0, order=None):
+    async def expand(node, path, ancestors):
+        if order is not None:
+            order.append(path)
+        await asyncio.sleep(delay)
+        return [_leaf(f"{node['title']}.{index + 1}") for index in range(width)], tokens
+
+    return expand
+
+
+def _depth(items):
+    return 1 + max((_depth(item["tasks"]) for item in items if item["tasks"]), default=0)
+
+
+@pytest.mark.asyncio
+async def test_expand_tree_fills_levels_breadth_first_up_to_max_depth():
+    plan = [_leaf("A"), _leaf("B")]
+    order = []
+
+    outcome = await expand_tree(plan, _children_expander(order=order), ExpansionBudget(max_depth=3))
+
+    assert order == [(0,), (1,), (0, 0), (0, 1), (1, 0), (1, 1)]
+    assert _depth(plan) == 3
+    assert plan[1]["tasks"][0]["tasks"][1]["title"] == "B.1.2"
+    assert outcome.expanded == 6
+    assert outcome.added == 12
+    assert outcome.tokens == 60
+    assert outcome.stop_reason == "complete"
+    assert outcome.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_expand_tree_passes_ancestor_titles():
+    plan = [{"title": "A", "tasks": [_leaf("A.1")]}]
+    seen = {}
+
+    async def expand(node, path, ancestors):
+        seen[path] = ancestors
+        return [_leaf(node["title"] + ".x")], 0
+
+    await expand_tree(plan, expand, ExpansionBudget(max_depth=3))
+
+    assert seen == {(0, 0): ("A",)}
+
+
+@pytest.mark.asyncio
+async def test_expand_tree_truncates_children_to_node_budget():
+    plan = [_leaf("A"), _leaf("B")]
+
+    outcome = await expand_tree(plan, _children_expander(width=3), ExpansionBudget(max_depth=3, max_nodes=6))
+
+    total = 2 + sum(1 + len(child["tasks"]) for item in plan for child in item["tasks"])
+    assert total == 6
+    assert [len(item["tasks"]) for item in plan] == [3, 1]
+    assert outcome.stop_reason == "nodes"
+    assert outcome.pending > 0
+
+
+@pytest.mark.asyncio
+async def test_expand_tree_stops_scheduling_when_tokens_run_out():
+    plan = [_leaf("A"), _leaf("B"), _leaf("C")]
+
+    outcome = await expand_tree(plan, _children_expander(tokens=50), ExpansionBudget(max_depth=2, max_tokens=100))
+
+    assert outcome.expanded == 2
+    assert outcome.tokens == 100
+    assert plan[2]["tasks"] == []
+    assert outcome.stop_reason == "tokens"
+    assert outcome.pending == 1
+
+
+@pytest.mark.asyncio
+async def test_expand_tree_cancels_in_flight_work_when_time_runs_out():
+    plan = [_leaf("A"), _leaf("B")]
+    cancelled = []
+
+    async def expand(node, path, ancestors):
+        if path == (0,):
+            return [_leaf("A.1")], 0
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(path)
+            raise
+        return [_leaf("never")], 0
+
+    outcome = await expand_tree(plan, expand, ExpansionBudget(max_depth=2, max_seconds=0.1), concurrency=2)
+
+    assert cancelled == [(1,)]
+    assert plan[0]["tasks"] == [_leaf("A.1")]
+    assert plan[1]["tasks"] == []
+    assert outcome.stop_reason == "time"
+    assert outcome.pending == 1
+    assert outcome.seconds < 1
+
+
+@pytest.mark.asyncio
+async def test_expand_tree_runs_expansions_concurrently():
+    plan = [_leaf(str(index)) for index in range(4)]
+    active = peak = 0
+
+    async def expand(node, path, ancestors):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return [_leaf("x")], 0
+
+    await expand_tree(plan, expand, ExpansionBudget(max_depth=2), concurrency=2)
+
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("error", [ValueError("unusable"), ConnectionError("provider unreachable")])
+async def test_expand_tree_leaves_failed_nodes_as_leaves(error):
+    plan = [_leaf("A"), _leaf("B")]
+
+    async def expand(node, path, ancestors):
+        if node["title"] == "A":
+            raise error
+        return [_leaf("B.1")], 5
+
+    outcome = await expand_tree(plan, expand, ExpansionBudget(max_depth=2))
+
+    assert plan[0]["tasks"] == []
+    assert plan[1]["tasks"] == [_leaf("B.1")]
+    assert outcome.failed == 1
+    assert outcome.expanded == 1
+    assert outcome.stop_reason == "complete"
+
+
+@pytest.mark.asyncio
+async def test_expand_tree_counts_tokens_of_failed_expansions_against_the_budget():
+    plan = [_leaf("A"), _leaf("B"), _leaf("C")]
+
+    async def expand(node, path, ancestors):
+        raise ExpansionFailed("still invalid after repairs", tokens=50)
+
+    outcome = await expand_tree(plan, expand, ExpansionBudget(max_depth=2, max_tokens=100))
+
+    assert outcome.failed == 2
+    assert outcome.tokens == 100
+    assert outcome.stop_reason == "tokens"
+    assert outcome.pending == 1
+
+
+def test_expansion_budget_rejects_invalid_limits():
+    with pytest.raises(ValueError):
+        ExpansionBudget(max_depth=0)
+    with pytest.raises(ValueError):
+        ExpansionBudget(max_nodes=0)
+    with pytest.raises(ValueError):
+        ExpansionBudget(max_tokens=-1)
+
+
+class OutlineModel:
+    def invoke(self, *_args, **_kwargs):
+        return {"plan": [_leaf("Build"), _leaf("Launch release")]}
+
+
+class DeepeningModel:
+    """Expands objectives into one task and tasks into two, failing on any task named ``Bad``."""
+
+    def __init__(self):
+        self.prompts = []
+
+    def invoke(self, messages, *_args, **_kwargs):
+        prompt = messages[-1].content
+        self.prompts.append(prompt)
+        if "Top-level objective: " in prompt:
+            title = prompt.split("Top-level objective: ", 1)[1].split("\n", 1)[0]
+            return {"analysis": ["Final: ok"], "tasks": [_leaf(f"{title} step"), _leaf("Bad")]}
+        title = prompt.split("\nTask: ", 1)[1].split("\n", 1)[0]
+        if title == "Bad":
+            return "no json here"
+        return {"analysis": [], "tasks": [_leaf(f"{title} a"), _leaf(f"{title} b")]}
+
+
+def test_planner_deepens_leaves_within_budget():
+    model = DeepeningModel()
+    planner = IdeaPlanner(
+        OutlineModel(), model, max_repair_attempts=0, expansion_budget=ExpansionBudget(max_depth=3)
+    )
+    events = []
+
+    result = planner.plan("Habit tracker", on_event=events.append)
+
+    build = result.tree[0]
+    assert [task.title for task in build.tasks[0].tasks] == ["Build step a", "Build step b"]
+    assert build.tasks[1].tasks == []
+    assert result.expansion.expanded == 2
+    assert result.expansion.failed == 2
+    assert any("Parent tasks: Build\nTask: Build step" in prompt for prompt in model.prompts)
+    deepened = [node for node in result.metrics.nodes if node.node == "deepen"]
+    assert sorted(node.path for node in deepened) == [(0, 0), (0, 1), (1, 0), (1, 1)]
+    assert {event.path for event in events if getattr(event, "stage", None) == "deepen"} == {
+        (0, 0, 0),
+        (0, 0, 1),
+        (1, 0, 0),
+        (1, 0, 1),
+    }
+
+
+def test_planner_without_budget_does_not_deepen():
+    model = DeepeningModel()
+    result = IdeaPlanner(OutlineModel(), model).plan("Habit tracker")
+
+    assert result.expansion is None
+    assert all(task.tasks == [] for task in result.tree[0].tasks)
+    assert len(model.prompts) == 2
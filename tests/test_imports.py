@@ -0,0 +1,52 @@
+# Author: everettjf
+"""Startup-time regression checks: the CLI must not import the LangChain stack eagerly."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_PREFIXES = ("langchain", "langgraph", "langsmith", "openai")
+# Generous ceiling (typer + rich take ~0.1 s); eagerly importing LangChain costs over 1 s.
+IMPORT_BUDGET_SECONDS = 0.6
+
+
+def _import_times(statement: str) -> dict[str, int]:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement], capture_output=True, text=True, check=True
+    )
+    times: dict[str, int] = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line.split("|"))
+        if cumulative.isdigit():
+            times[name] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize("module", ["ideaforge", "ideaforge.cli"])
+def test_import_does_not_load_langchain(module):
+    times = _import_times(f"import {module}")
+
+    assert module in times
+    assert not [name for name in times if name.startswith(HEAVY_PREFIXES)]
+
+
+def test_cli_import_time_budget():
+    # Best of three, so a busy machine does not fail the check spuriously.
+    fastest = min(_import_times("import ideaforge.cli")["ideaforge.cli"] for _ in range(3))
+
+    assert fastest / 1_000_000 < IMPORT_BUDGET_SECONDS
+
+
+def test_lazy_exports_resolve():
+    import ideaforge
+    from ideaforge.planner import IdeaPlanner
+
+    assert ideaforge.IdeaPlanner is IdeaPlanner
+    assert "PlanResult" in dir(ideaforge)
+    with pytest.raises(AttributeError):
+        ideaforge.missing_name  # noqa: B018
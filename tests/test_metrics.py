@@ -0,0 +1,131 @@
+# Author: everettjf
+"""Tests for per-node planning metrics."""
+
+from __future__ import annotations
+
+import os
+
+os.environ.setdefault("LANGCHAIN_TRACING_V2", "false")
+os.environ.setdefault("LANGSMITH_TRACING", "false")
+
+import json
+
+from langchain_core.messages import AIMessage
+
+from ideaforge.events import StageCompleted
+from ideaforge.metrics import NodeMetrics, PlanMetrics, cached_prompt_tokens, token_usage
+from ideaforge.planner import IdeaPlanner
+
+
+def _message(payload, input_tokens, output_tokens):
+    content = payload if isinstance(payload, str) else json.dumps(payload)
+    return AIMessage(
+        content=content,
+        usage_metadata={
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        },
+    )
+
+
+class OutlineModel:
+    def invoke(self, *_args, **_kwargs):
+        plan = [{"title": title, "tasks": []} for title in ("Build", "Launch")]
+        return _message({"plan": plan}, 100, 40)
+
+
+class ReactModel:
+    """Returns malformed JSON for ``Build`` first, valid payloads otherwise."""
+
+    def __init__(self):
+        self.broken_sent = False
+
+    def invoke(self, messages, *_args, **_kwargs):
+        prompt = messages[-1].content
+        if "Broken output:" in prompt:
+            return _message({"analysis": [], "tasks": [{"title": "Build task", "tasks": []}]}, 30, 10)
+        title = prompt.split("Top-level objective: ", 1)[1].split("\n", 1)[0]
+        if title == "Build" and not self.broken_sent:
+            self.broken_sent = True
+            return _message('{"tasks": [{"title": "Build task",,]}', 200, 80)
+        return _message({"analysis": [], "tasks": [{"title": f"{title} task", "tasks": []}]}, 200, 80)
+
+
+def test_plan_records_metrics_per_node():
+    events = []
+    result = IdeaPlanner(OutlineModel(), ReactModel()).plan("Metered idea", on_event=events.append)
+
+    metrics = result.metrics
+    assert [(node.node, node.path) for node in metrics.nodes] == [
+        ("plan", ()),
+        ("react", (0,)),
+        ("react", (1,)),
+        ("finalize", ()),
+    ]
+    build = metrics.nodes[1]
+    assert (build.model_calls, build.retries) == (2, 1)
+    assert (build.prompt_tokens, build.completion_tokens) == (230, 90)
+    assert build.wall_seconds >= build.model_seconds >= 0
+    assert build.parse_seconds > 0
+    assert metrics.nodes[3].model_calls == 0
+    assert (metrics.prompt_tokens, metrics.completion_tokens, metrics.retries) == (530, 210, 1)
+    assert metrics.wall_seconds >= sum(node.wall_seconds for node in metrics.nodes)
+    assert [event.metrics for event in events if isinstance(event, StageCompleted)] == metrics.nodes
+
+
+def test_metrics_serialise_and_price():
+    node = NodeMetrics(node="react", path=(2,), title="Launch", prompt_tokens=1_000, completion_tokens=500)
+    metrics = PlanMetrics(nodes=[node], wall_seconds=1.5)
+
+    assert NodeMetrics.from_dict(json.loads(json.dumps(node.to_dict()))) == node
+    assert metrics.to_dict()["nodes"][0]["path"] == [2]
+    assert metrics.estimate_cost(prompt_price=2.0, completion_price=8.0) == 0.006
+
+
+def test_token_usage_falls_back_to_response_metadata():
+    message = AIMessage(content="{}", response_metadata={"token_usage": {"prompt_tokens": 7, "completion_tokens": 3}})
+
+    assert token_usage(message) == (7, 3)
+    assert token_usage({"plan": []}) == (0, 0)
+
+
+def test_cached_prompt_tokens_reads_provider_reports():
+    langchain = AIMessage(
+        content="{}",
+        usage_metadata={
+            "input_tokens": 900,
+            "output_tokens": 10,
+            "total_tokens": 910,
+            "input_token_details": {"cache_read": 768},
+        },
+    )
+    openai = AIMessage(
+        content="{}",
+        response_metadata={"token_usage": {"prompt_tokens": 900, "prompt_tokens_details": {"cached_tokens": 512}}},
+    )
+    anthropic = AIMessage(content="{}", response_metadata={"usage": {"cache_read_input_tokens": 256}})
+
+    assert cached_prompt_tokens(langchain) == 768
+    assert cached_prompt_tokens(openai) == 512
+    assert cached_prompt_tokens(anthropic) == 256
+    assert cached_prompt_tokens({"plan": []}) == 0
+
+
+def test_cached_tokens_are_reported_and_priced():
+    node = NodeMetrics(node="react", prompt_tokens=1_000, cached_tokens=800, completion_tokens=0)
+    metrics = PlanMetrics(nodes=[node])
+
+    assert metrics.cache_hit_rate == 0.8
+    assert metrics.to_dict()["cached_tokens"] == 800
+    assert metrics.estimate_cost(prompt_price=2.0, completion_price=8.0, cached_price=0.5) == 0.0008
+
+
+def test_tier_hit_rates_count_nodes_that_reached_each_tier():
+    metrics = PlanMetrics(
+        nodes=[NodeMetrics(node="plan")] + [NodeMetrics(node="react", tier=tier) for tier in (0, 0, 1, 2)]
+    )
+
+    assert metrics.tier_hit_rates == [0.5, 0.5, 1.0]
+    assert metrics.to_dict()["tier_hit_rates"] == [0.5, 0.5, 1.0]
+    assert PlanMetrics(nodes=[NodeMetrics(node="react")]).tier_hit_rates == []
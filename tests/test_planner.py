@@ -3,17 +3,22 @@
 
 from __future__ import annotations
 
+import asyncio
+import json
 import os
+import threading
+import time
 
 os.environ.setdefault("LANGCHAIN_TRACING_V2", "false")
 os.environ.setdefault("LANGSMITH_TRACING", "false")
 
 import langsmith.utils as langsmith_utils
+import pytest
 
 langsmith_utils.tracing_enabled = lambda: False
 langsmith_utils.tracing_v2_enabled = lambda: False
 
-from ideaforge.planner import IdeaPlanner, PlanNode, PlanResult
+from ideaforge.planner import IdeaPlanner, PlanNode, PlanResult, RepairRecord, render_tree
 
 
 class StaticPlannerModel:
@@ -35,6 +40,68 @@ class SequenceReactModel:
         return payload
 
 
+class AsyncObjectiveModel:
+    """Async-only fake that expands any objective after a simulated network delay."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+
+    async def ainvoke(self, messages, *_args, **_kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        prompt = messages[-1].content
+        title = prompt.split("Top-level objective: ", 1)[1].split("\n", 1)[0]
+        return {
+            "analysis": [f"Thought: expand {title}"],
+            "tasks": [{"title": f"{title} task", "summary": "", "deliverable": "", "tasks": []}],
+        }
+
+
+class AsyncStaticPlannerModel(StaticPlannerModel):
+    async def ainvoke(self, *_args, **_kwargs):
+        await asyncio.sleep(0)
+        return {"plan": [dict(item) for item in self.plan]}
+
+
+class ObjectiveReactModel:
+    """Returns the payload registered for the objective named in the prompt."""
+
+    def __init__(self, payloads, delay=0.0):
+        self.payloads = payloads
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, messages, *_args, **_kwargs):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            prompt = messages[-1].content
+            for title, payload in self.payloads.items():
+                if f"Top-level objective: {title}\n" in prompt:
+                    return payload
+            raise AssertionError(f"Unexpected objective prompt: {prompt}")
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+class RepairModel:
+    """Answers repair prompts with queued responses and records the broken output it was sent."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.prompts: list[str] = []
+
+    def invoke(self, messages, *_args, **_kwargs):
+        self.prompts.append(messages[-1].content)
+        return self.responses.pop(0)
+
+
 def test_plan_generates_tree_and_launch_step():
     plan_skeleton = [
         {
@@ -156,3 +223,482 @@ def test_plan_reports_progress_updates():
     assert any(msg.startswith("Refining objective") for msg in messages)
     assert "Ensuring launch coverage" in messages
     assert messages[-1] == "Launch plan ready"
+
+
+def test_parallel_plan_preserves_objective_order():
+    titles = ["Research", "Design", "Build", "Launch publicly"]
+    plan_skeleton = [
+        {"title": title, "summary": f"{title} summary", "deliverable": f"{title} output", "tasks": []}
+        for title in titles
+    ]
+    payloads = {
+        title: {
+            "analysis": [f"Thought: {title.lower()}", "Final: done"],
+            "tasks": [{"title": f"{title} task", "summary": "", "deliverable": "", "tasks": []}],
+        }
+        for title in titles
+    }
+    react_model = ObjectiveReactModel(payloads, delay=0.05)
+    planner = IdeaPlanner(StaticPlannerModel(plan_skeleton), react_model, max_parallel_objectives=2)
+
+    result = planner.plan("Parallel demo")
+
+    assert [node.title for node in result.tree] == titles
+    assert [node.tasks[0].title for node in result.tree] == [f"{title} task" for title in titles]
+    assert [entry.split(":", 1)[0] for entry in result.analyses] == titles
+    assert react_model.peak == 2
+
+
+def test_max_parallel_objectives_must_be_positive():
+    with pytest.raises(ValueError):
+        IdeaPlanner(StaticPlannerModel([]), SequenceReactModel([]), max_parallel_objectives=0)
+
+
+@pytest.mark.asyncio
+async def test_aplan_supports_async_models_and_callbacks():
+    plan_skeleton = [
+        {"title": "Prototype", "summary": "", "deliverable": "", "tasks": []},
+        {"title": "Release", "summary": "", "deliverable": "", "tasks": []},
+    ]
+    planner = IdeaPlanner(AsyncStaticPlannerModel(plan_skeleton), AsyncObjectiveModel())
+    messages: list[str] = []
+
+    async def record(message: str) -> None:
+        messages.append(message)
+
+    result = await planner.aplan("Async demo", progress=record)
+
+    assert [node.title for node in result.tree] == ["Prototype", "Release"]
+    assert result.tree[0].tasks[0].title == "Prototype task"
+    assert messages[0] == "Generating roadmap outline"
+    assert messages[-1] == "Launch plan ready"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_aplan_calls_keep_separate_progress_streams():
+    plan_skeleton = [{"title": "Launch", "summary": "", "deliverable": "", "tasks": []}]
+    react_model = AsyncObjectiveModel(delay=0.01)
+    planner = IdeaPlanner(AsyncStaticPlannerModel(plan_skeleton), react_model)
+    logs: dict[str, list[str]] = {f"idea {index}": [] for index in range(20)}
+
+    results = await asyncio.gather(
+        *(planner.aplan(idea, progress=log.append) for idea, log in logs.items())
+    )
+
+    assert len(results) == 20
+    assert react_model.calls == 20
+    assert all(log.count("Launch plan ready") == 1 for log in logs.values())
+
+
+def test_malformed_objective_is_repaired_without_replanning():
+    plan_skeleton = [
+        {"title": "Build", "summary": "", "deliverable": "", "tasks": []},
+        {"title": "Launch", "summary": "", "deliverable": "", "tasks": []},
+    ]
+    broken = '{"analysis": ["Thought: build"], "tasks": [{"title": "Build task" "tasks": []}]}'
+    react_model = SequenceReactModel(
+        [broken, {"analysis": ["Final: ship"], "tasks": [{"title": "Ship it", "tasks": []}]}]
+    )
+    repair_model = RepairModel(
+        [
+            '{"tasks": []}',
+            {"analysis": ["Thought: build"], "tasks": [{"title": "Build task", "tasks": []}]},
+        ]
+    )
+    planner = IdeaPlanner(StaticPlannerModel(plan_skeleton), react_model, repair_model=repair_model)
+    messages: list[str] = []
+
+    result = planner.plan("Repair demo", progress=messages.append)
+
+    assert react_model.calls == 2
+    assert [node.tasks[0].title for node in result.tree] == ["Build task", "Ship it"]
+    assert result.repairs == [RepairRecord(stage="react", path=(0,), title="Build", attempts=2)]
+    assert broken in repair_model.prompts[0]
+    assert '{"tasks": []}' in repair_model.prompts[1]
+    assert "Repairing objective 1/2 response (attempt 2/2)" in messages
+
+
+def test_repair_gives_up_after_max_attempts():
+    repair_model = RepairModel(["still not json"])
+    planner = IdeaPlanner(
+        StaticPlannerModel([]), SequenceReactModel([]), repair_model=repair_model, max_repair_attempts=1
+    )
+
+    with pytest.raises(ValueError, match="after 1 repair attempts"):
+        planner.plan("Hopeless idea")
+    assert len(repair_model.prompts) == 1
+
+
+
+def test_json_that_is_not_an_object_is_repaired():
+    plan = [{"title": "Build", "summary": "", "deliverable": "", "tasks": []}]
+    react_model = SequenceReactModel(['[{"title": "Build task"}]'])
+    repair_model = RepairModel([{"analysis": [], "tasks": [{"title": "Build task", "tasks": []}]}])
+    planner = IdeaPlanner(StaticPlannerModel(plan), react_model, repair_model=repair_model)
+
+    result = planner.plan("List reply")
+
+    assert result.tree[0].tasks[0].title == "Build task"
+    assert "instead of an object" in repair_model.prompts[0]
+
+
+def test_tasks_that_are_not_objects_are_repaired():
+    plan = [{"title": "Build", "summary": "", "deliverable": "", "tasks": []}]
+    react_model = SequenceReactModel([{"analysis": [], "tasks": [{"title": "Code", "tasks": ["Do X", "Do Y"]}]}])
+    repair_model = RepairModel([{"analysis": [], "tasks": [{"title": "Code", "tasks": [{"title": "Do X"}]}]}])
+    planner = IdeaPlanner(StaticPlannerModel(plan), react_model, repair_model=repair_model)
+
+    result = planner.plan("String tasks")
+
+    assert result.tree[0].tasks[0].tasks[0].title == "Do X"
+    assert "task 1.1 is not an object" in repair_model.prompts[0]
+
+
+def test_plan_node_handles_very_deep_trees_without_recursion():
+    depth = 5_000
+    data = {"title": "Level 0", "tasks": []}
+    current = data
+    for level in range(1, depth):
+        child = {"title": f"Level {level}", "summary": "", "deliverable": "", "tasks": []}
+        current["tasks"].append(child)
+        current = child
+
+    node = PlanNode.from_dict(data)
+
+    assert sum(1 for _ in node.iter_nodes()) == depth
+    assert node.to_dict()["tasks"][0]["title"] == "Level 1"
+    assert len(node.render()) == depth
+
+
+def test_render_tree_streams_connectors_and_details():
+    tree = [
+        PlanNode.from_dict(
+            {
+                "title": "Build",
+                "deliverable": "MVP",
+                "summary": "Core flows",
+                "tasks": [{"title": "API"}, {"title": "UI", "tasks": [{"title": "Theme"}]}],
+            }
+        ),
+        PlanNode(title="Launch"),
+    ]
+
+    assert list(render_tree(tree)) == [
+        "├── Build → MVP",
+        "│   summary: Core flows",
+        "│   ├── API",
+        "│   └── UI",
+        "│       └── Theme",
+        "└── Launch",
+    ]
+    assert [node.title for node in tree[0].iter_nodes()] == ["Build", "API", "UI", "Theme"]
+
+
+class RecordingReactModel:
+    def __init__(self, payload):
+        self.payload = payload
+        self.prompts: list[str] = []
+
+    def invoke(self, messages, *_args, **_kwargs):
+        self.prompts.append(messages[-1].content)
+        return self.payload
+
+
+def test_refine_reexpands_only_the_chosen_objective():
+    plan = [
+        {"title": "Research", "summary": "", "deliverable": "", "tasks": []},
+        {"title": "Build", "summary": "", "deliverable": "", "tasks": []},
+        {"title": "Launch release", "summary": "", "deliverable": "", "tasks": []},
+    ]
+    react = ObjectiveReactModel(
+        {
+            "Research": {"analysis": ["Final: ok"], "tasks": [{"title": "Interviews", "tasks": []}]},
+            "Build": {"analysis": ["Final: ok"], "tasks": [{"title": "Monolith", "tasks": []}]},
+            "Launch release": {"analysis": ["Final: ok"], "tasks": [{"title": "Ship", "tasks": []}]},
+        }
+    )
+    original = IdeaPlanner(StaticPlannerModel(plan), react).plan("Recipe app")
+    saved = PlanResult.from_dict(original.to_dict())
+    refiner = RecordingReactModel(
+        {"analysis": ["Final: split"], "tasks": [{"title": "API service", "tasks": []}, {"title": "Web client"}]}
+    )
+
+    refined = IdeaPlanner(StaticPlannerModel([]), refiner).refine(saved, 1, "Use separate services")
+
+    assert len(refiner.prompts) == 1
+    assert "Top-level objective: Build" in refiner.prompts[0]
+    assert "Use separate services" in refiner.prompts[0]
+    assert '"title":"Monolith"' in refiner.prompts[0]
+    assert [task.title for task in refined.tree[1].tasks] == ["API service", "Web client"]
+    assert refined.tree[0].to_dict() == original.tree[0].to_dict()
+    assert [node.title for node in refined.tree] == ["Research", "Build", "Launch release"]
+    assert refined.analyses[1] == "Build: Final: split"
+    assert refined.analyses[0] == original.analyses[0]
+    assert refined.idea == "Recipe app"
+    assert [task.title for task in saved.tree[1].tasks] == ["Monolith"]
+    assert [node.node for node in refined.metrics.nodes] == ["react"]
+
+
+def test_refine_keeps_other_incomplete_markers():
+    planner = IdeaPlanner(AsyncStaticPlannerModel(DEADLINE_PLAN), AsyncObjectiveModel())
+    partial = PlanResult.from_dict({**planner.plan("App").to_dict(), "incomplete": [1, 2]})
+
+    refined = planner.refine(partial, 1, "Be more concrete")
+
+    assert refined.incomplete == [2]
+    assert planner.refine(partial, 0, "Shorter").incomplete == [1, 2]
+
+
+def test_refine_rejects_unknown_objective():
+    saved = PlanResult.from_dict({"idea": "Recipe app", "tree": [{"title": "Build"}], "analyses": []})
+    planner = IdeaPlanner(StaticPlannerModel([]), RecordingReactModel({}))
+
+    with pytest.raises(IndexError):
+        planner.refine(saved, 1, "More detail")
+
+
+def _task(title):
+    return {"title": title, "summary": f"{title} work", "deliverable": f"{title} done", "tasks": []}
+
+
+class TierModel:
+    """Cascade tier that answers objectives from ``payloads`` (an exception is raised)."""
+
+    def __init__(self, payloads):
+        self.payloads = payloads
+        self.objectives: list[str] = []
+
+    def invoke(self, messages, *_args, **_kwargs):
+        title = messages[-1].content.split("Top-level objective: ", 1)[1].split("\n", 1)[0]
+        self.objectives.append(title)
+        payload = self.payloads[title]
+        if isinstance(payload, Exception):
+            raise payload
+        return payload
+
+
+def test_cascade_escalates_only_objectives_that_fail_validation():
+    plan = [
+        {"title": "Research", "summary": "", "deliverable": "", "tasks": []},
+        {"title": "Build", "summary": "", "deliverable": "", "tasks": []},
+        {"title": "Design", "summary": "", "deliverable": "", "tasks": []},
+        {"title": "Launch release", "summary": "", "deliverable": "", "tasks": []},
+    ]
+    cheap = TierModel(
+        {
+            "Research": {"analysis": ["cheap"], "tasks": [_task("Interviews"), _task("Survey")]},
+            # Too narrow, missing fields, and a failing call: all escalate.
+            "Build": {"analysis": ["cheap"], "tasks": [_task("Everything")]},
+            "Design": {"analysis": ["cheap"], "tasks": [_task("Mockups"), {"title": "Icons"}]},
+            "Launch release": RuntimeError("overloaded"),
+        }
+    )
+    strong = TierModel(
+        {
+            "Build": {"analysis": ["strong"], "tasks": [_task("API"), _task("Client")]},
+            "Design": {"analysis": ["strong"], "tasks": [_task("Mockups")]},
+            "Launch release": {"analysis": ["strong"], "tasks": [_task("Ship")]},
+        }
+    )
+    progress: list[str] = []
+
+    result = IdeaPlanner(StaticPlannerModel(plan), strong, cascade_models=[cheap]).plan(
+        "Recipe app", progress=progress.append
+    )
+
+    assert cheap.objectives == ["Research", "Build", "Design", "Launch release"]
+    assert strong.objectives == ["Build", "Design", "Launch release"]
+    assert [task.title for task in result.tree[0].tasks] == ["Interviews", "Survey"]
+    assert [task.title for task in result.tree[1].tasks] == ["API", "Client"]
+    # The strongest model is not held to the cascade's breadth rule.
+    assert [task.title for task in result.tree[2].tasks] == ["Mockups"]
+    assert [node.tier for node in result.metrics.nodes if node.node == "react"] == [0, 1, 1, 1]
+    assert result.metrics.tier_hit_rates == [0.25, 1.0]
+    assert any("Escalating objective 4/4 past model tier 1: RuntimeError: overloaded" in item for item in progress)
+
+
+def test_cascade_min_tasks_is_configurable():
+    plan = [{"title": "Launch release", "summary": "", "deliverable": "", "tasks": []}]
+    cheap = TierModel({"Launch release": {"analysis": [], "tasks": [_task("Ship")]}})
+    strong = TierModel({})
+
+    result = IdeaPlanner(StaticPlannerModel(plan), strong, cascade_models=[cheap], cascade_min_tasks=1).plan("App")
+
+    assert strong.objectives == []
+    assert result.metrics.tier_hit_rates == [1.0]
+    with pytest.raises(ValueError):
+        IdeaPlanner(StaticPlannerModel(plan), strong, cascade_min_tasks=0)
+
+
+class SlowObjectiveModel(AsyncObjectiveModel):
+    """Async fake whose delay depends on the objective being expanded."""
+
+    def __init__(self, delays):
+        super().__init__()
+        self.delays = delays
+
+    async def ainvoke(self, messages, *args, **kwargs):
+        title = messages[-1].content.split("Top-level objective: ", 1)[1].split("\n", 1)[0]
+        self.delay = self.delays.get(title, 0.0)
+        return await super().ainvoke(messages, *args, **kwargs)
+
+
+DEADLINE_PLAN = [
+    {"title": "Research", "summary": "", "deliverable": "", "tasks": []},
+    {"title": "Build", "summary": "", "deliverable": "", "tasks": [{"title": "Draft", "summary": ""}]},
+    {"title": "Market", "summary": "", "deliverable": "", "tasks": []},
+]
+
+
+# Run one at a time, objectives queued behind the slow one get no time left either.
+@pytest.mark.parametrize(("parallel", "incomplete"), [(1, [1, 2]), (3, [1])])
+def test_deadline_returns_partial_plan(parallel, incomplete):
+    react = SlowObjectiveModel({"Build": 5.0})
+    messages = []
+    planner = IdeaPlanner(AsyncStaticPlannerModel(DEADLINE_PLAN), react, max_parallel_objectives=parallel)
+
+    started = time.monotonic()
+    result = planner.plan("App", progress=messages.append, deadline=1.0)
+
+    assert time.monotonic() - started < 3.0
+    assert result.incomplete == incomplete
+    assert [node.title for node in result.tree] == ["Research", "Build", "Market", "Launch & Post-Launch"]
+    assert [task.title for task in result.tree[1].tasks] == ["Draft"]
+    assert result.tree[0].tasks[0].title == "Research task"
+    assert result.analyses[1] == "Build: incomplete (deadline reached)"
+    assert "Deadline reached; objective 2/3 left incomplete" in messages
+    assert PlanResult.from_dict(result.to_dict()).incomplete == incomplete
+
+
+def test_deadline_before_outline_raises_timeout():
+    class SlowPlannerModel(AsyncStaticPlannerModel):
+        async def ainvoke(self, *args, **kwargs):
+            await asyncio.sleep(5.0)
+            return await super().ainvoke(*args, **kwargs)
+
+    planner = IdeaPlanner(SlowPlannerModel(DEADLINE_PLAN), AsyncObjectiveModel())
+
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        planner.plan("App", deadline=0.5)
+    assert time.monotonic() - started < 3.0
+    with pytest.raises(ValueError):
+        planner.plan("App", deadline=0)
+    result = IdeaPlanner(AsyncStaticPlannerModel(DEADLINE_PLAN), AsyncObjectiveModel()).plan("App", deadline=30)
+    assert "incomplete" not in result.to_dict()
+
+
+class StreamingPlannerModel:
+    """Streams the outline text one piece at a time, ``delay`` seconds apart."""
+
+    def __init__(self, pieces, delay=0.0):
+        self.pieces = pieces
+        self.delay = delay
+        self.finished = None
+
+    async def ainvoke(self, *_args, **_kwargs):
+        await asyncio.sleep(self.delay * len(self.pieces))
+        self.finished = time.monotonic()
+        return "".join(self.pieces)
+
+    async def astream(self, *_args, **_kwargs):
+        for piece in self.pieces:
+            await asyncio.sleep(self.delay)
+            yield piece
+        self.finished = time.monotonic()
+
+
+class TimedObjectiveModel(AsyncObjectiveModel):
+    def __init__(self, delay=0.0):
+        super().__init__(delay)
+        self.started = {}
+
+    async def ainvoke(self, messages, *args, **kwargs):
+        title = messages[-1].content.split("Top-level objective: ", 1)[1].split("\n", 1)[0]
+        self.started.setdefault(title, time.monotonic())
+        return await super().ainvoke(messages, *args, **kwargs)
+
+
+def _outline_pieces(items):
+    return ['{"plan": [', *(json.dumps(item) + "," for item in items[:-1]), json.dumps(items[-1]), "]}"]
+
+
+def test_pipeline_expands_objectives_while_the_outline_streams():
+    pieces = _outline_pieces(DEADLINE_PLAN)
+    staged = IdeaPlanner(StreamingPlannerModel(pieces), AsyncObjectiveModel(), max_parallel_objectives=2).plan("App")
+    outline = StreamingPlannerModel(pieces, delay=0.05)
+    react = TimedObjectiveModel(delay=0.05)
+    planner = IdeaPlanner(outline, react, max_parallel_objectives=2, pipeline=True)
+    messages = []
+
+    result = planner.plan("App", progress=messages.append)
+
+    assert [node.to_dict() for node in result.tree] == [node.to_dict() for node in staged.tree]
+    assert result.analyses == staged.analyses
+    assert react.started["Research"] < react.started["Build"] < outline.finished
+    assert [node.node for node in result.metrics.nodes] == ["plan", "react", "react", "react", "finalize"]
+    assert "Refining objective 1: Research" in messages
+    assert "Captured 3 top-level objectives" in messages
+
+
+def test_pipeline_redoes_objectives_changed_by_an_outline_repair():
+    research, build = DEADLINE_PLAN[:2]
+    pieces = ['{"plan": [', json.dumps(research) + ",", json.dumps(build) + ",", '{"title": "Market" "x": 1}]}']
+    fixed = [research, {**build, "title": "Build v2"}]
+    react = TimedObjectiveModel()
+    planner = IdeaPlanner(
+        StreamingPlannerModel(pieces, delay=0.01), react, repair_model=RepairModel([{"plan": fixed}]), pipeline=True
+    )
+
+    result = planner.plan("App")
+
+    assert react.calls == 3  # Research once, Build (superseded) and Build v2
+    assert [node.title for node in result.tree][:2] == ["Research", "Build v2"]
+    assert result.tree[1].tasks[0].title == "Build v2 task"
+    assert result.repairs == [RepairRecord(stage="plan", path=(), title="Roadmap outline", attempts=1)]
+
+
+@pytest.mark.asyncio
+async def test_astream_yields_objectives_as_they_finish_then_the_result():
+    from ideaforge.events import ObjectiveCompleted, PlanCompleted
+
+    planner = IdeaPlanner(
+        AsyncStaticPlannerModel(DEADLINE_PLAN), SlowObjectiveModel({"Build": 0.2}), max_parallel_objectives=3
+    )
+    arrived = []
+
+    async for event in planner.astream("App"):
+        arrived.append((event, time.monotonic()))
+
+    events = [event for event, _ in arrived]
+    assert [type(event) for event in events] == [ObjectiveCompleted] * 3 + [PlanCompleted]
+    assert [event.index for event in events[:3]][-1] == 1  # the slow objective arrives last
+    research = next(event for event in events[:3] if event.index == 0)
+    assert research.node.title == "Research"
+    assert research.node.tasks[0].title == "Research task"
+    assert research.analysis == "Research: Thought: expand Research"
+    assert research.metrics.node == "react" and not research.incomplete
+    assert arrived[-1][1] - arrived[0][1] >= 0.15
+    result = events[-1].result
+    assert result.analyses == [event.analysis for event in sorted(events[:3], key=lambda event: event.index)]
+
+
+def test_stream_runs_from_sync_code_and_can_stop_early():
+    from ideaforge.events import ObjectiveCompleted, PlanCompleted
+
+    planner = IdeaPlanner(AsyncStaticPlannerModel(DEADLINE_PLAN), AsyncObjectiveModel())
+
+    events = list(planner.stream("App"))
+    assert [event.index for event in events[:3]] == [0, 1, 2]
+    assert isinstance(events[-1], PlanCompleted)
+    assert len(events[-1].result.tree) == 4
+
+    slow = IdeaPlanner(AsyncStaticPlannerModel(DEADLINE_PLAN), SlowObjectiveModel({"Build": 5.0}))
+    started = time.monotonic()
+    iterator = slow.stream("App")
+    assert isinstance(next(iterator), ObjectiveCompleted)
+    iterator.close()
+    assert time.monotonic() - started < 3.0
+
+    with pytest.raises(ValueError):
+        next(planner.stream("App", deadline=-1))
@@ -0,0 +1,87 @@
+# Author: everettjf
+"""Tests for the prefix-stable prompt layout."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+
+os.environ.setdefault("LANGCHAIN_TRACING_V2", "false")
+os.environ.setdefault("LANGSMITH_TRACING", "false")
+
+import pytest
+
+from ideaforge.expansion import ExpansionBudget
+from ideaforge.planner import IdeaPlanner
+from ideaforge.prompts import objective_messages, shared_context
+
+OUTLINE = [
+    {"title": "Build", "summary": "Core app", "deliverable": "Beta", "tasks": []},
+    {"title": "Launch", "summary": "Ship it", "deliverable": "Release", "tasks": []},
+]
+
+
+class OutlineModel:
+    def invoke(self, *_args, **_kwargs):
+        return {"plan": [dict(item) for item in OUTLINE]}
+
+
+class RecordingModel:
+    """Records every message list and expands objectives or tasks into one child."""
+
+    def __init__(self):
+        self.requests = []
+
+    def invoke(self, messages, *_args, **_kwargs):
+        self.requests.append([message.content for message in messages])
+        return {"analysis": [], "tasks": [{"title": f"Step {len(self.requests)}", "tasks": []}]}
+
+
+@pytest.mark.parametrize("parallel", [1, 2])
+def test_execute_prompts_share_a_byte_identical_prefix(parallel):
+    model = RecordingModel()
+    planner = IdeaPlanner(
+        OutlineModel(), model, max_parallel_objectives=parallel, expansion_budget=ExpansionBudget(max_depth=3)
+    )
+
+    planner.plan("Habit tracker")
+
+    # Two objectives, then the two new leaves are deepened.
+    assert len(model.requests) == 4
+    prefixes = {tuple(request[:-1]) for request in model.requests}
+    assert len(prefixes) == 1
+    assert len({request[-1] for request in model.requests}) == 4
+    assert "Habit tracker" in model.requests[0][1]
+    assert "Habit tracker" not in model.requests[0][-1]
+
+
+def test_pipelined_objective_prompts_share_a_byte_identical_prefix():
+    class StreamingOutlineModel(OutlineModel):
+        async def astream(self, *_args, **_kwargs):
+            for piece in ('{"plan": [', json.dumps(OUTLINE[0]) + ",", json.dumps(OUTLINE[1]), "]}"):
+                await asyncio.sleep(0.01)
+                yield piece
+
+    model = RecordingModel()
+    IdeaPlanner(StreamingOutlineModel(), model, max_parallel_objectives=2, pipeline=True).plan("Habit tracker")
+
+    assert len(model.requests) == 2
+    assert len({tuple(request[:-1]) for request in model.requests}) == 1
+    assert model.requests[0][1] == "Idea: Habit tracker"
+    first, second = sorted((request[-1] for request in model.requests), key=lambda text: "Launch" in text)
+    assert first.startswith("Roadmap so far, before this objective (JSON; more may follow):\n[]\n")
+    assert '"title":"Build"' in second.split("Top-level objective:")[0]
+
+
+def test_shared_context_ignores_tasks_added_during_the_run():
+    expanded = [dict(item, tasks=[{"title": "Child", "tasks": []}]) for item in OUTLINE]
+
+    assert shared_context("Idea", OUTLINE) == shared_context("Idea", expanded)
+    assert "Child" not in shared_context("Idea", expanded)
+
+
+def test_objective_suffix_carries_the_objective():
+    messages = objective_messages(shared_context("Idea", OUTLINE), OUTLINE[1])
+
+    assert messages[-1].content.startswith("Top-level objective: Launch\nSummary: Ship it\n")
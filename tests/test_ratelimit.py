@@ -0,0 +1,164 @@
+# Author: everettjf
+"""Tests for the shared rate-limit-aware model call scheduler."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+
+os.environ.setdefault("LANGCHAIN_TRACING_V2", "false")
+os.environ.setdefault("LANGSMITH_TRACING", "false")
+
+import pytest
+
+from ideaforge.bench import SCENARIOS, QuotaModel, SimulatedModel
+from ideaforge.planner import IdeaPlanner
+from ideaforge.ratelimit import (
+    PRIORITY_EXPAND,
+    PRIORITY_OUTLINE,
+    RateLimitError,
+    RateLimits,
+    RateLimitScheduler,
+    ScheduledModel,
+    is_rate_limit_error,
+)
+
+
+class FlakyModel:
+    """Fails with the given errors first, then answers."""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def ainvoke(self, *_args, **_kwargs):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return {"ok": True}
+
+
+@pytest.mark.asyncio
+async def test_request_bucket_spaces_out_calls_beyond_the_burst():
+    scheduler = RateLimitScheduler(RateLimits(requests_per_minute=1200, burst_seconds=0.25, max_concurrency=50))
+    started = time.monotonic()
+
+    async def call():
+        grant = await scheduler.acquire()
+        scheduler.release(grant)
+
+    await asyncio.gather(*(call() for _ in range(10)))
+
+    # 5 calls fit the burst; the other 5 are admitted at 20 per second.
+    assert time.monotonic() - started >= 0.2
+    assert scheduler.stats().calls == 10
+
+
+@pytest.mark.asyncio
+async def test_outline_calls_are_served_before_queued_expansions():
+    scheduler = RateLimitScheduler(RateLimits(max_concurrency=1, initial_concurrency=1))
+    holder = await scheduler.acquire()
+    order = []
+
+    async def call(name, priority):
+        grant = await scheduler.acquire(priority)
+        order.append(name)
+        scheduler.release(grant)
+
+    waiting = [asyncio.create_task(call(f"react {index}", PRIORITY_EXPAND)) for index in range(3)]
+    await asyncio.sleep(0)
+    waiting.append(asyncio.create_task(call("outline", PRIORITY_OUTLINE)))
+    await asyncio.sleep(0)
+    scheduler.release(holder)
+    await asyncio.gather(*waiting)
+
+    assert order == ["outline", "react 0", "react 1", "react 2"]
+
+
+@pytest.mark.asyncio
+async def test_concurrency_halves_on_rate_limits_and_grows_on_success():
+    scheduler = RateLimitScheduler(RateLimits(max_concurrency=8, initial_concurrency=8))
+    grants = [await scheduler.acquire() for _ in range(3)]
+
+    scheduler.release(grants[0], rate_limited=True, retry_after=0.05)
+    # A second 429 from a call started before the cut does not halve again.
+    scheduler.release(grants[1], rate_limited=True, retry_after=0.05)
+    assert scheduler.stats().concurrency_limit == 4.0
+    started = time.monotonic()
+    scheduler.release(await scheduler.acquire())
+    assert time.monotonic() - started >= 0.04
+
+    scheduler.release(grants[2])
+    stats = scheduler.stats()
+    assert 4.0 < stats.concurrency_limit < 5.0
+    assert stats.rate_limited == 2
+
+
+@pytest.mark.asyncio
+async def test_scheduled_model_retries_only_rate_limit_errors():
+    scheduler = RateLimitScheduler()
+    flaky = FlakyModel([RateLimitError(retry_after=0.01), RateLimitError(retry_after=0.01)])
+
+    assert await ScheduledModel(flaky, scheduler).ainvoke(["hi"]) == {"ok": True}
+    assert flaky.calls == 3
+    assert scheduler.stats().rate_limited == 2
+
+    broken = FlakyModel([ValueError("bad request")])
+    with pytest.raises(ValueError):
+        await ScheduledModel(broken, scheduler).ainvoke(["hi"])
+    assert broken.calls == 1
+
+    exhausted = FlakyModel([RateLimitError(retry_after=0)] * 2)
+    with pytest.raises(RateLimitError):
+        await ScheduledModel(exhausted, scheduler, max_retries=1).ainvoke(["hi"])
+
+
+def test_rate_limit_errors_are_recognized_by_status_or_name():
+    class Response:
+        status_code = 429
+        headers = {"retry-after": "2"}
+
+    class HTTPError(Exception):
+        response = Response()
+
+    class RateLimitExceeded(Exception):
+        pass
+
+    assert is_rate_limit_error(HTTPError())
+    assert is_rate_limit_error(RateLimitExceeded())
+    assert not is_rate_limit_error(ValueError())
+
+
+@pytest.mark.asyncio
+async def test_concurrent_plans_stay_under_a_simulated_quota():
+    provider = QuotaModel(SimulatedModel(SCENARIOS["overhead"]), requests_per_minute=3000, burst_seconds=0.1)
+    scheduler = RateLimitScheduler(RateLimits(requests_per_minute=3000, burst_seconds=0.1))
+    planner = IdeaPlanner(
+        ScheduledModel(provider, scheduler, priority=PRIORITY_OUTLINE),
+        ScheduledModel(provider, scheduler),
+        max_parallel_objectives=4,
+    )
+
+    results = await asyncio.gather(*(planner.aplan(f"Idea {index}") for index in range(5)))
+
+    assert all(len(result.tree) == 5 for result in results)  # 4 objectives plus the launch step
+    assert provider.rejected == 0
+    assert provider.accepted == scheduler.stats().calls == 25
+
+
+@pytest.mark.asyncio
+async def test_cancelled_calls_return_their_slots():
+    class HangingModel:
+        async def ainvoke(self, *_args, **_kwargs):
+            await asyncio.Event().wait()
+
+    scheduler = RateLimitScheduler(RateLimits(max_concurrency=2, initial_concurrency=2))
+    model = ScheduledModel(HangingModel(), scheduler)
+    for _ in range(2):
+        with pytest.raises(TimeoutError):
+            async with asyncio.timeout(0.01):
+                await model.ainvoke(["hi"])
+
+    grant = await asyncio.wait_for(scheduler.acquire(), timeout=1.0)
+    scheduler.release(grant)
@@ -0,0 +1,68 @@
+# Author: everettjf
+"""Tests for single-pass JSON recovery from noisy model output."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from ideaforge.recovery import recover_json, select_expected
+
+
+def test_braces_and_escaped_quotes_inside_strings_do_not_desync():
+    text = 'Thought: plan {x}\nFinal Answer: {"tasks": [{"title": "Handle \\"}\\" and {", "tasks": []}]}'
+
+    assert recover_json(text, ("tasks",)) == {"tasks": [{"title": 'Handle "}" and {', "tasks": []}]}
+
+
+def test_picks_object_with_expected_key_over_noise_fragments():
+    noise = " ".join('{"step": %d, "note": "{draft}"}' % index for index in range(50))
+    text = f"{noise}\nFinal Answer: {{\"analysis\": [], \"tasks\": [{{\"title\": \"Ship\"}}]}}\n{{\"aside\": 1}}"
+
+    assert recover_json(text, ("tasks",)) == {"analysis": [], "tasks": [{"title": "Ship"}]}
+
+
+def test_last_top_level_match_wins():
+    text = 'Draft: {"tasks": [{"title": "old"}]} Final: {"tasks": [{"title": "new"}]}'
+
+    assert recover_json(text, ("tasks",))["tasks"][0]["title"] == "new"
+
+
+def test_trailing_commas_are_tolerated():
+    text = 'Here you go: {"plan": [{"title": "A", "tasks": [],}, {"title": "B",},],}'
+
+    assert recover_json(text, ("plan",)) == {"plan": [{"title": "A", "tasks": []}, {"title": "B"}]}
+
+
+@pytest.mark.parametrize(
+    "tail, titles",
+    [
+        ('{"title": "C", "summ', ["A", "B", "C"]),
+        ('{"ti', ["A", "B"]),
+        ("", ["A", "B"]),
+    ],
+)
+def test_truncated_tail_keeps_completed_members(tail, titles):
+    text = '```json\n{"plan": [{"title": "A", "tasks": []}, {"title": "B", "tasks": []}, ' + tail
+
+    recovered = recover_json(text, ("plan",))
+
+    assert [item["title"] for item in recovered["plan"]] == titles
+
+
+def test_unbalanced_brace_in_prose_does_not_hide_payload():
+    text = 'Use { to open a block. {"final": {"tasks": [{"title": "x"}]}}'
+
+    assert recover_json(text, ("tasks",)) == {"tasks": [{"title": "x"}]}
+
+
+def test_returns_none_without_candidates():
+    assert recover_json("no json here, just {braces}", ("plan",)) is None
+
+
+def test_select_expected_unwraps_nested_payload():
+    wrapped = json.loads('{"final_answer": {"analysis": [], "tasks": [{"title": "x"}]}}')
+
+    assert select_expected(wrapped, ("tasks",)) == wrapped["final_answer"]
+    assert select_expected(wrapped, ()) is wrapped
@@ -0,0 +1,205 @@
+# Author: everettjf
+"""Tests for the local HTTP planning service."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+
+os.environ.setdefault("LANGCHAIN_TRACING_V2", "false")
+os.environ.setdefault("LANGSMITH_TRACING", "false")
+
+import pytest
+
+from ideaforge.planner import IdeaPlanner
+from ideaforge.server import PlanService, ServiceBusy, start_server
+
+PLAN = [
+    {"title": "Build", "summary": "Core app", "deliverable": "MVP", "tasks": []},
+    {"title": "Launch", "summary": "Release", "deliverable": "Public release", "tasks": []},
+]
+
+
+class GatedPlannerModel:
+    """Outline model that holds every call until ``gate`` is set."""
+
+    def __init__(self, fail=False):
+        self.gate = asyncio.Event()
+        self.ideas = []
+        self.fail = fail
+
+    async def ainvoke(self, messages, *_args, **_kwargs):
+        self.ideas.append(messages[-1].content.splitlines()[0])
+        await self.gate.wait()
+        if self.fail:
+            raise RuntimeError("provider unavailable")
+        return {"plan": [dict(item) for item in PLAN]}
+
+
+class TaskModel:
+    async def ainvoke(self, *_args, **_kwargs):
+        return {"analysis": ["ok"], "tasks": [{"title": "Step", "summary": "", "deliverable": "", "tasks": []}]}
+
+
+async def _request(port, method, path, payload=None, raw=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = raw if raw is not None else (b"" if payload is None else json.dumps(payload).encode())
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, content = response.partition(b"\r\n\r\n")
+    lines = head.decode().split("\r\n")
+    headers = dict(line.split(": ", 1) for line in lines[1:])
+    return int(lines[0].split()[1]), headers, content
+
+
+async def _until(condition):
+    for _ in range(1000):
+        if condition():
+            return
+        await asyncio.sleep(0.001)
+    raise AssertionError("condition never became true")
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_ideas_share_one_run():
+    model = GatedPlannerModel()
+    async with PlanService(IdeaPlanner(model, TaskModel()), workers=2) as service:
+        server = await start_server(service, port=0)
+        port = server.sockets[0].getsockname()[1]
+        requests = [
+            asyncio.create_task(_request(port, "POST", "/plan", {"idea": idea}))
+            for idea in ("Habit tracker", " Habit tracker ", "Habit tracker")
+        ]
+        await _until(lambda: service.stats().coalesced == 2)
+        model.gate.set()
+        responses = await asyncio.gather(*requests)
+        server.close()
+
+    assert [status for status, _, _ in responses] == [200, 200, 200]
+    bodies = [json.loads(body) for _, _, body in responses]
+    assert bodies[0]["tree"] == bodies[1]["tree"] == bodies[2]["tree"]
+    assert bodies[0]["idea"] == "Habit tracker"
+    assert [node["node"] for node in bodies[0]["metrics"]["nodes"]][0] == "plan"
+    assert model.ideas == ["Idea: Habit tracker"]
+    stats = service.stats()
+    assert (stats.submitted, stats.coalesced, stats.completed) == (1, 2, 1)
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_new_ideas_with_503():
+    model = GatedPlannerModel()
+    async with PlanService(IdeaPlanner(model, TaskModel()), workers=1, max_queue=1) as service:
+        server = await start_server(service, port=0)
+        port = server.sockets[0].getsockname()[1]
+        running = asyncio.create_task(_request(port, "POST", "/plan", {"idea": "First"}))
+        await _until(lambda: service.stats().running == 1)
+        queued = asyncio.create_task(_request(port, "POST", "/plan", {"idea": "Second"}))
+        await _until(lambda: service.stats().queued == 1)
+
+        status, headers, body = await _request(port, "POST", "/plan", {"idea": "Third"})
+        # Joining a run that is already queued is still allowed.
+        joined = asyncio.create_task(_request(port, "POST", "/plan", {"idea": "Second"}))
+        await _until(lambda: service.stats().coalesced == 1)
+        model.gate.set()
+        results = await asyncio.gather(running, queued, joined)
+        server.close()
+
+    assert status == 503
+    assert headers["Retry-After"] == "1"
+    assert "queue is full" in json.loads(body)["error"]
+    assert [result[0] for result in results] == [200, 200, 200]
+    assert service.stats().rejected == 1
+
+
+@pytest.mark.asyncio
+async def test_service_api_raises_busy_without_http():
+    model = GatedPlannerModel()
+    async with PlanService(IdeaPlanner(model, TaskModel()), workers=1, max_queue=1) as service:
+        first = asyncio.create_task(service.plan("First"))
+        await _until(lambda: service.stats().running == 1)
+        service.submit("Second")
+        with pytest.raises(ServiceBusy):
+            await service.plan("Third")
+        model.gate.set()
+        result = await first
+
+    assert result.idea == "First"
+    with pytest.raises(ValueError):
+        PlanService(IdeaPlanner(model, TaskModel()), workers=0)
+
+
+@pytest.mark.asyncio
+async def test_stream_sends_events_then_the_result():
+    model = GatedPlannerModel()
+    model.gate.set()
+    async with PlanService(IdeaPlanner(model, TaskModel())) as service:
+        server = await start_server(service, port=0)
+        port = server.sockets[0].getsockname()[1]
+        status, headers, body = await _request(port, "POST", "/stream", {"idea": "Habit tracker"})
+        server.close()
+
+    messages = [json.loads(line) for line in body.decode().splitlines()]
+    assert status == 200
+    assert headers["Content-Type"] == "application/x-ndjson"
+    assert messages[0]["type"] == "progress"
+    assert {(tuple(item["path"]), item["title"]) for item in messages if item["type"] == "node"} >= {
+        ((0,), "Build"),
+        ((0, 0), "Step"),
+    }
+    assert any(item["type"] == "stage" and item["node"] == "finalize" for item in messages)
+    objectives = [item for item in messages if item["type"] == "objective"]
+    assert [item["index"] for item in objectives] == [0, 1]
+    assert objectives[0]["objective"]["tasks"][0]["title"] == "Step"
+    assert messages[-1]["type"] == "result"
+    assert messages[-1]["tree"][0]["tasks"][0]["title"] == "Step"
+
+
+@pytest.mark.asyncio
+async def test_planning_failures_reach_every_waiting_client():
+    model = GatedPlannerModel(fail=True)
+    async with PlanService(IdeaPlanner(model, TaskModel(), max_repair_attempts=0)) as service:
+        server = await start_server(service, port=0)
+        port = server.sockets[0].getsockname()[1]
+        plan = asyncio.create_task(_request(port, "POST", "/plan", {"idea": "Broken"}))
+        stream = asyncio.create_task(_request(port, "POST", "/stream", {"idea": "Broken"}))
+        await _until(lambda: service.stats().coalesced == 1)
+        model.gate.set()
+        (plan_status, _, plan_body), (stream_status, _, stream_body) = await asyncio.gather(plan, stream)
+        server.close()
+
+    assert plan_status == 500
+    assert json.loads(plan_body)["error"] == "RuntimeError: provider unavailable"
+    assert stream_status == 200
+    assert json.loads(stream_body.decode().splitlines()[-1]) == {
+        "type": "error",
+        "error": "RuntimeError: provider unavailable",
+    }
+    assert service.stats().failed == 1
+
+
+@pytest.mark.asyncio
+async def test_bad_requests_and_health():
+    async with PlanService(IdeaPlanner(GatedPlannerModel(), TaskModel())) as service:
+        server = await start_server(service, port=0)
+        port = server.sockets[0].getsockname()[1]
+        bad_json = await _request(port, "POST", "/plan", raw=b"{not json")
+        no_idea = await _request(port, "POST", "/plan", {"idea": "  "})
+        missing = await _request(port, "GET", "/nowhere")
+        wrong_method = await _request(port, "GET", "/plan")
+        health = await _request(port, "GET", "/health")
+        server.close()
+
+    assert [response[0] for response in (bad_json, no_idea, missing, wrong_method)] == [400, 400, 404, 405]
+    assert json.loads(health[2]) == {
+        "status": "ok",
+        "submitted": 0,
+        "coalesced": 0,
+        "rejected": 0,
+        "completed": 0,
+        "failed": 0,
+        "queued": 0,
+        "running": 0,
+    }
@@ -0,0 +1,154 @@
+# Author: everettjf
+"""Tests for incremental JSON parsing and streamed node events."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+
+os.environ.setdefault("LANGCHAIN_TRACING_V2", "false")
+os.environ.setdefault("LANGSMITH_TRACING", "false")
+
+import pytest
+
+from ideaforge.events import NodeCompleted, PlanEvent
+from ideaforge.planner import IdeaPlanner
+from ideaforge.streaming import IncrementalJSONParser
+
+REACT_TEXT = (
+    "Thought: the {tricky} part is auth.\n```json\n"
+    + json.dumps(
+        {
+            "analysis": ["Action: split work {a, b}"],
+            "tasks": [
+                {
+                    "title": 'Auth "}" flow',
+                    "summary": "Handle \\\\ and {",
+                    "tasks": [{"title": "OAuth", "tasks": []}],
+                },
+                {"title": "Billing", "tasks": []},
+            ],
+        }
+    )
+    + "\n```"
+)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 17, len(REACT_TEXT)])
+def test_parser_emits_nodes_as_they_close(chunk_size):
+    parser = IncrementalJSONParser()
+    completed = []
+    for start in range(0, len(REACT_TEXT), chunk_size):
+        completed.extend(parser.feed(REACT_TEXT[start : start + chunk_size]))
+
+    assert [(path, value["title"]) for path, value in completed] == [
+        (("tasks", 0, "tasks", 0), "OAuth"),
+        (("tasks", 0), 'Auth "}" flow'),
+        (("tasks", 1), "Billing"),
+    ]
+
+
+def test_parser_decodes_many_nodes_across_uneven_chunks():
+    tasks = [{"title": f"Task {index}", "summary": "x" * (index % 7), "tasks": []} for index in range(200)]
+    text = "Final Answer: " + json.dumps({"analysis": [], "tasks": tasks}) + " trailing prose {"
+    parser = IncrementalJSONParser()
+    completed = []
+    position = 0
+    for size in [0, 1, 5, 0, 13, 2, 40] * 200:
+        completed.extend(parser.feed(text[position : position + size]))
+        position += size
+
+    assert [value for _, value in completed] == tasks
+
+
+@pytest.mark.parametrize(
+    "prose",
+    ["Here is the plan [draft:\n", "- [x] Outline ready\n", "Fill in {placeholders before shipping.\n```json\n"],
+)
+def test_parser_ignores_unbalanced_brackets_in_prose_before_the_payload(prose):
+    text = prose + json.dumps({"plan": [{"title": "Build", "tasks": [{"title": "API", "tasks": []}]}]})
+    parser = IncrementalJSONParser()
+    completed = []
+    for start in range(0, len(text), 3):
+        completed.extend(parser.feed(text[start : start + 3]))
+
+    assert [(path, value["title"]) for path, value in completed] == [
+        (("plan", 0, "tasks", 0), "API"),
+        (("plan", 0), "Build"),
+    ]
+
+
+def test_parser_reports_node_before_stream_ends():
+    parser = IncrementalJSONParser()
+    head, tail = REACT_TEXT.split('{"title": "Billing"')
+
+    first = parser.feed(head)
+
+    assert [value["title"] for _, value in first] == ["OAuth", 'Auth "}" flow']
+    assert [value["title"] for _, value in parser.feed('{"title": "Billing"' + tail)] == ["Billing"]
+
+
+class StreamingPlannerModel:
+    async def astream(self, *_args, **_kwargs):
+        text = json.dumps({"plan": [{"title": "Build", "tasks": []}, {"title": "Launch", "tasks": []}]})
+        for start in range(0, len(text), 5):
+            await asyncio.sleep(0)
+            yield text[start : start + 5]
+
+
+class StreamingReactModel:
+    def __init__(self):
+        self.chunks_sent = 0
+
+    async def astream(self, *_args, **_kwargs):
+        for start in range(0, len(REACT_TEXT), 8):
+            self.chunks_sent += 1
+            await asyncio.sleep(0)
+            yield REACT_TEXT[start : start + 8]
+
+
+@pytest.mark.asyncio
+async def test_aplan_streams_node_events():
+    react_model = StreamingReactModel()
+    planner = IdeaPlanner(StreamingPlannerModel(), react_model)
+    events: list[tuple[NodeCompleted, int]] = []
+
+    def record(event) -> None:
+        if isinstance(event, NodeCompleted):
+            events.append((event, react_model.chunks_sent))
+
+    result = await planner.aplan("Streaming idea", on_event=record)
+
+    assert [(event.stage, event.path, event.node.title) for event, _ in events] == [
+        ("plan", (0,), "Build"),
+        ("plan", (1,), "Launch"),
+        ("react", (0, 0, 0), "OAuth"),
+        ("react", (0, 0), 'Auth "}" flow'),
+        ("react", (0, 1), "Billing"),
+        ("react", (1, 0, 0), "OAuth"),
+        ("react", (1, 0), 'Auth "}" flow'),
+        ("react", (1, 1), "Billing"),
+    ]
+    chunks_per_response = react_model.chunks_sent // 2
+    assert events[2][1] < chunks_per_response  # first node surfaced mid-stream
+    assert result.tree[0].tasks[0].tasks[0].title == "OAuth"
+
+
+def test_events_are_emitted_for_non_streaming_models():
+    class Outline:
+        def invoke(self, *_args, **_kwargs):
+            return {"plan": [{"title": "Launch", "tasks": []}]}
+
+    class React:
+        def invoke(self, *_args, **_kwargs):
+            return {"analysis": [], "tasks": [{"title": "Deploy", "tasks": [{"title": "DNS", "tasks": []}]}]}
+
+    events: list[PlanEvent] = []
+    IdeaPlanner(Outline(), React()).plan("Plain idea", on_event=events.append)
+
+    assert [(event.path, event.node.title) for event in events if isinstance(event, NodeCompleted)] == [
+        ((0,), "Launch"),
+        ((0, 0, 0), "DNS"),
+        ((0, 0), "Deploy"),
+    ]